@@ -49,23 +49,40 @@ INTERR_THRSHOLD   = 0x01
 INTERR_DIS        = 0x00
 INTERR_EN         = 0x10
 
+#Seconds each integration time takes
+INTEGRATION_TIMES = {INTEG13_7MS: 0.0137, INTEG101MS: 0.101, INTEG402MS: 0.402}
+#Full scale count of each integration time, the shorter ones saturate before the 16 bit limit
+SATURATION = {INTEG13_7MS: 5047, INTEG101MS: 37177, INTEG402MS: 65535}
+
+#Auto-ranging gain and integration time settings, from most to least sensitive
+RANGES = [(16, INTEG402MS), (16, INTEG101MS), (1, INTEG402MS), (16, INTEG13_7MS), (1, INTEG101MS), (1, INTEG13_7MS)]
+DEFAULT_RANGE = 2					#1x gain and 402ms, which the lux is always scaled to
+RANGE_HIGH = 0.8					#Fraction of full scale above which a less sensitive range is used
+RANGE_LOW = 0.4						#Fraction of the more sensitive range's full scale it must fit under to use it
+THRESHOLD_MIN_COUNTS = 2			#Smallest change in counts a threshold window allows, so noise in the dark doesn't trigger it
+
 class APDS9300(object):
 	""" 
 	Ambient Light Sensor. Class functions for the APDS9300 ambient light sensor. 
 	"""
 	
-	def __init__(self):
+	def __init__(self, clock=None):
 		"""
 		Powers on the sensor 
 		
 		
-		:param none: 
+		:param clock: Function returning the seconds of a clock which never goes backwards, timing when a range
+		change has settled. Defaults to time.monotonic() where available, otherwise time.time().
 		:returns: none
 		"""
+		self._clock = clock or getattr(time, 'monotonic', time.time)
 		self._address = APDS9300ADDR
+		self._range = DEFAULT_RANGE
+		self._settled = 0
+		self._lastCh0 = 0
+		self._saturated = False
 		self.setpowerState(POWERON)				#Power on sensor
-		self.setGain(1)
-		self.setSamplingTime(0x02)
+		self.setRange(DEFAULT_RANGE)
 
 	def setpowerState(self,state):
 		"""
@@ -75,7 +92,7 @@ class APDS9300(object):
 		:param state:  Denotes the power state of the sensor ,set to 0/1 to turn off/on.
 		:returns: none
 		"""
-		self.writeRegister(CONTROL|CMD_CLEAR_INT|CONTROL,state)		#Turn on or off the sensor
+		self.writeRegister(COMMAND|CMD_CLEAR_INT|CONTROL,state)		#Turn on or off the sensor
 
 	def setGain(self,gain):
 		"""
@@ -85,18 +102,10 @@ class APDS9300(object):
 		:param gain: Gain type can be GAIN_1 or GAIN_16 for gain of 1 or 16x
 		:returns: none
 		"""
-		value = 0
-		if (gain == 1):
-			value  = self.readByte(COMMAND|TIMING)      #Write to TIMING register
-			value &= 0b11101111
-			self.writeByte(COMMAND|TIMING)       		#Write to TIMING register
-			self.writeByte(value)
-		elif (gain == 16):
-			self.writeByte(COMMAND|TIMING)				#Write to TIMING register
-			self.writeByte(GAIN)
-		else :
-			self.writeByte(COMMAND|TIMING)				#Write to TIMING register
-			self.writeByte(GAIN)
+		value  = self.readByte(COMMAND|TIMING) & ~GAIN & 0xFF		#Keep the integration time
+		if (gain != 1):
+			value |= GAIN
+		self.writeRegister(COMMAND|TIMING,value)				#Write to TIMING register
 
 	def setSamplingTime(self,sampling_time):
 		"""
@@ -106,8 +115,85 @@ class APDS9300(object):
 		:param sampling_time: Can be 0x00,0x01,0x02
 		:returns: none
 		"""
-		self.writeByte(TIMING|COMMAND)
-		self.writeByte(sampling_time)
+		value = self.readByte(COMMAND|TIMING) & GAIN				#Keep the gain
+		self.writeRegister(COMMAND|TIMING,value|sampling_time)
+
+	def setRange(self,index):
+		"""
+		Sets the gain and integration time to one of the auto-ranging RANGES in a single write. Readings taken
+		before the first full integration at the new settings are ignored by readLux().
+		
+		
+		:param index: Index into RANGES, 0 being the most sensitive
+		:returns: none
+		"""
+		gain, integration = RANGES[index]
+		value = integration
+		if (gain == 16):
+			value |= GAIN
+		self.writeRegister(COMMAND|TIMING,value)
+		self._range = index
+		self._settled = self._clock() + 2 * INTEGRATION_TIMES[integration]	#Finish the cycle in progress then one more
+
+	def readLux(self):
+		"""
+		Reads both channels and returns the lux, stepping the gain and integration time down a range when the
+		light nears full scale and up a range when it would fit in a more sensitive one. Short integrations in
+		bright light respond fast and long ones with high gain resolve the dark. The lux is scaled to 1x gain and
+		402ms whatever the range.
+		
+		
+		:param none: 
+		:returns (lux, delay): Lux Float value of light intensity, None if the sensor is saturated or settling
+		after a range change, and the seconds until the next reading is at the new range, 0 if unchanged. Light
+		saturating the least sensitive range gives the full-scale lux, the most the sensor can measure.
+		"""
+		ch0 = self.readWord(COMMAND|CMD_CLEAR_INT|CMD_WORD|DATA0LOW)
+		ch1 = self.readWord(COMMAND|CMD_CLEAR_INT|CMD_WORD|DATA1LOW)
+		now = self._clock()
+		if now < self._settled:
+			return (None, self._settled - now)
+		gain, integration = RANGES[self._range]
+		saturation = SATURATION[integration]
+		scale = INTEGRATION_TIMES[INTEG402MS] / (INTEGRATION_TIMES[integration] * gain)
+		lux = None
+		self._saturated = False
+		if max(ch0, ch1) < saturation:
+			lux = self.getLuxLevel(ch0 * scale, ch1 * scale)
+			self._lastCh0 = ch0
+		elif self._range == len(RANGES) - 1:
+			lux = self.getLuxLevel(saturation * scale, 0)		#Nowhere left to range to, so report full scale
+			self._lastCh0 = saturation
+			self._saturated = True
+		index = self._range
+		if max(ch0, ch1) > RANGE_HIGH * saturation:
+			index = min(index + 1, len(RANGES) - 1)
+		elif index > 0:
+			next_gain, next_integration = RANGES[index - 1]
+			ratio = (next_gain * INTEGRATION_TIMES[next_integration]) / (gain * INTEGRATION_TIMES[integration])
+			if max(ch0, ch1) * ratio < RANGE_LOW * SATURATION[next_integration]:
+				index -= 1
+		if index == self._range:
+			return (lux, 0)
+		self.setRange(index)
+		return (lux, self._settled - self._clock())
+
+	def setThresholdWindow(self,fraction):
+		"""
+		Sets the interrupt thresholds to a window around the last channel 0 reading, so the interrupt fires once
+		the light changes by more than the fraction. When the last reading was saturated, only a drop fires it, as
+		channel 0 can't count any higher.
+		
+		
+		:param fraction: Fraction of the last reading the light must change by, eg. 0.1 for 10%
+		:returns: none
+		"""
+		margin = max(int(self._lastCh0 * fraction), THRESHOLD_MIN_COUNTS)
+		self.setIntLowThreshold(max(self._lastCh0 - margin, 0))
+		if self._saturated:
+			self.setIntHighThreshold(0xFFFF)
+		else:
+			self.setIntHighThreshold(min(self._lastCh0 + margin, 0xFFFF))
 
 	def readChannel(self,channel):
 		"""
@@ -136,7 +222,7 @@ class APDS9300(object):
 		"""
 		k = 0
 		if(ch0 !=0):
-			k = float(ch1/ch0)
+			k = float(ch1)/ch0
 			
 		Lux=0
 
@@ -187,11 +273,12 @@ class APDS9300(object):
 		Enable or disable the interrupts on the sensor.
 		
 		
-		:param enable: Enables or diable interrupt. Default is False.
+		:param enable: Enables or diable interrupt. Default is False. Once enabled it fires when channel 0 is outside
+		the thresholds, until cleared.
 		:returns: none 
 		"""
 		if enable == True:
-			self.writeRegister(COMMAND|INTERRUPT,INTERR_EN)
+			self.writeRegister(COMMAND|INTERRUPT,INTERR_EN|INTERR_THRSHOLD)
 		else:
 			self.writeRegister(COMMAND|INTERRUPT,INTERR_DIS)
 
@@ -237,8 +324,7 @@ class APDS9300(object):
 		:param data: Data word to be written on the register. 
 		:returns: none
 		"""
-		buffer = [(data >> 8) & 0xFF, data & 0xFF]
-		bus.write_i2c_block_data(self._address, reg, buffer)
+		bus.write_word_data(self._address, reg, data & 0xFFFF)		#Low byte first, as the threshold registers are laid out
 
 	def readByte(self,reg):
 		"""
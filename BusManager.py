@@ -0,0 +1,183 @@
+#!/usr/bin/python
+
+"""BusManager.py: Owns the I2C bus, running the transfers handed to it one at a time by priority.
+
+Has no hardware dependencies itself, the transfers are functions calling the drivers, so it can be tested away
+from the Pi.
+"""
+
+from __future__ import print_function
+import threading
+try:
+    import Queue
+except ImportError:
+    import queue as Queue
+from MonotonicClock import monotonic_time
+
+__author__ = "Dylan Kauling"
+__maintainer__ = "Dylan Kauling"
+__status__ = "Development"
+
+
+# I2C bus transaction priorities, lower goes first, see BusManager
+BUS_PRIORITY_INPUT = 0
+BUS_PRIORITY_IMU = 1
+BUS_PRIORITY_ENVIRONMENT = 2
+BUS_PRIORITY_HOUSEKEEPING = 3
+
+
+class BusTransaction(object):
+    """A read or write of one I2C device waiting for, or done by, the bus manager.
+
+    The caller waits on done for the result, duplicate reads submitted while it's still waiting share it.
+    """
+    def __init__(self, device, method, priority, deadline, key, submitted):
+        """Initializes a transaction with the device it uses, the method doing the transfer and when it's needed by.
+        """
+        self.device = device
+        self.method = method
+        self.priority = priority
+        self.deadline = deadline
+        self.key = key
+        self.submitted = submitted
+        self.started = False
+        self.expired = False
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def wait(self):
+        """Waits for the bus manager to run the transaction, raising any exception the transfer raised.
+
+        :return: Whatever the method returned, or None if the deadline passed before the bus was free.
+        """
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class BusManager(threading.Thread):
+    """A Thread which owns the I2C bus, running the transactions handed to it one at a time by priority.
+
+    The Sensorian firmware isn't thread-safe, so every sensor read goes through here instead of a shared lock.
+    Button presses go ahead of IMU samples, which go ahead of environmental and then housekeeping reads, oldest
+    first within a priority. Transactions still waiting when their deadline passes are dropped unrun, and a keyed
+    read submitted while the same one is waiting is merged into it. Keeps how long each device held the bus.
+    """
+    def __init__(self, thread_id=4, name="BusManagerThread"):
+        """Initializes the Bus Manager thread with an ID and name.
+        """
+        threading.Thread.__init__(self)
+        self.threadID = thread_id
+        self.name = name
+        self.queue = Queue.PriorityQueue()
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.sequence = 0
+        self.started = monotonic_time()
+        self.devices = {}
+
+    def submit(self, device, method, priority, deadline=None, key=None):
+        """Queues a transaction for the bus, merging it into a waiting one with the same key.
+
+        :param device: String name of the device used, for the occupancy stats.
+        :param method: Function doing the transfer, called on the bus manager thread with no parameters.
+        :param priority: Integer priority, one of the BUS_PRIORITY constants. Lower goes first.
+        :param deadline: Float of how many seconds the transaction can wait before being dropped, None to wait.
+        :param key: Hashable naming what a read returns, eg. the device and register, None to never merge.
+        :return: BusTransaction to wait on.
+        """
+        now = monotonic_time()
+        if deadline is not None:
+            deadline += now
+        self.lock.acquire()
+        try:
+            transaction = self.pending.get(key) if key is not None else None
+            if transaction is not None:
+                self.device_stats(device)['merged'] += 1
+                if priority >= transaction.priority:
+                    return transaction
+                # Queue it again at the higher priority, whichever copy comes out first runs it
+                transaction.priority = priority
+            else:
+                transaction = BusTransaction(device, method, priority, deadline, key, now)
+                if key is not None:
+                    self.pending[key] = transaction
+            self.sequence += 1
+            self.queue.put((priority, self.sequence, transaction))
+            return transaction
+        finally:
+            self.lock.release()
+
+    def device_stats(self, device):
+        """Gets the running totals of a device, creating them the first time it's used. Call with the lock held.
+
+        :param device: String name of the device.
+        :return: Dictionary of the device's totals.
+        """
+        stats = self.devices.get(device)
+        if stats is None:
+            stats = {'transactions': 0, 'merged': 0, 'expired': 0, 'busytime': 0.0, 'maxwait': 0.0}
+            self.devices[device] = stats
+        return stats
+
+    def run(self):
+        """Runs transactions from the queue in priority order until handed None.
+        """
+        while True:
+            priority, sequence, transaction = self.queue.get()
+            if transaction is None:
+                break
+            start = monotonic_time()
+            self.lock.acquire()
+            if transaction.started:
+                self.lock.release()
+                continue
+            transaction.started = True
+            if transaction.key is not None:
+                self.pending.pop(transaction.key, None)
+            self.lock.release()
+            if transaction.deadline is not None and start > transaction.deadline:
+                transaction.expired = True
+            else:
+                try:
+                    transaction.result = transaction.method()
+                except Exception as e:
+                    transaction.error = e
+            end = monotonic_time()
+            self.lock.acquire()
+            stats = self.device_stats(transaction.device)
+            if transaction.expired:
+                stats['expired'] += 1
+            else:
+                stats['transactions'] += 1
+                stats['busytime'] += end - start
+                stats['maxwait'] = max(stats['maxwait'], start - transaction.submitted)
+            self.lock.release()
+            transaction.done.set()
+        print("Killing " + self.name)
+
+    def get_stats(self):
+        """Gets how much each device has used the bus since the bus manager started.
+
+        :return: List of dictionaries with the device name, transactions run, merged and expired, seconds spent on
+        the bus, the fraction of time it held the bus as occupancy and the longest wait for the bus in seconds.
+        """
+        elapsed = max(monotonic_time() - self.started, 1e-9)
+        self.lock.acquire()
+        try:
+            stats = []
+            for device in sorted(self.devices):
+                device_stats = dict(self.devices[device])
+                device_stats['device'] = device
+                device_stats['occupancy'] = device_stats['busytime'] / elapsed
+                stats.append(device_stats)
+            return stats
+        finally:
+            self.lock.release()
+
+    def stop(self):
+        """Tells the bus manager to stop once the transactions ahead of the request have run.
+        """
+        self.queue.put((BUS_PRIORITY_HOUSEKEEPING + 1, 0, None))
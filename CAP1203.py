@@ -15,6 +15,67 @@ from ctypes import *
 CAP1203ADDR  = 0x28					#Capacitive sensor address
 CAP = CDLL("./libCAP.so")
 
+#Prototypes of the library's functions as (name, result type, argument types), so each call converts straight to
+#the C types rather than guessing from the Python values.
+CAP_PROTOTYPES = [
+	("I2C_Initialize", None, []),
+	("I2C_WriteByte", None, [c_ubyte, c_ubyte]),
+	("I2C_WriteByteRegister", None, [c_ubyte, c_ubyte, c_ubyte]),
+	("I2C_WriteWordRegister", None, [c_ubyte, c_ubyte, c_char_p]),
+	("I2C_WriteByteArray", None, [c_ubyte, c_ubyte, c_char_p, c_uint]),
+	("I2C_ReadByteRegister", c_ubyte, [c_ubyte, c_ubyte]),
+	("I2C_ReadByteArray", None, [c_ubyte, c_ubyte, c_char_p, c_uint]),
+	("I2C_ReadWordRegisterRS", c_uint, [c_ubyte, c_ubyte]),
+	("I2C_ReadWordPresetPointer", c_uint, []),
+	("CAP1203_Initialize", None, []),
+	("CAP1203_ActiveMode", c_ubyte, []),
+	("CAP1203_StandbyMode", c_ubyte, []),
+	("CAP1203_DeepSleep", c_ubyte, []),
+	("CAP1203_ResumeFromDeepSleep", c_ubyte, []),
+	("CAP1203_ReadPressedButton", c_ubyte, []),
+	("CAP1203_EnableInterrupt", None, [c_int, c_int, c_int]),
+	("CAP1203_SetSensitivity", None, [c_int]),
+	("CAP1203_CheckSensorStatus", c_ubyte, []),
+	("CAP1203_ClearInterrupt", c_ubyte, []),
+	("CAP1203_ReadID", c_uint, []),
+	("CAP1203_ConfigureMultiTouch", None, [c_int, c_ubyte]),
+	("CAP1203_MultitouchEvent", c_ubyte, []),
+	("CAP1203_SetPowerButton", None, [c_int]),
+	("CAP1203_ReadPowerButton", c_ubyte, []),
+	("CAP1203_GetStatusReg", c_ubyte, []),
+	("CAP1203_Write", None, [c_ubyte, c_ubyte, c_ubyte]),
+	("CAP1203_Read", c_ubyte, [c_ubyte, c_ubyte])
+]
+for name, restype, argtypes in CAP_PROTOTYPES:
+	function = getattr(CAP, name)
+	function.restype = restype
+	function.argtypes = argtypes
+
+#Register definitions
+GEN_STATUS   = 0x02
+MULTITOUCH   = 0x2A
+MULTIPATCONF = 0x2B
+MULTIPATTERN = 0x2D
+
+#Main control register
+INT          = 0x01					#Interrupt raised, cleared to release the ALERT pin
+
+#Sensor inputs, one bit per touch sensor
+CS3          = 0x04
+CS2          = 0x02
+CS1          = 0x01
+
+#Button number of each sensor input, numbered as readPressedButton() numbers them
+BUTTONS      = {CS1: 3, CS2: 2, CS3: 1}
+
+#Multitouch configuration
+MULTBLK_EN   = 0x80
+MTP_EN       = 0x80
+MTP_TH1      = 0x08
+MTP_TH0      = 0x04
+COMP_PTRN    = 0x02
+MTP_ALERT    = 0x01
+
 class CAP1203(object):
 	'''Capacitive touch controller. Class for CAP1203 touch sensor.'''
 	MAIN_CTRL_REG = 0x00
@@ -72,7 +133,7 @@ class CAP1203(object):
 		:param none: 
 		:returns: none
 		"""
-		CAP1203_ResumeFromDeepSleep()
+		CAP.CAP1203_ResumeFromDeepSleep()
 
 	def  configureMultiTouch(self,number,mulchan):
 		"""
@@ -83,7 +144,7 @@ class CAP1203(object):
 		:param chan: One of the three channels.
 		:returns: none
 		"""
-		CAP.CAP1203_Write(self._address,MULTITOUCH,number|MULTBLK_EN)      							  #Set number of simultaneous touches
+		CAP.CAP1203_Write(self._address,MULTITOUCH,((number - 1) << 2)|MULTBLK_EN)      				  #Set number of simultaneous touches
 		CAP.CAP1203_Write(self._address,MULTIPATCONF,MTP_EN|MTP_TH1|MTP_TH0|COMP_PTRN|MTP_ALERT)      #Enable multitouch
 		CAP.CAP1203_Write(self._address,MULTIPATTERN,mulchan)
 		
@@ -119,6 +180,20 @@ class CAP1203(object):
 		"""
 		return CAP.CAP1203_ReadPressedButton()
 
+	def readTouches(self):
+		"""
+		Read which sensor inputs are touched, then clear the interrupt so the next touch or release raises it again.
+		Unlike readPressedButton() several touches can be read at once.
+		
+		
+		:param none: 
+		:returns: touches - Bits of the touched inputs, CS1 to CS3, 0 if none
+		"""
+		touches = CAP.CAP1203_Read(self._address,self.SENSOR_INPUTS) & (CS1|CS2|CS3)
+		control = CAP.CAP1203_Read(self._address,self.MAIN_CTRL_REG) & 0xFF
+		CAP.CAP1203_Write(self._address,self.MAIN_CTRL_REG,control & ~INT & 0xFF)
+		return touches
+
 	def getStatusReg(self):
 		"""Read the status register.
 		
@@ -126,7 +201,7 @@ class CAP1203(object):
 		:param none: 
 		:returns: status - Contents of status register
 		"""
-		status = CAP.CAP1203_Read(GEN_STATUS);
+		status = CAP.CAP1203_Read(self._address,GEN_STATUS);
 		return status;
 
 	def  enableInterrupt(self,repeat,release,pin):
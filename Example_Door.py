@@ -3,6 +3,7 @@
 """Example_Door.py: Example code to act as a door sensor and send a notification through IFTTT when it opens"""
 
 import time
+import Queue
 import Sensorian_Client
 
 __author__ = "Dylan Kauling"
@@ -15,6 +16,7 @@ IFTTT_EVENT = "DoorOpened"  # The name of the event you chose for the recipe to
 IFTTT_TIMEOUT = 5  # How long to wait in seconds for commands sent to IFTTT.com before timing out
 TOLERANCE = 1000  # How much the magnetometer values need to change to signal
 SECONDS = 5  # How long to give the user to prepare for the calibration steps
+STEP = TOLERANCE / 10  # How much a magnetometer value needs to change to be checked again
 
 # Global variables to store the calibrations
 xClosed = 0
@@ -49,7 +51,11 @@ def calibrate():
 def main():
     print("Running...")
     door_was_open = False  # A boolean to store whether or not the door was already open if it was detected open again
+    changes = Queue.Queue(64)  # Receives the magnetometer changes as soon as they're sampled instead of polling
+    for channel in ("mag_x", "mag_y", "mag_z"):
+        Sensorian_Client.subscribe(channel, changes, min_delta=STEP)
     while True:
+        changes.get()  # Wait until one of the magnetometer values changes by more than the step
         (x, y, z) = (Sensorian_Client.get_mag_x(), Sensorian_Client.get_mag_y(), Sensorian_Client.get_mag_z())  # Get the current force values of the magnetometer
         sensor_string = "X: " + str(x) + " Y: " + str(y) + " Z: " + str(z)  # Add the magnet values to the string
         # If any of the sensor values differ from the calibrated closed amount by more than the tolerance, it is open
@@ -62,7 +68,6 @@ def main():
         else:
             door_was_open = False
         print(sensor_string)
-        time.sleep(1)  # Wait for 1 seconds between each check for magnetic forces
 
 
 # Assuming this program is run itself, execute normally
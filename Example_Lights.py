@@ -4,6 +4,7 @@
 
 import time
 import math
+import Queue
 import Sensorian_Client
 
 __author__ = "Dylan Kauling"
@@ -15,6 +16,7 @@ IFTTT_KEY = "YourIFTTTMakerChannelKey"  # Your API key provided by IFTTT when co
 IFTTT_EVENT = "HueBrightness"  # The name of the event you chose for the recipe to dim a Hue light
 IFTTT_TIMEOUT = 5  # How long to wait in seconds for commands sent to IFTTT.com before timing out
 TOLERANCE = 2.0   # How many times the lux levels per Hue brightness setting should be an acceptable range
+TIMEOUT = 20  # How many seconds to wait for the brightness to change after a request before giving up
 
 # Global variables to store the calibrations
 lux_at_max = 0  # The light level when the Hue is set to a max brightness of 100
@@ -38,26 +40,27 @@ def setup():
 # Waits until the brightness changes to ensure the request worked given the current light level and desired direction
 def wait_for_change(pre_request_lux, direction="BOTH"):
     tolerance = lux_per_bright * TOLERANCE  # Sensitivity - How much the light should change to be considered different
-    slept = 0  # Stores a counter to time out the check for a change in brightness in case the brightness is the same
-    while True:  # Loops until the brightness changes or it times out
-        current_lux = Sensorian_Client.get_light()  # Get the current light value to check against in a second
-        time.sleep(1)  # Waits for a second before checking brightness again to see if there was a change
-        post_request_lux = Sensorian_Client.get_light()  # Get the current light value to check for changes
-        if (post_request_lux > pre_request_lux + tolerance or post_request_lux > current_lux + tolerance) \
-                and (direction == "BOTH" or direction == "UP"):
-            print("Brightness went up")
-            time.sleep(2)  # Waits 2 seconds before breaking the loop in case the bulb is still changing brightness
-            break  # Breaks the loop since a brightness change was detected
-        elif (post_request_lux < pre_request_lux - tolerance or post_request_lux < current_lux - tolerance) \
-                and (direction == "BOTH" or direction == "DOWN"):
-            print("Brightness went down")
-            time.sleep(2)  # Waits 2 seconds before breaking the loop in case the bulb is still changing brightness
-            break  # Breaks the loop since a brightness change was detected
-        if slept >= 20:  # Gives the check 20 seconds to catch rare edge cases where the IFTTT request takes a long time
-            print("Timed out, brightness may be the same or similar")
-            time.sleep(1)  # Waits a second before breaking the loop in case the bulb is still changing brightness
-            break  # Breaks the loop since no brightness change was detected after 30 seconds
-        slept += 1  # Increases the counter for how long the brightness has been checked
+    changes = Queue.Queue(64)  # Receives the light level as soon as it's sampled instead of polling
+    subscription = Sensorian_Client.subscribe("light", changes)
+    deadline = time.time() + TIMEOUT  # Gives the check time to catch rare edge cases where the IFTTT request is slow
+    try:
+        while True:  # Loops until the brightness changes or it times out
+            try:
+                (channel, post_request_lux, timestamp) = changes.get(timeout=max(deadline - time.time(), 0))
+            except Queue.Empty:
+                print("Timed out, brightness may be the same or similar")
+                time.sleep(1)  # Waits a second before returning in case the bulb is still changing brightness
+                break  # Breaks the loop since no brightness change was detected in time
+            if post_request_lux > pre_request_lux + tolerance and (direction == "BOTH" or direction == "UP"):
+                print("Brightness went up")
+                time.sleep(2)  # Waits 2 seconds before breaking the loop in case the bulb is still changing brightness
+                break  # Breaks the loop since a brightness change was detected
+            elif post_request_lux < pre_request_lux - tolerance and (direction == "BOTH" or direction == "DOWN"):
+                print("Brightness went down")
+                time.sleep(2)  # Waits 2 seconds before breaking the loop in case the bulb is still changing brightness
+                break  # Breaks the loop since a brightness change was detected
+    finally:
+        Sensorian_Client.unsubscribe(subscription)
 
 
 # Checks light levels when the Philips Hue light is set to maximum and minimum brightness
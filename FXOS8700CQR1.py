@@ -8,18 +8,74 @@ __version__ = "1.0"
 """
 
 import math
+import struct
 import sys
 import time
+import numpy
 from ctypes import *
 
 FXO = CDLL("./libFXO.so")
 
+class RAWDATA(Structure):
+	"""Raw x, y and z axis counts, the rawdata_t the library fills in."""
+	_fields_ = [("x", c_int16), ("y", c_int16), ("z", c_int16)]
+
+#Prototypes of the library's functions as (name, result type, argument types), so each call converts straight to
+#the C types rather than guessing from the Python values. char is unsigned on the Pi.
+FXO_PROTOTYPES = [
+	("I2C_Initialize", None, []),
+	("I2C_WriteByte", None, [c_ubyte, c_ubyte]),
+	("I2C_WriteByteRegister", None, [c_ubyte, c_ubyte, c_ubyte]),
+	("I2C_WriteWordRegister", None, [c_ubyte, c_ubyte, c_char_p]),
+	("I2C_WriteByteArray", None, [c_ubyte, c_ubyte, c_char_p, c_uint]),
+	("I2C_ReadByteRegister", c_ubyte, [c_ubyte, c_ubyte]),
+	("I2C_ReadByteArray", None, [c_ubyte, c_ubyte, c_char_p, c_uint]),
+	("I2C_ReadWordRegisterRS", c_uint, [c_ubyte, c_ubyte]),
+	("I2C_ReadWordPresetPointer", c_uint, []),
+	("bcm2835_delay", None, [c_uint]),
+	("FXOS8700CQ_Initialize", None, []),
+	("FXOS8700CQ_ReadStatusReg", c_ubyte, []),
+	("FXOS8700CQ_ActiveMode", None, []),
+	("FXOS8700CQ_StandbyMode", c_ubyte, []),
+	("FXOS8700CQ_HybridMode", None, []),
+	("FXOS8700CQ_GetChipMode", c_ubyte, []),
+	("FXOS8700CQ_ID", c_ubyte, []),
+	("FXOS8700CQ_ConfigureAccelerometer", None, []),
+	("FXOS8700CQ_PollAccelerometer", None, [POINTER(RAWDATA)]),
+	("FXOS8700CQ_HighPassFilter", None, [c_ubyte]),
+	("FXOS8700CQ_FullScaleRange", None, [c_int]),
+	("FXOS8700CQ_SetAccelerometerDynamicRange", None, [c_int]),
+	("FXOS8700CQ_ConfigureMagnetometer", None, []),
+	("FXOS8700CQ_PollMagnetometer", None, [POINTER(RAWDATA)]),
+	("FXOS8700CQ_MagnetometerStatus", c_ubyte, []),
+	("FXOS8700CQ_GetData", None, [POINTER(RAWDATA), POINTER(RAWDATA)]),
+	("FXOS8700CQ_FIFOMode", None, [c_int]),
+	("FXOS8700CQ_SetODR", None, [c_ubyte]),
+	("FXOS8700CQ_GetODR", c_ubyte, []),
+	("FXOS8700CQ_GetTemperature", c_ubyte, []),
+	("FXOS8700CQ_GetOrientation", c_ubyte, []),
+	("FXOS8700CQ_ConfigureOrientation", None, []),
+	("FXOS8700CQ_ConfigureGenericTapMode", None, []),
+	("FXOS8700CQ_ConfigureSingleTapMode", None, []),
+	("FXOS8700CQ_ConfigureDoubleTapMode", None, []),
+	("FXOS8700CQ_WriteByte", None, [c_ubyte, c_ubyte, c_ubyte]),
+	("FXOS8700CQ_WriteByteArray", None, [c_ubyte, c_ubyte, c_char_p, c_ubyte]),
+	("FXOS8700CQ_ReadByte", c_ubyte, [c_ubyte, c_ubyte]),
+	("FXOS8700CQ_ReadByteArray", None, [c_ubyte, c_ubyte, c_char_p, c_uint])
+]
+for name, restype, argtypes in FXO_PROTOTYPES:
+	function = getattr(FXO, name)
+	function.restype = restype
+	function.argtypes = argtypes
+
 #########################################################################################################
 
 FXOS8700CQR1_ADDRESS	=0x1E
 FXOS8700CQ_WHOAMI_VAL 	=0xC7		# FXOS8700CQ WHOAMI production register value
 FXOS8700CQ_READ_LEN 	=12			# 6 channels of two bytes = 12 bytes 
-UINT14_MAX 				=16383		# For processing the accelerometer data to right-justified 2's complement
+FXOS8700CQ_FIFO_SIZE	=32			# Samples the accelerometer FIFO holds
+ACCEL_COUNTS_PER_G		=4096		# Accelerometer samples are 14-bit counts at the +/-2g full scale
+ACCEL_SHIFT				=2			# The 14-bit accelerometer counts are left justified in 16 bits
 
 #######################################Memory Map########################################################
 
@@ -403,6 +459,10 @@ DATA_RATE_12_5HZ    =  (DATA_RATE_80MS)
 DATA_RATE_6_25HZ    =  (DATA_RATE_160MS)
 DATA_RATE_1_56HZ    =  (DATA_RATE_640MS)
 
+# Accelerometer only output data rates by Hz, for streamMode()
+STREAM_DATA_RATES = {800: DATA_RATE_800HZ, 400: DATA_RATE_400HZ, 200: DATA_RATE_200HZ, 100: DATA_RATE_100HZ,
+					 50: DATA_RATE_50HZ, 12.5: DATA_RATE_12_5HZ, 6.25: DATA_RATE_6_25HZ, 1.5625: DATA_RATE_1_56HZ}
+
 HYB_DATA_RATE_400HZ   =(DATA_RATE_1250US)
 HYB_DATA_RATE_200HZ   =(DATA_RATE_2500US)
 HYB_DATA_RATE_100HZ   =(DATA_RATE_5MS)
@@ -723,18 +783,7 @@ class FXOS8700CQR1(object):
 		raw3 = FXO.FXOS8700CQ_ReadByte(self._address,OUT_Y_LSB)
 		raw4 = FXO.FXOS8700CQ_ReadByte(self._address,OUT_Z_MSB)
 		raw5 = FXO.FXOS8700CQ_ReadByte(self._address,OUT_Z_LSB)
-		ax = (raw0 << 8) | raw1 		# Pull out 16-bit, 2's complement magnetometer data
-		ay = (raw2 << 8) | raw3 
-		az = (raw4 << 8) | raw5 
-		
-		if(ax > UINT14_MAX/2):	 
-			ax -= UINT14_MAX 
-		if(ay > UINT14_MAX/2):	 
-			ay -= UINT14_MAX 
-		if(az > UINT14_MAX/2):	 
-			az -= UINT14_MAX 
-			
-		return (ax, ay, az)
+		return self.convertAxes(bytearray((raw0, raw1, raw2, raw3, raw4, raw5)), 0, ACCEL_SHIFT)
 
 	def	FIFOMode(self,mode):
 		"""
@@ -746,6 +795,75 @@ class FXOS8700CQR1(object):
 		"""
 		FXO.FXOS8700CQ_WriteByte(self._address,F_SETUP,6<<mode)
 		 
+	def	streamMode(self,rate=800,watermark=16):
+		"""
+		Puts the chip in accelerometer only mode with the FIFO collecting samples, to be drained with readFIFO().
+		The magnetometer and hybrid auto-increment are off while streaming so FIFO reads wrap back to OUT_X_MSB,
+		call pollMode() to go back to polling both.
+		
+		:param rate: Output data rate in Hz, one of the STREAM_DATA_RATES
+		:param watermark: Number of samples in the FIFO to set the watermark flag at, 1 to 32
+		:returns: none
+		"""
+		FXO.FXOS8700CQ_StandbyMode()
+		FXO.FXOS8700CQ_WriteByte(self._address,M_CTRL_REG1, ACCEL_ACTIVE)						#Accelerometer only
+		FXO.FXOS8700CQ_WriteByte(self._address,M_CTRL_REG2, 0)									#Disable hybrid auto-increment
+		FXO.FXOS8700CQ_WriteByte(self._address,XYZ_DATA_CFG, FULL_SCALE_2G)						#Full Scale of +/-2g
+		FXO.FXOS8700CQ_WriteByte(self._address,F_SETUP, F_MODE_CIRCULAR | (watermark & F_WMRK_MASK))	#Keep the latest 32 samples
+		FXO.FXOS8700CQ_WriteByte(self._address,CTRL_REG1, STREAM_DATA_RATES[rate])
+		FXO.FXOS8700CQ_ActiveMode()
+		
+	def	pollMode(self):
+		"""
+		Turns the FIFO off and puts the chip back in hybrid mode to be polled, after streamMode().
+		
+		
+		param none: 
+		:returns: none
+		"""
+		FXO.FXOS8700CQ_StandbyMode()
+		FXO.FXOS8700CQ_WriteByte(self._address,F_SETUP, F_MODE_DISABLED)
+		self.hybridMode()
+		
+	def	readFIFO(self):
+		"""
+		Drains the samples waiting in the FIFO with one burst read after checking how many there are.
+		
+		
+		param none: 
+		:returns: Tuple of an (N, 3) int16 NumPy array of the x, y, z samples oldest first, in right-justified 14-bit
+		counts, and a boolean of whether the FIFO overflowed and older samples were lost
+		"""
+		status = FXO.FXOS8700CQ_ReadByte(self._address,STATUS)
+		count = status & F_CNT_MASK
+		overflowed = (status & F_OVF_MASK) != 0
+		if count == 0:
+			return (numpy.zeros((0, 3), dtype=numpy.int16), overflowed)
+		buffer = create_string_buffer(count * 6)
+		FXO.I2C_ReadByteArray(self._address,OUT_X_MSB,buffer,count * 6)
+		samples = numpy.frombuffer(buffer.raw, dtype='>i2').reshape(count, 3) >> ACCEL_SHIFT		#Left-justified 14-bit 2's complement
+		return (samples.astype(numpy.int16), overflowed)
+		
+	def	dataReadyInterrupt(self,enabled):
+		"""
+		Enables or disables the data ready interrupt, routed to the INT1 pin, so a sample can be read as soon as it's ready.
+		The interrupt is cleared by reading the sample.
+		
+		:param enabled: Boolean of whether to enable the interrupt
+		:returns: none
+		"""
+		FXO.FXOS8700CQ_StandbyMode()
+		reg4 = FXO.FXOS8700CQ_ReadByte(self._address,CTRL_REG4) & 0xFF
+		reg5 = FXO.FXOS8700CQ_ReadByte(self._address,CTRL_REG5) & 0xFF
+		if enabled:
+			reg4 |= INT_EN_DRDY_MASK
+			reg5 |= INT_CFG_DRDY_MASK									#Route data ready to INT1
+		else:
+			reg4 &= ~INT_EN_DRDY_MASK
+		FXO.FXOS8700CQ_WriteByte(self._address,CTRL_REG4, reg4)
+		FXO.FXOS8700CQ_WriteByte(self._address,CTRL_REG5, reg5)
+		FXO.FXOS8700CQ_ActiveMode()
+		
 	def	highPassFilter(self,status):
 		"""
 		Enable the highpass filter.
@@ -807,13 +925,44 @@ class FXOS8700CQR1(object):
 		raw0 = FXO.FXOS8700CQ_ReadByte(self._address,M_OUT_X_MSB)
 		raw1 = FXO.FXOS8700CQ_ReadByte(self._address,M_OUT_X_LSB)
 		raw2 = FXO.FXOS8700CQ_ReadByte(self._address,M_OUT_Y_MSB)
-		raw3 = FXO.FXOS8700CQ_ReadByte(self._address,M_OUT_Y_MSB)
+		raw3 = FXO.FXOS8700CQ_ReadByte(self._address,M_OUT_Y_LSB)
 		raw4 = FXO.FXOS8700CQ_ReadByte(self._address,M_OUT_Z_MSB)
-		raw5 = FXO.FXOS8700CQ_ReadByte(self._address,M_OUT_Z_MSB)	
-		mx = (raw0 << 8) | raw1			# Pull out 16-bit, 2's complement magnetometer data
-		my = (raw2 << 8) | raw3
-		mz = (raw4 << 8) | raw5
-		return (mx, my, mz)
+		raw5 = FXO.FXOS8700CQ_ReadByte(self._address,M_OUT_Z_LSB)	
+		return self.convertAxes(bytearray((raw0, raw1, raw2, raw3, raw4, raw5)), 0, 0)
+		
+	def pollHybrid (self):
+		"""
+		Reads the status, accelerometer and magnetometer data in a single burst read, so both come from the same sample.
+		Relies on the hybrid auto-increment set up in __init__, which jumps from the last accelerometer register
+		to the first magnetometer register.
+		
+		param none: 
+		:returns: Tuple of the status register, tuple of the accelerometer x, y, z and tuple of the magnetometer x, y, z
+		"""
+		buffer = create_string_buffer(FXOS8700CQ_READ_LEN + 1)
+		FXO.I2C_ReadByteArray(self._address,STATUS,buffer,FXOS8700CQ_READ_LEN + 1)
+		return self.convertHybrid(bytearray(buffer.raw))
+
+	def convertHybrid (self, raw):
+		"""
+		Converts the status, accelerometer and magnetometer registers of a hybrid burst read.
+		
+		:param raw: bytearray of the status register followed by the accelerometer and magnetometer registers
+		:returns: Tuple of the status register, tuple of the accelerometer x, y, z and tuple of the magnetometer x, y, z
+		"""
+		return (raw[0], self.convertAxes(raw, 1, ACCEL_SHIFT), self.convertAxes(raw, 7, 0))
+		
+	def convertAxes (self, raw, offset, shift):
+		"""
+		Converts the x, y and z registers of one sensor, MSB first, to signed counts.
+		
+		:param raw: bytearray holding the registers
+		:param offset: Index of the x MSB in raw
+		:param shift: Bits the counts are left justified by, ACCEL_SHIFT for the accelerometer and 0 for the magnetometer
+		:returns: Tuple of the x, y and z counts
+		"""
+		x, y, z = struct.unpack_from('>hhh', raw, offset)		# 16-bit 2's complement, the shift keeps the sign
+		return (x >> shift, y >> shift, z >> shift)
 		
 	def getHeading(self):
 		"""
@@ -890,7 +1039,7 @@ class FXOS8700CQR1(object):
 		PL_BF_ZCOMP_Data |= 0x80						# Sets bits[7:6] = 02
 		PL_BF_ZCOMP_Data |= 0xC0						# Sets bits[7:6] = 03 
 		FXO.FXOS8700CQ_WriteByte(self._address,0x13, PL_BF_ZCOMP_Data)	#Write in the updated Back/Front Angle
-		PL_BF_ZCOMP_Data = FXO.FXOS8700CQ_ReadByte(0x1C) 	#Read out contents of the register (can be read by all 
+		PL_BF_ZCOMP_Data = FXO.FXOS8700CQ_ReadByte(self._address,0x1C) 	#Read out contents of the register (can be read by all 
 		PL_BF_ZCOMP_Data &= 0xF8 						#Clear the last three bits of the register 
 		PL_BF_ZCOMP_Data |= 0x00 
 		
@@ -0,0 +1,151 @@
+#!/usr/bin/python
+
+"""
+Framebuffer.py: Converts PIL images to the 16-bit 565 RGB bytes the TFT display takes and finds which parts of a
+frame changed, so only those need to be sent.
+
+Has no hardware dependencies so it can be used and tested away from the Pi.
+
+__author__ = "D.Qendri"
+__copyright__ = "Copyright 2015 Sensorian"
+__license__ = "GPL V3"
+__version__ = "1.0"
+"""
+
+import numpy
+
+DIRTY_ROW_GAP = 4				# Changed rows this close together are sent as one rectangle
+DIRTY_MAX_RECTS = 4				# Most rectangles a partial refresh is split into
+DIRTY_FULL_FRACTION = 0.6		# Fraction of the full frame's bytes above which the whole frame is sent instead
+WINDOW_OVERHEAD = 11			# Bytes of the CASET, RASET and RAMWR commands and arguments per rectangle
+
+
+def color565(r, g, b):
+	"""
+	Convert red, green, blue components to a 16-bit 565 RGB value. 
+	Components should be values 0 to 255.
+	
+	
+	:param r: Red byte.
+	:param g: Green byte.
+	:param b: Blue byte.
+	:returns pixel : 16-bit 565 RGB value
+	"""
+	return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
+def image_to_data(image):
+	"""Generator function to convert a PIL image to 16-bit 565 RGB bytes.
+	
+	
+	:param image: PIL image
+	:returns imgArray : 
+	"""
+	pixels = image.convert('RGB').load()
+	width, height = image.size
+	for y in range(height):
+		for x in range(width):
+			r,g,b = pixels[(x,y)]
+			color = color565(r, g, b)
+			yield (color >> 8) & 0xFF
+			yield color & 0xFF
+
+def image_to_565(image, frame=None):
+	"""Converts a whole PIL image to big-endian 16-bit 565 RGB bytes at once with numpy.
+	Pass the bytearray returned by a previous call as frame to convert into it again instead of allocating a new one.
+	
+	
+	:param image: PIL image
+	:param frame: bytearray of width*height*2 bytes to convert into, or None to allocate one
+	:returns frame : bytearray of the image's 565 RGB data, two bytes a pixel
+	"""
+	if image.mode != 'RGB':
+		image = image.convert('RGB')
+	width, height = image.size
+	if frame is None or len(frame) != width * height * 2:
+		frame = bytearray(width * height * 2)
+	rgb = numpy.asarray(image)
+	color = numpy.empty((height, width), dtype=numpy.uint16)
+	channel = numpy.empty((height, width), dtype=numpy.uint16)
+	numpy.bitwise_and(rgb[:, :, 0], 0xF8, out=color)
+	numpy.left_shift(color, 8, out=color)
+	numpy.bitwise_and(rgb[:, :, 1], 0xFC, out=channel)
+	numpy.left_shift(channel, 3, out=channel)
+	numpy.bitwise_or(color, channel, out=color)
+	numpy.right_shift(rgb[:, :, 2], 3, out=channel)
+	numpy.bitwise_or(color, channel, out=color)
+	# Written through a big-endian view so the bytes land in the order the display reads them
+	numpy.frombuffer(frame, dtype='>u2').reshape(height, width)[:] = color
+	return frame
+
+def dirty_rectangles(frame, previous, width, height):
+	"""Finds the rectangles of pixels which differ between two 565 RGB frames of the same size.
+	Changed rows close together are merged into one rectangle spanning the columns changed in them, then the
+	nearest rectangles are merged until there are at most DIRTY_MAX_RECTS.
+	
+	
+	:param frame: bytearray of the new frame's 565 RGB data
+	:param previous: bytearray of the frame on the display
+	:param width: Width of the frames in pixels
+	:param height: Height of the frames in pixels
+	:returns rectangles : List of (x0, y0, x1, y1) inclusive bounds as setAddrWindow() takes, empty if nothing changed
+	"""
+	changed = numpy.frombuffer(frame, dtype=numpy.uint16).reshape(height, width) != \
+		numpy.frombuffer(previous, dtype=numpy.uint16).reshape(height, width)
+	rows = numpy.flatnonzero(changed.any(axis=1))
+	if len(rows) == 0:
+		return []
+	# Split the changed rows into bands wherever there is a large enough gap between them
+	splits = numpy.flatnonzero(numpy.diff(rows) > DIRTY_ROW_GAP) + 1
+	bands = [(band[0], band[-1]) for band in numpy.split(rows, splits)]
+	# Merge the neighbouring bands which add the fewest rows until few enough are left
+	while len(bands) > DIRTY_MAX_RECTS:
+		gaps = [bands[i + 1][0] - bands[i][1] for i in range(len(bands) - 1)]
+		i = gaps.index(min(gaps))
+		bands[i:i + 2] = [(bands[i][0], bands[i + 1][1])]
+	rectangles = []
+	for y0, y1 in bands:
+		columns = numpy.flatnonzero(changed[y0:y1 + 1].any(axis=0))
+		rectangles.append((int(columns[0]), int(y0), int(columns[-1]), int(y1)))
+	return rectangles
+
+def merge_rectangles(rectangles):
+	"""Merges rectangles which overlap or are within DIRTY_ROW_GAP rows of each other into their bounding
+	rectangle, then merges the nearest until there are at most DIRTY_MAX_RECTS.
+	
+	
+	:param rectangles: List of (x0, y0, x1, y1) inclusive bounds
+	:returns rectangles : List of merged (x0, y0, x1, y1) bounds ordered from top to bottom
+	"""
+	merged = []
+	for x0, y0, x1, y1 in sorted(rectangles, key=lambda rectangle: rectangle[1]):
+		if merged and y0 - merged[-1][3] <= DIRTY_ROW_GAP:
+			last = merged[-1]
+			merged[-1] = (min(last[0], x0), last[1], max(last[2], x1), max(last[3], y1))
+		else:
+			merged.append((x0, y0, x1, y1))
+	while len(merged) > DIRTY_MAX_RECTS:
+		gaps = [merged[i + 1][1] - merged[i][3] for i in range(len(merged) - 1)]
+		i = gaps.index(min(gaps))
+		first, second = merged[i], merged[i + 1]
+		merged[i:i + 2] = [(min(first[0], second[0]), first[1], max(first[2], second[2]), max(first[3], second[3]))]
+	return merged
+
+def window_bytes(rectangles):
+	"""Counts the bytes sent to the display to write the given rectangles, including their window commands.
+	
+	
+	:param rectangles: List of (x0, y0, x1, y1) inclusive bounds
+	:returns count : Integer number of bytes
+	"""
+	return sum((x1 - x0 + 1) * (y1 - y0 + 1) * 2 + WINDOW_OVERHEAD for x0, y0, x1, y1 in rectangles)
+
+def fits_partial(rectangles, width, height):
+	"""Decides whether sending just the given rectangles is worth it, rather than the whole frame.
+	
+	
+	:param rectangles: List of (x0, y0, x1, y1) inclusive bounds
+	:param width: Width of the frame in pixels
+	:param height: Height of the frame in pixels
+	:returns fits : True if the rectangles take at most DIRTY_FULL_FRACTION of the full frame's bytes
+	"""
+	return window_bytes(rectangles) <= width * height * 2 * DIRTY_FULL_FRACTION
@@ -224,21 +224,21 @@ class MCP79410(object):
 		:param none: 
 		:returns current_time : This is an RTCC class object that contains the time. 
 		"""
-		secondsFIX = self.bcd2dec( self.readRegister(SEC) &(~START_32KHZ)) #Access once before to fix
-		seconds = self.bcd2dec( self.readRegister(SEC) &(~START_32KHZ)) # mask out ST bit
-		minutes = self.bcd2dec( self.readRegister(MIN))
+		registers = self.readRegisters(SEC, 7)			#One burst so the time can't roll over between registers
+		seconds = self.bcd2dec( registers[SEC] &(~START_32KHZ)) # mask out ST bit
+		minutes = self.bcd2dec( registers[MIN])
 		
-		hour_t = self.readRegister(HOUR)
+		hour_t = registers[HOUR]
 		if((hour_t & HOUR_12) == HOUR_12):
-			(hour_t & 0x1F) 
+			hour_t &= 0x1F
 		else:
-			(hour_t & 0x3F)
+			hour_t &= 0x3F
 			
 		hours = self.bcd2dec(hour_t)		
-		weekday = self.bcd2dec( self.readRegister(DAY) & ~(OSCRUN|PWRFAIL|VBATEN))
-		date = self.bcd2dec( self.readRegister(DATE))   
-		month = self.bcd2dec( self.readRegister(MNTH) & ~(LPYR))  
-		year = self.bcd2dec( self.readRegister(YEAR))
+		weekday = self.bcd2dec( registers[DAY] & ~(OSCRUN|PWRFAIL|VBATEN))
+		date = self.bcd2dec( registers[DATE])   
+		month = self.bcd2dec( registers[MNTH] & ~(LPYR))  
+		year = self.bcd2dec( registers[YEAR])
 		
 		rtc_time=RTCC_Struct(seconds,minutes,hours,weekday,date,month,year)
 		
@@ -711,3 +711,14 @@ class MCP79410(object):
 		"""
 		result = bus.read_byte_data(self._address, rtcc_reg) & 0xFF
 		return result
+
+	def readRegisters(self,rtcc_reg,length):
+		"""
+		Read consecutive registers in a single block read.
+		
+		
+		:param rtcc_reg: Address of the first register.
+		:param length: Number of registers to read.
+		:returns: List of the register byte contents
+		"""
+		return bus.read_i2c_block_data(self._address, rtcc_reg, length)
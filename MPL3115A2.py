@@ -15,6 +15,59 @@ from ctypes import *
 
 MPL = CDLL("./libMPL.so")
 
+#Prototypes of the library's functions as (name, result type, argument types), so each call converts straight to
+#the C types rather than guessing from the Python values, and the float results aren't read as ints.
+MPL_PROTOTYPES = [
+	("I2C_Initialize", None, []),
+	("I2C_WriteByte", None, [c_ubyte, c_ubyte]),
+	("I2C_WriteByteRegister", None, [c_ubyte, c_ubyte, c_ubyte]),
+	("I2C_WriteWordRegister", None, [c_ubyte, c_ubyte, c_char_p]),
+	("I2C_WriteByteArray", None, [c_ubyte, c_ubyte, c_char_p, c_uint]),
+	("I2C_ReadByteRegister", c_ubyte, [c_ubyte, c_ubyte]),
+	("I2C_ReadByteArray", None, [c_ubyte, c_ubyte, c_char_p, c_uint]),
+	("I2C_ReadWordRegisterRS", c_uint, [c_ubyte, c_ubyte]),
+	("I2C_ReadWordPresetPointer", c_uint, []),
+	("MPL3115A2_Initialize", None, []),
+	("MPL3115A2_ID", c_ubyte, []),
+	("MPL3115A2_GetMode", c_ubyte, []),
+	("MPL3115A2_StandbyMode", None, []),
+	("MPL3115A2_ActiveMode", None, []),
+	("MPL3115A2_AltimeterMode", None, []),
+	("MPL3115A2_ReadAltitude", c_float, []),
+	("MPL3115A2_SetAltimeterOffset", None, [c_ubyte]),
+	("MPL3115A2_BarometerMode", None, []),
+	("MPL3115A2_SetPressureOffset", None, [c_ubyte]),
+	("MPL3115A2_GetMinimumPressure", c_float, []),
+	("MPL3115A2_GetMaximumPressure", c_float, []),
+	("MPL3115A2_ReadBarometicPressureInput", c_uint, []),
+	("MPL3115A2_ReadBarometricPressure", c_float, []),
+	("MPL3115A2_ReadPressure", c_float, [c_int]),
+	("MPL3115A2_SetPressureAlarmThreshold", None, [c_uint]),
+	("MPL3115A2_SetPressureTargetWindow", None, [c_uint, c_uint]),
+	("MPL3115A2_ReadTemperature", c_float, []),
+	("MPL3115A2_GetMinimumTemperature", c_float, []),
+	("MPL3115A2_GetMaximumTemperature", c_float, []),
+	("MPL3115A2_SetTempTargetWindow", None, [c_uint, c_uint]),
+	("MPL3115A2_SetTemperatureThreshold", None, [c_ubyte]),
+	("MPL3115A2_SetTempOffset", None, [c_ubyte]),
+	("MPL3115A2_OutputSampleRate", None, [c_ubyte]),
+	("MPL3115A2_SetAcquisitionTimeStep", None, [c_ubyte]),
+	("MPL3115A2_EnableEventFlags", None, []),
+	("MPL3115A2_ToggleOneShot", None, []),
+	("MPL3115A2_ClearInterrupts", None, []),
+	("MPL3115A2_ConfigureInterruptPin", None, [c_ubyte, c_ubyte]),
+	("MPL3115A2_ConfigurePressureInterrupt", None, []),
+	("MPL3115A2_ConfigureAltitudeInterrupt", None, []),
+	("MPL3115A2_ReadByte", c_ubyte, [c_ubyte, c_ubyte]),
+	("MPL3115A2_ReadByteArray", None, [c_ubyte, c_ubyte, c_char_p, c_uint]),
+	("MPL3115A2_WriteByte", None, [c_ubyte, c_ubyte, c_ubyte]),
+	("MPL3115A2_WriteByteArray", None, [c_ubyte, c_ubyte, c_char_p, c_uint])
+]
+for name, restype, argtypes in MPL_PROTOTYPES:
+	function = getattr(MPL, name)
+	function.restype = restype
+	function.argtypes = argtypes
+
 MPL3115A2_ADDRESS  = 0x60 			#7-bit I2C address for sensor
 
 #Sensor Memory map
@@ -68,9 +121,9 @@ OFF_H              =  0x2D
 
 
 #*********************Status **************************************/
-PTDR    = 0x04      #Pressure/Altitude OR Temperature data ready
-PDR     = 0x02      #Pressure/Altitude new data available
-TDR     = 0x01      #Temperature new Data Available.
+PTDR    = 0x08      #Pressure/Altitude OR Temperature data ready
+PDR     = 0x04      #Pressure/Altitude new data available
+TDR     = 0x02      #Temperature new Data Available.
 
 
 #*********************Control Register 1****************************/
@@ -91,7 +144,10 @@ OS_8   = OS1 | OS0              #  34 ms
 OS_16  = OS2                    #  66 ms
 OS_32  = OS2 | OS0              # 130 ms
 OS_64  = OS2 | OS1              # 258 ms
-OS_128 = OS2 | OS1 | OS2        # 512 ms
+OS_128 = OS2 | OS1 | OS0        # 512 ms
+
+# Seconds a one-shot conversion takes at each oversample ratio, indexed by the OS bits of CTRL_REG1
+CONVERSION_TIMES = [0.006, 0.010, 0.018, 0.034, 0.066, 0.130, 0.258, 0.512]
 
 BAR_MASK        = 0x80
 ALT_MASK        = 0xEF
@@ -105,6 +161,14 @@ DISABLED    = 0x00
 CIRCULAR    = 0x40
 FULL_STOP   = 0x80
 F_MODE      = DISABLED
+
+#*********************FIFO Status****************************/
+F_OVF       = 0x80			# FIFO overflowed, the oldest samples were lost
+F_WMRK_FLAG = 0x40			# FIFO reached the watermark
+F_CNT_MASK  = 0x3F			# Number of samples in the FIFO
+
+MPL3115A2_FIFO_SIZE = 32	# Most pressure/temperature samples the FIFO holds
+FIFO_SAMPLE_SIZE = 5		# Bytes per FIFO sample, 3 of pressure then 2 of temperature
 #*****************PT_DATA_CFG - Sensor data event flag register***********/
 DREM     	= 0x04			# Data Ready Event Mode
 PDEFE    	= 0x02 			# Pressure Data Event Flag Enabled
@@ -132,7 +196,7 @@ class MPL3115A2(object):
 		:param none: 
 		:returns Mode: 1 if in Active mode, 0 otherwise
 		"""
-		return MPL.MPL3115A2_Mode()
+		return MPL.MPL3115A2_GetMode()
 
 	def GetID(self):
 		"""
@@ -157,7 +221,7 @@ class MPL3115A2(object):
 		status = MPL.MPL3115A2_ReadByte(self._address,STATUS)
 		
 		#Check PDR bit, if it's not set then toggle OST
-		if((status & (1<< PDR)) == 0): 	
+		if((status & PDR) == 0): 	
 			MPL.MPL3115A2_ToggleOneShot()		#Toggle the OST bit causing the sensor to immediately take another reading
 		
 		m_pressure = MPL.MPL3115A2_ReadByte(self._address,OUT_P_MSB)
@@ -186,6 +250,106 @@ class MPL3115A2(object):
 		temperature = float(t_MSB + templsb)			#
 		return temperature
 
+	def StartConversion(self):
+		"""
+		Starts a one-shot pressure and temperature conversion and returns straight away without waiting for it.
+		The sensor must be in standby, as left by BarometerMode(). Check DataReady() for when it has finished.
+		
+		:param none: 
+		:returns delay: Seconds the conversion takes at the current oversample ratio
+		"""
+		ctrl_reg = MPL.MPL3115A2_ReadByte(self._address,CTRL_REG1) & 0xFF
+		MPL.MPL3115A2_WriteByte(self._address,CTRL_REG1, ctrl_reg | OST)	#OST clears itself once the conversion is done
+		return CONVERSION_TIMES[(ctrl_reg >> 3) & 0x07]
+
+	def DataReady(self):
+		"""
+		Checks the data ready flags for a finished pressure and temperature conversion.
+		
+		
+		:param none: 
+		:returns ready: True if new pressure and temperature values are both available
+		"""
+		status = MPL.MPL3115A2_ReadByte(self._address,STATUS) & 0xFF
+		return (status & (PDR | TDR)) == (PDR | TDR)
+
+	def ReadPressureTemperature(self):
+		"""
+		Reads the pressure and temperature in a single 5 byte burst, which also clears the data ready flags.
+		
+		
+		:param none: 
+		:returns (pressure, temperature): Pressure in Pa and temperature in degrees Celcius as floats
+		"""
+		buffer = create_string_buffer(FIFO_SAMPLE_SIZE)
+		MPL.I2C_ReadByteArray(self._address,OUT_P_MSB,buffer,FIFO_SAMPLE_SIZE)
+		return self.ConvertPressureTemperature(bytearray(buffer.raw))
+
+	def ConvertPressureTemperature(self, raw, offset=0):
+		"""
+		Converts the 5 bytes of a pressure and temperature sample, laid out the same in the output registers and FIFO.
+		
+		
+		:param raw: bytearray holding the sample
+		:param offset: index of the sample's first byte in raw
+		:returns (pressure, temperature): Pressure in Pa and temperature in degrees Celcius as floats
+		"""
+		pressure = ((raw[offset] << 16) | (raw[offset + 1] << 8) | raw[offset + 2]) / 64.0	#Unsigned 18.2 fixed point, left justified in 24 bits
+		temperature = (raw[offset + 3] << 8) | raw[offset + 4]							#Signed 8.4 fixed point, left justified in 16 bits
+		if temperature & 0x8000:
+			temperature -= 0x10000
+		return (pressure, temperature / 256.0)
+
+	def FIFOMode(self, timeStep):
+		"""
+		Starts logging pressure and temperature samples autonomously into the 32 sample FIFO, one every 2^timeStep
+		seconds, keeping the newest samples once it's full. Drain it with ReadFIFO() and stop it with OneShotMode().
+		
+		
+		:param timeStep: Acquisition time step from 0 to 15, samples are 2^timeStep seconds apart
+		:returns none: 
+		"""
+		ctrl_reg = MPL.MPL3115A2_ReadByte(self._address,CTRL_REG1) & 0xFF
+		ctrl_reg &= ~(SBYB | OST | ALT) & 0xFF
+		MPL.MPL3115A2_WriteByte(self._address,CTRL_REG1, ctrl_reg)				#Standby to change the settings
+		MPL.MPL3115A2_WriteByte(self._address,F_SETUP, DISABLED)				#The FIFO mode can only be changed from disabled
+		MPL.MPL3115A2_WriteByte(self._address,F_SETUP, CIRCULAR)
+		self.SetAcquisitionTimeStep(timeStep)
+		MPL.MPL3115A2_WriteByte(self._address,CTRL_REG1, ctrl_reg | SBYB)		#Active, sampling on every time step
+
+	def OneShotMode(self):
+		"""
+		Stops FIFO logging and leaves the sensor in standby in Barometer mode, ready for StartConversion().
+		
+		
+		:param none: 
+		:returns none: 
+		"""
+		ctrl_reg = MPL.MPL3115A2_ReadByte(self._address,CTRL_REG1) & 0xFF
+		ctrl_reg &= ~(SBYB | OST | ALT) & 0xFF
+		MPL.MPL3115A2_WriteByte(self._address,CTRL_REG1, ctrl_reg)
+		MPL.MPL3115A2_WriteByte(self._address,F_SETUP, DISABLED)
+
+	def ReadFIFO(self):
+		"""
+		Drains every sample logged in the FIFO in one burst read of the FIFO data register.
+		
+		
+		:param none: 
+		:returns (samples, overflowed): List of (pressure, temperature) tuples oldest first, and True if the FIFO
+		filled up and older samples were lost since it was last drained
+		"""
+		status = MPL.MPL3115A2_ReadByte(self._address,F_STATUS) & 0xFF
+		count = status & F_CNT_MASK
+		if count == 0:
+			return ([], bool(status & F_OVF))
+		length = count * FIFO_SAMPLE_SIZE
+		buffer = create_string_buffer(length)
+		MPL.I2C_ReadByteArray(self._address,F_DATA,buffer,length)
+		raw = bytearray(buffer.raw)
+		samples = [self.ConvertPressureTemperature(raw, offset) for offset in range(0, length, FIFO_SAMPLE_SIZE)]
+		return (samples, bool(status & F_OVF))
+
 	def BarometerMode(self):
 		"""
 		Sets the sensor in Barometer mode.
@@ -233,14 +397,7 @@ class MPL3115A2(object):
 		:param none: 
 		:returns none: Returns altitude as a float
 		"""
-		alt = MPL.MPL3115A2_ReadAltitude()
-		alt_m = alt >> 8 
-		alt_l = alt & 0xff
-		if (alt_l > 99):
-			alt_l = alt_l / 1000.0
-		else:
-			alt_l = alt_l / 100.0
-		return self.twosToInt(alt_m, 16) + alt_l
+		return MPL.MPL3115A2_ReadAltitude()					#The library already returns meters as a float
 
 	def StandbyMode(self):
 		"""
@@ -264,23 +421,29 @@ class MPL3115A2(object):
 
 	def OversampleRate(self, sampleRate):
 		"""
-		Sets the ovsersampling rate.
+		Sets the ovsersampling rate, a ratio of 2^sampleRate. Higher ratios give less noise but take longer, see
+		CONVERSION_TIMES. The sensor is left in standby or active mode as it was.
 		
 		
 		:param sampleRate: sampleRate is from 0 to 7
 		:returns none: 
 		"""
-		MPL.MPL3115A2_OversampleRate()
+		ctrl_reg = MPL.MPL3115A2_ReadByte(self._address,CTRL_REG1) & 0xFF
+		ctrl_reg &= ~OST & 0xFF
+		MPL.MPL3115A2_WriteByte(self._address,CTRL_REG1, ctrl_reg & ~SBYB & 0xFF)				#Go to Standby mode
+		ctrl_reg = (ctrl_reg & ~OS_128 & 0xFF) | ((sampleRate & 0x07) << 3)
+		MPL.MPL3115A2_WriteByte(self._address,CTRL_REG1, ctrl_reg)
 
 	def SetAcquisitionTimeStep(self,ST_Value):
 		"""
 		Set the acquisition time step.
 		
 		
-		:param ST_Value:  Time Step value
+		:param ST_Value:  Time Step value from 0 to 15, 2^ST_Value seconds between samples in active mode
 		:returns none: 
 		"""
-		MPL.MPL3115A2_SetAcquisitionTimeStep(ST_Value)
+		ctrl_reg = MPL.MPL3115A2_ReadByte(self._address,CTRL_REG2) & 0xF0
+		MPL.MPL3115A2_WriteByte(self._address,CTRL_REG2, ctrl_reg | (ST_Value & 0x0F))
 
 	def EnableEventFlags(self):
 		"""
@@ -291,7 +454,7 @@ class MPL3115A2(object):
 		:param none: 
 		:returns none: 
 		"""
-		MPL.MPL3115A2_enableEventFlags()
+		MPL.MPL3115A2_EnableEventFlags()
 
 	def ToggleOneShot(self):
 		"""
@@ -302,7 +465,7 @@ class MPL3115A2(object):
 		:param none: 
 		:returns none: 
 		"""
-		MPL.MPL3115A2_toggleOneShot()
+		MPL.MPL3115A2_ToggleOneShot()
 
 	def CofigureInterruptPin(self,interrupt,pin):
 		"""
@@ -313,7 +476,7 @@ class MPL3115A2(object):
 		:param pin: Only pin 1 is used
 		:returns none: 
 		"""
-		MPL.MPL3115A2_CofigureInterruptPin()
+		MPL.MPL3115A2_ConfigureInterruptPin(interrupt,pin)
 
 	def  WriteByte(self,address,reg,data):
 		"""
@@ -0,0 +1,42 @@
+#!/usr/bin/python
+
+"""MonotonicClock.py: A clock for timing which never goes backwards, under Python 2 as well as 3.
+
+Has no hardware dependencies so it can be used and tested away from the Pi.
+"""
+
+import ctypes
+import time
+
+__author__ = "Dylan Kauling"
+__maintainer__ = "Dylan Kauling"
+__status__ = "Development"
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+# CLOCK_MONOTONIC from linux/time.h, used when time.monotonic() isn't available under Python 2
+CLOCK_MONOTONIC = 1
+try:
+    _clock_gettime = ctypes.CDLL("librt.so.1", use_errno=True).clock_gettime
+    _clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(_Timespec)]
+except (OSError, AttributeError):
+    _clock_gettime = None
+
+
+def monotonic_time():
+    """Gets the time from a clock which never goes backwards, unlike time.time() when the RTC or NTP sets the clock.
+
+    Uses time.monotonic() when available, otherwise clock_gettime(CLOCK_MONOTONIC) from librt,
+    falling back on time.time() if neither can be found.
+    :return: Float of the monotonic time in seconds from an arbitrary starting point.
+    """
+    if hasattr(time, "monotonic"):
+        return time.monotonic()
+    if _clock_gettime is not None:
+        timespec = _Timespec()
+        if _clock_gettime(CLOCK_MONOTONIC, ctypes.byref(timespec)) == 0:
+            return timespec.tv_sec + timespec.tv_nsec * 1e-9
+    return time.time()
@@ -0,0 +1,97 @@
+/****************************************************************************
+ * Copyright (C) 2015 Sensorian
+ *                                                                          *
+ * This file is part of Sensorian.                                          *
+ *                                                                          *
+ *   Sensorian is free software: you can redistribute it and/or modify it   *
+ *   under the terms of the GNU Lesser General Public License as published  *
+ *   by the Free Software Foundation, either version 3 of the License, or   *
+ *   (at your option) any later version.                                    *
+ *                                                                          *
+ *   Sensorian is distributed in the hope that it will be useful,           *
+ *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+ *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+ *   GNU Lesser General Public License for more details.                    *
+ *                                                                          *
+ *   You should have received a copy of the GNU Lesser General Public       *
+ *   License along with Sensorian.                                          *
+ *   If not, see <http://www.gnu.org/licenses/>.                            *
+ ****************************************************************************/
+ 
+/**
+ * @file SensorianFrame/SensorianFrame.c
+ * @brief Reads every Sensorian sensor into one frame in a single call.
+ *
+ */
+ 
+#include <string.h>
+#include "SensorianFrame.h"
+#include "i2c.h"
+
+/**
+ * @brief Reads a burst of registers, returning if it succeeded.
+ * @param address Sensor address
+ * @param reg First register to read
+ * @param buffer Buffer to read into
+ * @param length Number of bytes to read
+ * @return 1 if the read succeeded, 0 otherwise
+ */
+static uint8_t Frame_ReadBurst(unsigned char address, char reg, char *buffer, unsigned int length)
+{
+	bcm2835_i2c_setSlaveAddress(address);
+	return bcm2835_i2c_read_register_rs(&reg, buffer, length) == BCM2835_I2C_REASON_OK;
+}
+
+/**
+ * @brief Initializes the I2C peripheral. The sensors are configured by their own drivers.
+ * @return none
+ */
+void Frame_Initialize(void)
+{
+	I2C_Initialize();
+}
+
+/**
+ * @brief Reads the IMU, barometer, light sensor and buttons into the frame in one call.
+ *        Nothing is written to the sensors, so no data ready or interrupt flags are cleared.
+ * @param frame Frame to fill in
+ * @return valid FRAME_ bits of the sensors read without an I2C error
+ */
+uint8_t Frame_Read(sensorian_frame_t *frame)
+{
+	char light[2];
+	uint8_t valid = 0;
+	memset(frame, 0, sizeof(sensorian_frame_t));
+
+	if (Frame_ReadBurst(FXOS8700CQ_ADDRESS, FXOS8700CQ_STATUS, (char *)frame->imu, FRAME_IMU_LEN))
+	{
+		valid |= FRAME_IMU;
+	}
+	if (Frame_ReadBurst(MPL3115A2_ADDRESS, MPL3115A2_STATUS, (char *)frame->barometer, FRAME_BAROMETER_LEN))
+	{
+		valid |= FRAME_BAROMETER;
+	}
+	uint8_t light_valid = Frame_ReadBurst(APDS9300_ADDRESS, APDS9300_DATA0, light, 2);
+	frame->light[0] = (uint8_t)light[0] | ((uint8_t)light[1] << 8);
+	light_valid &= Frame_ReadBurst(APDS9300_ADDRESS, APDS9300_DATA1, light, 2);
+	frame->light[1] = (uint8_t)light[0] | ((uint8_t)light[1] << 8);
+	if (light_valid)
+	{
+		valid |= FRAME_LIGHT;
+	}
+	if (Frame_ReadBurst(CAP1203_ADDRESS, CAP1203_GEN_STATUS, (char *)frame->buttons, FRAME_BUTTONS_LEN))
+	{
+		valid |= FRAME_BUTTONS;
+	}
+	frame->valid = valid;
+	return valid;
+}
+
+/**
+ * @brief Returns the size of a frame, to check it matches the Python Structure.
+ * @return size Bytes in a sensorian_frame_t
+ */
+unsigned int Frame_Size(void)
+{
+	return sizeof(sensorian_frame_t);
+}
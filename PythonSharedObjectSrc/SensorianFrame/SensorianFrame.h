@@ -0,0 +1,74 @@
+/****************************************************************************
+ * Copyright (C) 2015 Sensorian
+ *                                                                          *
+ * This file is part of Sensorian.                                          *
+ *                                                                          *
+ *   Sensorian is free software: you can redistribute it and/or modify it   *
+ *   under the terms of the GNU Lesser General Public License as published  *
+ *   by the Free Software Foundation, either version 3 of the License, or   *
+ *   (at your option) any later version.                                    *
+ *                                                                          *
+ *   Sensorian is distributed in the hope that it will be useful,           *
+ *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+ *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+ *   GNU Lesser General Public License for more details.                    *
+ *                                                                          *
+ *   You should have received a copy of the GNU Lesser General Public       *
+ *   License along with Sensorian.                                          *
+ *   If not, see <http://www.gnu.org/licenses/>.                            *
+ ****************************************************************************/
+ 
+/**
+ * @file SensorianFrame/SensorianFrame.h
+ * @brief Reads every Sensorian sensor into one frame in a single call.
+ *
+ */
+ 
+#ifndef __SENSORIANFRAME_H__
+#define __SENSORIANFRAME_H__
+
+#include <stdint.h>
+
+/*Sensor addresses*/
+#define FXOS8700CQ_ADDRESS		0x1E
+#define MPL3115A2_ADDRESS		0x60
+#define APDS9300_ADDRESS		0x29
+#define CAP1203_ADDRESS			0x28
+
+/*First register of each burst*/
+#define FXOS8700CQ_STATUS		0x00		//Status, then accelerometer and magnetometer in hybrid auto-increment
+#define MPL3115A2_STATUS		0x00		//Status, then pressure and temperature
+#define APDS9300_DATA0			0xAC		//COMMAND|WORD|DATA0LOW, channel 0 without clearing the interrupt
+#define APDS9300_DATA1			0xAE		//COMMAND|WORD|DATA1LOW, channel 1 without clearing the interrupt
+#define CAP1203_GEN_STATUS		0x02		//General status, then sensor inputs
+
+/*Length of each burst*/
+#define FRAME_IMU_LEN			13
+#define FRAME_BAROMETER_LEN		6
+#define FRAME_BUTTONS_LEN		2
+
+/*Bits of the valid field, set for each sensor read without an I2C error*/
+#define FRAME_IMU				0x01
+#define FRAME_BAROMETER			0x02
+#define FRAME_LIGHT				0x04
+#define FRAME_BUTTONS			0x08
+#define FRAME_ALL				0x0F
+
+/**
+ * A full Sensorian frame, the raw registers of each sensor laid out as the sensor sends them.
+ */
+typedef struct __attribute__((packed)) sensorian_frame {
+	/*@{*/
+	uint8_t valid;								/**< FRAME_ bits of the sensors read */
+	uint8_t imu[FRAME_IMU_LEN];					/**< FXOS8700CQ status, accelerometer and magnetometer */
+	uint8_t barometer[FRAME_BAROMETER_LEN];		/**< MPL3115A2 status, pressure and temperature */
+	uint16_t light[2];							/**< APDS9300 channel 0 and channel 1 counts */
+	uint8_t buttons[FRAME_BUTTONS_LEN];			/**< CAP1203 general status and sensor inputs */
+	/*@}*/
+} sensorian_frame_t;
+
+void 			Frame_Initialize(void);
+uint8_t 		Frame_Read(sensorian_frame_t *frame);
+unsigned int 	Frame_Size(void);
+
+#endif
@@ -0,0 +1,97 @@
+#!/usr/bin/python
+
+"""SensorHistory.py: Keeps the recent samples of each sensor channel in fixed-size ring buffers.
+
+Has no hardware dependencies so it can be used and tested away from the Pi.
+"""
+
+import threading
+import numpy
+
+__author__ = "Dylan Kauling"
+__maintainer__ = "Dylan Kauling"
+__status__ = "Development"
+
+
+class ChannelHistory(object):
+    """Fixed-capacity circular buffer of timestamps and values for one sensor channel.
+
+    Samples are stored in NumPy arrays of twice the capacity, each sample written both at its slot and one capacity
+    further on, so the latest samples are always contiguous and can be copied out in one slice.
+    Memory use is fixed when created at 32 bytes per sample of capacity.
+    The buffer's lock is held while appending and copying, so a read never sees a window shifted part way through.
+    Timestamps are kept in non-decreasing order, which get() relies on to find the samples since a time, so a sample
+    timestamped before the latest one stored is stored at the latest one's time instead.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = numpy.zeros(2 * capacity, dtype=numpy.float64)
+        self.values = numpy.zeros(2 * capacity, dtype=numpy.float64)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def append(self, timestamp, value):
+        """Adds a sample to the buffer, overwriting the oldest once full.
+
+        :param timestamp: Float monotonic time in seconds the sample was taken.
+        :param value: Integer/Float value of the sample.
+        """
+        self.lock.acquire()
+        try:
+            if self.count:
+                timestamp = max(timestamp, self.times[(self.count - 1) % self.capacity])
+            slot = self.count % self.capacity
+            self.times[slot] = self.times[slot + self.capacity] = timestamp
+            self.values[slot] = self.values[slot + self.capacity] = value
+            self.count += 1
+        finally:
+            self.lock.release()
+
+    def extend(self, timestamps, values):
+        """Adds a batch of samples to the buffer at once, overwriting the oldest once full.
+
+        :param timestamps: NumPy array of the Float monotonic times in seconds the samples were taken, oldest first.
+        :param values: NumPy array of the values of the samples, the same length as the timestamps.
+        """
+        count = len(values)
+        if count == 0:
+            return
+        self.lock.acquire()
+        try:
+            # Hold the batch to non-decreasing order, starting no earlier than the latest sample already stored
+            timestamps = numpy.maximum.accumulate(numpy.asarray(timestamps, dtype=numpy.float64))
+            if self.count:
+                timestamps = numpy.maximum(timestamps, self.times[(self.count - 1) % self.capacity])
+            if count > self.capacity:
+                timestamps = timestamps[-self.capacity:]
+                values = values[-self.capacity:]
+                self.count += count - self.capacity
+                count = self.capacity
+            slots = (self.count + numpy.arange(count)) % self.capacity
+            self.times[slots] = self.times[slots + self.capacity] = timestamps
+            self.values[slots] = self.values[slots + self.capacity] = values
+            self.count += count
+        finally:
+            self.lock.release()
+
+    def get(self, since=None, max_points=None):
+        """Gets a copy of the stored samples, oldest first.
+
+        The copies are the caller's to keep, later samples never change them.
+        :param since: Float monotonic time in seconds, only samples taken after it are returned. None for all.
+        :param max_points: Integer of the most samples to return, the latest are kept. None for no limit.
+        :return: Tuple of NumPy arrays of the timestamps and values.
+        """
+        self.lock.acquire()
+        try:
+            count = self.count
+            available = min(count, self.capacity)
+            end = count % self.capacity + self.capacity
+            start = end - available
+            if since is not None:
+                start += int(numpy.searchsorted(self.times[start:end], since, side='right'))
+            if max_points is not None and end - start > max_points:
+                start = end - max(max_points, 0)
+            return self.times[start:end].copy(), self.values[start:end].copy()
+        finally:
+            self.lock.release()
@@ -0,0 +1,115 @@
+#!/usr/bin/python
+
+"""
+__author__ = "Dylan Kauling"
+__copyright__ = "Copyright 2015 Sensorian"
+__license__ = "GPL V3"
+__version__ = "1.0"
+"""
+
+from ctypes import *
+
+FRAME = CDLL("./libFrame.so")
+
+FRAME_IMU_LEN = 13					#Status, accelerometer and magnetometer in hybrid auto-increment
+FRAME_BAROMETER_LEN = 6				#Status, pressure and temperature
+FRAME_BUTTONS_LEN = 2				#General status and sensor inputs
+
+#Bits of the valid field, set for each sensor read without an I2C error
+FRAME_IMU = 0x01
+FRAME_BAROMETER = 0x02
+FRAME_LIGHT = 0x04
+FRAME_BUTTONS = 0x08
+FRAME_ALL = 0x0F
+
+class SENSORIAN_FRAME(Structure):
+	"""A full Sensorian frame, the packed sensorian_frame_t the library fills in with the raw registers of each sensor."""
+	_pack_ = 1
+	_fields_ = [("valid", c_uint8),
+				("imu", c_uint8 * FRAME_IMU_LEN),
+				("barometer", c_uint8 * FRAME_BAROMETER_LEN),
+				("light", c_uint16 * 2),
+				("buttons", c_uint8 * FRAME_BUTTONS_LEN)]
+
+#Prototypes of the library's functions as (name, result type, argument types)
+FRAME_PROTOTYPES = [
+	("Frame_Initialize", None, []),
+	("Frame_Read", c_uint8, [POINTER(SENSORIAN_FRAME)]),
+	("Frame_Size", c_uint, [])
+]
+for name, restype, argtypes in FRAME_PROTOTYPES:
+	function = getattr(FRAME, name)
+	function.restype = restype
+	function.argtypes = argtypes
+
+class SensorianFrame(object):
+	"""
+	Reads the IMU, barometer, light sensor and buttons in one call into the library, rather than one per byte.
+	The sensors must already be set up by their own drivers, the frame only reads them.
+	"""
+
+	def __init__(self):
+		"""
+		Initializes the I2C bus and the frame read into, checking it's laid out the same as the library's.
+		
+		
+		:param none: 
+		:returns: none
+		"""
+		if FRAME.Frame_Size() != sizeof(SENSORIAN_FRAME):
+			raise ValueError("libFrame.so frames are " + str(FRAME.Frame_Size()) + " bytes, expected " +
+							 str(sizeof(SENSORIAN_FRAME)))
+		FRAME.Frame_Initialize()
+		self.frame = SENSORIAN_FRAME()
+		self._frameRef = byref(self.frame)
+
+	def read(self):
+		"""
+		Reads every sensor into the frame, which is reused by each read.
+		
+		
+		:param none: 
+		:returns: valid - FRAME_ bits of the sensors read without an I2C error
+		"""
+		return FRAME.Frame_Read(self._frameRef)
+
+	def imu(self):
+		"""
+		Returns the IMU registers of the last read, to convert with FXOS8700CQR1.convertHybrid().
+		
+		
+		:param none: 
+		:returns: bytearray of the status, accelerometer and magnetometer registers
+		"""
+		return bytearray(self.frame.imu)
+
+	def barometer(self):
+		"""
+		Returns the status and the pressure and temperature registers of the last read, to convert with
+		MPL3115A2.ConvertPressureTemperature(raw, 1).
+		
+		
+		:param none: 
+		:returns: bytearray of the status, pressure and temperature registers
+		"""
+		return bytearray(self.frame.barometer)
+
+	def lightChannels(self):
+		"""
+		Returns the light channels of the last read, at whatever gain and integration time the sensor is set to.
+		
+		
+		:param none: 
+		:returns: Tuple of the channel 0 and channel 1 counts
+		"""
+		return (self.frame.light[0], self.frame.light[1])
+
+	def touches(self):
+		"""
+		Returns which buttons were touched in the last read.
+		
+		
+		:param none: 
+		:returns: touches - Bits of the touched inputs, CS1 to CS3, 0 if none
+		"""
+		return self.frame.buttons[1] & 0x07
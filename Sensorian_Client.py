@@ -12,6 +12,10 @@ import requests
 import json
 import time
 import datetime
+import math
+import numbers
+import random
+import numpy
 from PIL import Image
 from PIL import ImageDraw
 from PIL import ImageFont
@@ -21,7 +25,14 @@ import MPL3115A2 as ALTIBAR
 import CAP1203 as CAP_TOUCH
 import MCP79410RTCC as RT_CLOCK
 import FXOS8700CQR1 as ACCEL_SENSOR
+from SensorHistory import ChannelHistory
+from MonotonicClock import monotonic_time
+from BusManager import BusManager, BUS_PRIORITY_INPUT, BUS_PRIORITY_IMU, BUS_PRIORITY_ENVIRONMENT, \
+    BUS_PRIORITY_HOUSEKEEPING
 import threading
+import collections
+import heapq
+import Queue
 import socket
 import fcntl
 import struct
@@ -42,6 +53,7 @@ CapTouch = None
 RTC = None
 imuSensor = None
 AltiBar = None
+LightSensor = None
 font = None
 disp = None
 sensehat = None
@@ -68,11 +80,15 @@ def sensorian_setup():
     global AltiBar
     AltiBar = ALTIBAR.MPL3115A2()
     AltiBar.ActiveMode()
+    # Leaves the Barometer in standby, where each update starts a one-shot conversion
     AltiBar.BarometerMode()
-    # print "Giving the Barometer 2 seconds or it won't work"
-    time.sleep(2)
     global CapTouch
     CapTouch = CAP_TOUCH.CAP1203()
+    # Kept powered on so it auto-ranges between reads rather than starting over each time
+    global LightSensor
+    LightSensor = LUX_SENSOR.APDS9300(monotonic_time)
+    # Report up to two buttons touched at once
+    CapTouch.configureMultiTouch(2, CAP_TOUCH.CS1 | CAP_TOUCH.CS2 | CAP_TOUCH.CS3)
 
     # Prepare an object for drawing on the TFT LCD
     global disp
@@ -81,16 +97,22 @@ def sensorian_setup():
     disp.clear()
     global font
     font = ImageFont.truetype('/usr/share/fonts/truetype/freefont/FreeSansBold.ttf', 14)  # use a truetype font
+    global displayThread
+    displayThread = DisplayThread()
+    displayThread.start()
 
     # Set up the GPIO for the touch buttons and LED
     GPIO.setup(CAP_PIN, GPIO.IN)
     GPIO.setup(LED_PIN, GPIO.OUT)
+    global buttonDispatcher
+    buttonDispatcher = ButtonDispatcherThread()
+    buttonDispatcher.start()
     GPIO.add_event_detect(CAP_PIN, GPIO.FALLING)
     GPIO.add_event_callback(CAP_PIN, button_event_handler)
 
-    # Enable interrupts on the buttons
+    # Enable interrupts on the buttons, on release as well so the dispatcher can time how long they're held
     CapTouch.clearInterrupt()
-    CapTouch.enableInterrupt(0, 0, 0x07)
+    CapTouch.enableInterrupt(0, 1, 0x07)
 
 
 def sense_hat_setup():
@@ -98,145 +120,876 @@ def sense_hat_setup():
     sensehat = SenseHat()
 
 
-# Thread sentinels - Threads stop looping when disabled
-timeEnabled = True
-ambientEnabled = True
-lightEnabled = True
-cpuEnabled = True
-interfaceIPEnabled = True
-publicIPEnabled = True
-accelEnabled = True
-pressureEnabled = True
-buttonEnabled = True
-sendEnabled = False
-flaskEnabled = False
-socketEnabled = False
-magnetEnabled = True
-
-# Global sensor/IP variables protected by locks below if required
-currentDateTime = datetime.datetime(2000, 1, 1, 0, 0, 0)
-cpuSerial = "0000000000000000"
-light = -1
-ambientTemp = -1
-cpuTemp = -1
-mode = -1
-accelX = 0
-accelY = 0
-accelZ = 0
-modeprevious = -1
-ambientPressure = -1
-watchedInterface = "eth0"
-interfaceIP = "0.0.0.0"
-publicIP = "0.0.0.0"
-serverURL = "http://localhost/"
-iftttEvent = "SensorianEvent"
-iftttKey = "xxxxxxxxxxxxxxxxxxxxxx"
-button = 0
-displayEnabled = True
-printEnabled = False
-lockOrientation = False
-hatEnabled = True
-hatUsed = "Sensorian"
-defaultOrientation = 0
-sleepTime = 1
-postInterval = 4
-postTimeout = 5
-ambientInterval = 5
-lightInterval = 1
-cpuTempInterval = 5
-interfaceInterval = 5
-publicInterval = 30
-accelInterval = 1
+class SensorBackend(object):
+    """Base sensor backend used when no hat is enabled, or one without a backend of its own is chosen.
+
+    A backend reads the sensors of one kind of hat and publishes their values. setup() picks one once with
+    select_backend() and the scheduler calls its bound update methods directly, so adding support for a new hat
+    only needs a new subclass added to the backends dictionary.
+    The base backend only keeps the date and time from the system clock, the other updates do nothing.
+    """
+    name = "None"
+    # If the hat has the TFT LCD display_values() draws to
+    hasDisplay = False
+    # What the raw accelerometer values are divided by to get them in g when sending values
+    accelScale = 1.0
+    # If the accelerometer and magnetometer are read, kept in step with the config by set_imu_enabled() so the
+    # high-rate IMU updates don't look them up each sample
+    accelEnabled = True
+    magnetEnabled = True
+
+    def setup(self):
+        """Initializes the hat's sensors. Called once by setup() after the backend is selected.
+        """
+        pass
+
+    def cleanup(self):
+        """Releases the hat's sensors. Called once by cleanup().
+        """
+        pass
+
+    def update_light(self):
+        """Updates the light value in the sensor snapshot.
+        """
+        pass
+
+    def update_ambient(self):
+        """Updates the ambient temperature and pressure in the sensor snapshot.
+        """
+        pass
+
+    def update_date_time(self):
+        """Updates the date/time in the sensor snapshot from the system clock.
+        """
+        publish_values(date_time=datetime.datetime.now())
+
+    def update_accelerometer(self):
+        """Updates the acceleration and orientation in the sensor snapshot.
+        """
+        pass
+
+    def update_magnetometer(self):
+        """Updates the magnetic forces in the sensor snapshot.
+        """
+        pass
+
+    def update_imu(self):
+        """Updates whichever of the acceleration and magnetic forces are enabled in the sensor snapshot.
+        """
+        if self.accelEnabled:
+            self.update_accelerometer()
+        if self.magnetEnabled:
+            self.update_magnetometer()
+
+    def set_imu_enabled(self, accel, magnet):
+        """Sets which of the accelerometer and magnetometer the IMU updates read.
+
+        :param accel: Boolean of if the accelerometer is read.
+        :param magnet: Boolean of if the magnetometer is read.
+        """
+        self.accelEnabled = accel
+        self.magnetEnabled = magnet
+
+    def set_accel_mode(self, mode):
+        """Switches how the accelerometer is read, only polling is supported unless overridden.
+
+        :param mode: String of the mode, one of accelModes.
+        """
+        if mode != "Poll":
+            print(self.name + " can't " + mode.lower() + " the accelerometer, polling it instead")
+
+    def set_ambient_mode(self, mode):
+        """Switches how the ambient temperature and pressure are measured, only one-shot is supported unless
+        overridden.
+
+        :param mode: String of the mode, one of ambientModes.
+        """
+        if mode != "OneShot":
+            print(self.name + " can't log the ambient sensor in its FIFO, measuring it one-shot instead")
+
+    def set_light_mode(self, mode):
+        """Switches how the light is read, only polling is supported unless overridden.
+
+        :param mode: String of the mode, one of lightModes.
+        """
+        if mode != "Poll":
+            print(self.name + " can't report the light on threshold interrupts, polling it instead")
+
+    def get_clock_stats(self):
+        """Gets how the backend's real-time clock compares to the monotonic clock, empty if it has none.
+
+        :return: Dictionary of the clock statistics.
+        """
+        return {}
+
+    def show_message(self, message):
+        """Shows a short message on the hat, if it has somewhere to show one.
+
+        :param message: String of the message to show.
+        """
+        pass
+
+
+class SensorianBackend(SensorBackend):
+    """Sensor backend for the Sensorian Shield, using its ambient light sensor, altimeter/barometer,
+    accelerometer/magnetometer and real-time clock.
+    """
+    name = "Sensorian"
+    hasDisplay = True
+    # The Sensorian accelerometer's counts are converted to mg in every mode
+    accelScale = 1000.0
+
+    def __init__(self):
+        """Initializes the backend with the accelerometer being polled.
+        """
+        self.accelMode = "Poll"
+        self.streamRate = None
+        self.lastStreamTime = None
+        self.streamOverflows = 0
+        self.interruptThread = None
+        self.interruptSamples = 0
+        self.lastInterruptSamples = 0
+        self.interruptMisses = 0
+        self.ambientConverting = False
+        self.ambientStarted = 0
+        self.ambientDelay = 0
+        self.ambientMode = "OneShot"
+        self.ambientStep = 1
+        self.ambientOverflows = 0
+        self.lightMode = "Poll"
+        self.lightInterruptThread = None
+        self.lightPending = False
+        self.clockAnchor = None
+        self.clockStart = None
+        self.clockOffset = 0
+        self.clockDrift = 0
+        self.clockResyncs = 0
+        self.clockCorrections = 0
+
+    def setup(self):
+        """Initializes the Sensorian's sensors, display and button interrupts.
+        """
+        sensorian_setup()
+        self.set_accel_mode(get_config("accelmode"))
+        self.set_ambient_mode(get_config("ambientmode"))
+        self.set_light_mode(get_config("lightmode"))
+
+    def cleanup(self):
+        """Stops reading the IMU, light sensor and buttons on interrupts and sending frames to the LCD, waits for those
+        threads to finish and then releases the GPIO pins.
+        """
+        for running_thread in (self.interruptThread, self.lightInterruptThread):
+            if running_thread is not None:
+                running_thread.stop()
+                running_thread.join()
+        # The dispatcher draws frames and the display thread drives the LCD pins, so both finish before GPIO.cleanup()
+        for running_thread in (buttonDispatcher, displayThread):
+            if running_thread is not None:
+                running_thread.stop()
+                running_thread.join()
+        GPIO.cleanup()
+
+    def set_accel_mode(self, mode):
+        """Switches between polling the accelerometer and magnetometer together, streaming the accelerometer alone
+        and reading both as soon as the data ready interrupt says there's a new sample.
+
+        When streaming, the IMU job is limited to draining the FIFO by the time it reaches the watermark. With the
+        interrupt, the IMU job only reads a sample itself if no interrupt came since it last ran, in case one was
+        missed and the interrupt line was left waiting for a read.
+        :param mode: String of the mode, one of accelModes.
+        """
+        # Undo the mode being left first
+        if self.accelMode == "Stream":
+            bus_transaction("FXOS8700CQ", imuSensor.pollMode, BUS_PRIORITY_IMU)
+            jobIntervalLimits.pop("UpdateIMU", None)
+        elif self.accelMode == "Interrupt":
+            GPIO.remove_event_detect(ACCEL_PIN)
+            self.interruptThread.stop()
+            self.interruptThread = None
+            bus_transaction("FXOS8700CQ", lambda: imuSensor.dataReadyInterrupt(False), BUS_PRIORITY_IMU)
+
+        if mode == "Stream":
+            rate = get_config("accelstreamrate")
+            watermark = get_config("accelwatermark")
+            bus_transaction("FXOS8700CQ", lambda: imuSensor.streamMode(rate, watermark), BUS_PRIORITY_IMU)
+            self.streamRate = rate
+            self.lastStreamTime = None
+            jobIntervalLimits["UpdateIMU"] = float(watermark) / rate
+        elif mode == "Interrupt":
+            bus_transaction("FXOS8700CQ", lambda: imuSensor.dataReadyInterrupt(True), BUS_PRIORITY_IMU)
+            self.interruptThread = InterruptThread(5, "IMUInterruptThread", self.read_imu_interrupt)
+            self.interruptThread.start()
+            GPIO.setup(ACCEL_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+            GPIO.add_event_detect(ACCEL_PIN, GPIO.FALLING, callback=self.interruptThread.trigger)
+            # Read any sample already waiting so the line is released and the next sample causes an edge
+            self.interruptThread.trigger()
+        self.accelMode = mode
+
+    def set_ambient_mode(self, mode):
+        """Switches between one-shot conversions and logging the barometer in its FIFO, at the oversampling of the
+        configured ambient profile.
+
+        When logging, the Ambient job is limited to draining the FIFO by the time it's half full.
+        :param mode: String of the mode, one of ambientModes.
+        """
+        oversample = ambientProfiles[get_config("ambientprofile")]
+        step = get_config("ambientfifostep")
+
+        def configure():
+            AltiBar.OneShotMode()
+            AltiBar.OversampleRate(oversample)
+            if mode == "FIFO":
+                AltiBar.FIFOMode(step)
+
+        bus_transaction("MPL3115A2", configure, BUS_PRIORITY_ENVIRONMENT)
+        self.ambientConverting = False
+        if mode == "FIFO":
+            self.ambientStep = 2 ** step
+            jobIntervalLimits["UpdateAmbient"] = float(ALTIBAR.MPL3115A2_FIFO_SIZE) / 2 * self.ambientStep
+        else:
+            jobIntervalLimits.pop("UpdateAmbient", None)
+        self.ambientMode = mode
+
+    def set_light_mode(self, mode):
+        """Switches between polling the ambient light sensor and reading it only when its threshold interrupt says
+        the light changed by more than the configured fraction.
+
+        With the interrupt, the Light job only reads the sensor itself if the interrupt line is being held waiting
+        for a read or a range change left a reading to be taken.
+        :param mode: String of the mode, one of lightModes.
+        """
+        # Undo the mode being left first
+        if self.lightMode == "Threshold":
+            GPIO.remove_event_detect(INT_PIN)
+            self.lightInterruptThread.stop()
+            self.lightInterruptThread = None
+            bus_transaction("APDS9300", lambda: LightSensor.setInterruptState(False), BUS_PRIORITY_ENVIRONMENT)
+
+        self.lightMode = mode
+        if mode == "Threshold":
+            bus_transaction("APDS9300", lambda: LightSensor.setInterruptState(True), BUS_PRIORITY_ENVIRONMENT)
+            self.lightInterruptThread = InterruptThread(6, "LightInterruptThread", self.read_light_interrupt)
+            self.lightInterruptThread.start()
+            GPIO.setup(INT_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+            GPIO.add_event_detect(INT_PIN, GPIO.FALLING, callback=self.lightInterruptThread.trigger)
+            # Read once to set the first threshold window around the current light
+            self.lightInterruptThread.trigger()
+
+    def update_light(self):
+        """Updates the light value in the sensor snapshot by reading the Lux value from the ambient light sensor.
+
+        On threshold interrupts, only reads it if an interrupt was missed or a reading is pending.
+        """
+        if self.lightMode == "Threshold" and not self.lightPending and GPIO.input(INT_PIN):
+            return
+        self.read_light()
+
+    def read_light_interrupt(self):
+        """Reads the light after the threshold interrupt said it changed. Called on the light interrupt thread.
+        """
+        if check_sentinel("UpdateLight"):
+            self.read_light()
+
+    def read_light(self):
+        """Reads the Lux value from the ambient light sensor, which also clears its interrupt, and publishes it.
+
+        When the sensor changes range, a one-shot job reads it again once the new range has a reading. On threshold
+        interrupts, the threshold window is moved to the new reading.
+        """
+        threshold = self.lightMode == "Threshold"
+        fraction = get_config("lightthreshold")
+
+        def read_lux():
+            lux, delay = LightSensor.readLux()
+            if threshold and lux is not None and not delay:
+                LightSensor.setThresholdWindow(fraction)
+            return lux, delay
+
+        # Sometimes it excepts, so catch it if it does
+        try:
+            temp_light, delay = bus_transaction("APDS9300", read_lux, BUS_PRIORITY_ENVIRONMENT,
+                                                key=("APDS9300", "lux"))
+        except:
+            print("EXCEPTION IN LIGHT UPDATE")
+            publish_values(light=-1)
+            return
+        self.lightPending = bool(delay)
+        if delay:
+            get_scheduler("UpdateLight").add_oneshot("LightSettle", delay, "UpdateLight")
+        if temp_light is not None:
+            publish_values(light=temp_light)
+
+    def update_ambient(self):
+        """Moves the ambient temperature and pressure measurement on a step by using the Altibar sensor, never waiting.
+
+        Starts a one-shot conversion and schedules a one-shot job to collect it when it should be done. Once the data
+        ready flags show it finished, the pressure and temperature are read in one burst and published together so
+        readers never see a temperature and pressure from different updates. A conversion which never finishes is
+        started again. When logging in the FIFO, the samples it logged are drained instead.
+        """
+        if self.ambientMode == "FIFO":
+            self.update_ambient_fifo()
+            return
+        now = monotonic_time()
+        if self.ambientConverting:
+            ready = bus_transaction("MPL3115A2", AltiBar.DataReady, BUS_PRIORITY_ENVIRONMENT,
+                                    key=("MPL3115A2", "status"))
+            if ready:
+                self.ambientConverting = False
+                press, temp = bus_transaction("MPL3115A2", AltiBar.ReadPressureTemperature, BUS_PRIORITY_ENVIRONMENT,
+                                              key=("MPL3115A2", "data"))
+                # Check to see if pressure is desired
+                if get_config("pressureenabled"):
+                    publish_values(ambient_temp=temp, ambient_pressure=press)
+                else:
+                    publish_values(ambient_temp=temp)
+                    print("NoPressureNeeded")
+                return
+            if now - self.ambientStarted < ambientTimeout * self.ambientDelay:
+                # Not done yet, check again shortly
+                get_scheduler("UpdateAmbient").add_oneshot("AmbientCollect", self.ambientDelay / 8, "UpdateAmbient")
+                return
+        self.ambientDelay = bus_transaction("MPL3115A2", AltiBar.StartConversion, BUS_PRIORITY_ENVIRONMENT)
+        self.ambientStarted = now
+        self.ambientConverting = True
+        get_scheduler("UpdateAmbient").add_oneshot("AmbientCollect", self.ambientDelay, "UpdateAmbient")
+
+    def update_ambient_fifo(self):
+        """Drains the pressure and temperature samples the Altibar sensor logged in its FIFO and publishes them.
+
+        The samples are published to the ambient_stream channel with timestamps counted back from now a time step
+        apart, as the sensor doesn't timestamp them.
+        """
+        samples, overflowed = bus_transaction("MPL3115A2", AltiBar.ReadFIFO, BUS_PRIORITY_ENVIRONMENT,
+                                              key=("MPL3115A2", "fifo"))
+        if overflowed:
+            self.ambientOverflows += 1
+        if not samples:
+            return
+        samples = numpy.array(samples)
+        timestamps = monotonic_time() - numpy.arange(len(samples) - 1, -1, -1) * float(self.ambientStep)
+        # Check to see if pressure is desired
+        if get_config("pressureenabled"):
+            publish_stream("ambient_stream", timestamps, samples, ("ambient_pressure", "ambient_temp"))
+        else:
+            publish_stream("ambient_stream", timestamps, samples[:, 1:], ("ambient_temp",))
+
+    def update_date_time(self):
+        """Updates the date/time in the sensor snapshot from the monotonic clock, anchored to the real-time clock.
+
+        The real-time clock is only read to resync the anchor every RTC resync interval.
+        """
+        now = monotonic_time()
+        if self.clockAnchor is None or now - self.clockAnchor[0] >= get_config("rtcresyncinterval"):
+            self.resync_clock()
+        anchor_time, anchor_date_time = self.clockAnchor
+        temp_date_time = anchor_date_time + datetime.timedelta(seconds=monotonic_time() - anchor_time)
+        publish_values(date_time=temp_date_time.replace(microsecond=0))
+
+    def resync_clock(self):
+        """Reads the real-time clock and moves the anchor of the date/time to it, measuring the drift between them.
+
+        The real-time clock only counts whole seconds, so the date/time is in step while it's up to a second ahead.
+        It's only moved when it's further out, keeping the fraction of a second the monotonic clock kept track of.
+        """
+        rtc_time = bus_transaction("MCP79410", RTC.GetTime, BUS_PRIORITY_HOUSEKEEPING, key=("MCP79410", "time"))
+        now = monotonic_time()
+        temp_date = datetime.date(2000 + rtc_time.year, rtc_time.month, rtc_time.date)
+        temp_time = datetime.time(rtc_time.hour, rtc_time.min, rtc_time.sec)
+        rtc_date_time = datetime.datetime.combine(temp_date, temp_time)
+        self.clockResyncs += 1
+        if self.clockAnchor is None:
+            self.clockStart = (now, rtc_date_time)
+            self.clockAnchor = (now, rtc_date_time)
+            return
+        anchor_time, anchor_date_time = self.clockAnchor
+        derived = anchor_date_time + datetime.timedelta(seconds=now - anchor_time)
+        self.clockOffset = (derived - rtc_date_time).total_seconds()
+        corrected = min(max(derived, rtc_date_time), rtc_date_time + datetime.timedelta(microseconds=999999))
+        if corrected != derived:
+            self.clockCorrections += 1
+        self.clockAnchor = (now, corrected)
+        start_time, start_date_time = self.clockStart
+        elapsed = now - start_time
+        if elapsed > 0:
+            self.clockDrift = ((rtc_date_time - start_date_time).total_seconds() - elapsed) / elapsed * 1000000
+
+    def get_clock_stats(self):
+        """Gets how the real-time clock compares to the monotonic clock the date/time is derived from.
+
+        :return: Dictionary of the number of resyncs, how many moved the date/time, the seconds the date/time was
+        ahead of the real-time clock at the last resync and the drift of the real-time clock in parts per million,
+        positive when it runs fast. The drift is only accurate to a second over the time since the first resync.
+        """
+        return {'resyncs': self.clockResyncs, 'corrections': self.clockCorrections, 'offset': self.clockOffset,
+                'drift': self.clockDrift}
+
+    def update_accelerometer(self):
+        """Updates the acceleration and orientation in the sensor snapshot by polling the Accelerometer.
+
+        All three axes and the orientation are published together so they always come from the same sample, converted
+        from counts to the backend's units like the stream.
+        """
+        def read_accelerometer():
+            # If the accelerometer is ready, read the orientation and forces
+            if imuSensor.readStatusReg() & 0x80:
+                return imuSensor.pollAccelerometer() + (imuSensor.getOrientation(),)
+            return None
+
+        sample = bus_transaction("FXOS8700CQ", read_accelerometer, BUS_PRIORITY_IMU, imuDeadline,
+                                 ("FXOS8700CQ", "accelerometer"))
+        if sample is not None:
+            x, y, z, orienta = sample
+            scale = self.accelScale / ACCEL_SENSOR.ACCEL_COUNTS_PER_G
+            publish_values(accel_x=x * scale, accel_y=y * scale, accel_z=z * scale, mode=(orienta >> 1) & 0x03)
+
+    def update_magnetometer(self):
+        """Updates the magnetic forces in the sensor snapshot by polling the Magnetometer.
+
+        All three axes are published together so they always come from the same sample.
+        """
+        def read_magnetometer():
+            # If the magnetometer is ready, read the magnetic forces
+            if imuSensor.readStatusReg() & 0x80:
+                return imuSensor.pollMagnetometer()
+            return None
+
+        sample = bus_transaction("FXOS8700CQ", read_magnetometer, BUS_PRIORITY_IMU, imuDeadline,
+                                 ("FXOS8700CQ", "magnetometer"))
+        if sample is not None:
+            magnet_x, magnet_y, magnet_z = sample
+            publish_values(mag_x=magnet_x, mag_y=magnet_y, mag_z=magnet_z)
+
+    def update_imu(self):
+        """Updates the IMU values in the sensor snapshot however the accelerometer is set to be read.
+
+        Drains the FIFO when streaming, polls a sample otherwise unless the data ready interrupt is already reading
+        them as they come.
+        """
+        if self.accelMode == "Stream":
+            self.update_accel_stream()
+            return
+        if self.accelMode == "Interrupt":
+            if self.interruptSamples != self.lastInterruptSamples:
+                self.lastInterruptSamples = self.interruptSamples
+                return
+            self.interruptMisses += 1
+        self.poll_imu()
+
+    def read_imu_interrupt(self):
+        """Reads the new sample the data ready interrupt announced. Called on the IMU interrupt thread.
+        """
+        if check_sentinel("UpdateIMU"):
+            self.interruptSamples += 1
+            self.poll_imu()
+
+    def poll_imu(self):
+        """Updates the acceleration, orientation and magnetic forces in the sensor snapshot from one hybrid sample.
+
+        When both are enabled the accelerometer and magnetometer are read together in a single burst, plus one read
+        for the orientation, and published together so they always come from the same instant. The acceleration is
+        converted from counts to the backend's units like the stream.
+        """
+        if not (self.accelEnabled and self.magnetEnabled):
+            SensorBackend.update_imu(self)
+            return
+
+        def read_imu():
+            status, accel, magnet = imuSensor.pollHybrid()
+            # If there's a new sample, read the orientation to go with it
+            if status & ACCEL_SENSOR.ZYXDR_MASK:
+                return accel + magnet + (imuSensor.getOrientation(),)
+            return None
+
+        sample = bus_transaction("FXOS8700CQ", read_imu, BUS_PRIORITY_IMU, imuDeadline, ("FXOS8700CQ", "hybrid"))
+        if sample is not None:
+            x, y, z, magnet_x, magnet_y, magnet_z, orienta = sample
+            scale = self.accelScale / ACCEL_SENSOR.ACCEL_COUNTS_PER_G
+            publish_values(accel_x=x * scale, accel_y=y * scale, accel_z=z * scale, mode=(orienta >> 1) & 0x03,
+                           mag_x=magnet_x, mag_y=magnet_y, mag_z=magnet_z)
+
+    def update_accel_stream(self):
+        """Drains the accelerometer FIFO in one burst and publishes the samples to the accel_stream channel.
+
+        Timestamps carry on from the last batch at the data rate, nudged towards the time of the read so they can't
+        drift from the Pi's clock, and start again from the time of the read after an overflow loses samples.
+        None are earlier than the last batch's latest, so the history stays in order when the read comes early.
+        """
+        samples, overflowed = bus_transaction("FXOS8700CQ", imuSensor.readFIFO, BUS_PRIORITY_IMU,
+                                              key=("FXOS8700CQ", "fifo"))
+        now = monotonic_time()
+        count = len(samples)
+        if overflowed:
+            self.streamOverflows += 1
+        if count == 0:
+            return
+        period = 1.0 / self.streamRate
+        latest = now
+        if self.lastStreamTime is not None and not overflowed:
+            expected = self.lastStreamTime + count * period
+            if abs(now - expected) < ACCEL_SENSOR.FXOS8700CQ_FIFO_SIZE * period:
+                latest = expected + (now - expected) * streamClockCorrection
+        timestamps = latest - numpy.arange(count - 1, -1, -1) * period
+        if self.lastStreamTime is not None:
+            timestamps = numpy.maximum(timestamps, self.lastStreamTime)
+        self.lastStreamTime = timestamps[-1]
+        publish_stream("accel_stream", timestamps, samples, ("accel_x", "accel_y", "accel_z"),
+                       self.accelScale / ACCEL_SENSOR.ACCEL_COUNTS_PER_G)
+
+
+class SenseHatBackend(SensorBackend):
+    """Sensor backend for the Raspberry Pi Sense HAT, using its environmental sensors, IMU and LED matrix.
+
+    The Sense HAT has no light sensor or real-time clock, so light is always -1 and time comes from the system clock.
+    """
+    name = "Sense HAT"
+
+    def setup(self):
+        """Initializes the Sense HAT.
+        """
+        sense_hat_setup()
+
+    def update_light(self):
+        """Publishes a light value of -1 as the Sense HAT has no light sensor.
+        """
+        publish_values(light=-1)
+
+    def update_ambient(self):
+        """Updates the ambient temperature and pressure in the sensor snapshot from the Sense HAT.
+        """
+        # Read the ambient temperature
+        temp = bus_transaction("HTS221", lambda: sensehat.temperature, BUS_PRIORITY_ENVIRONMENT,
+                               key=("HTS221", "temperature"))
+        # Check to see if pressure is desired, if so read it as well
+        if get_config("pressureenabled"):
+            press = bus_transaction("LPS25H", lambda: sensehat.pressure, BUS_PRIORITY_ENVIRONMENT,
+                                    key=("LPS25H", "pressure"))
+            publish_values(ambient_temp=temp, ambient_pressure=press)
+        else:
+            publish_values(ambient_temp=temp)
+            print("NoPressureNeeded")
+
+    def update_accelerometer(self):
+        """Updates the acceleration in the sensor snapshot from the Sense HAT's IMU.
+        """
+        temp_accel = bus_transaction("LSM9DS1", lambda: sensehat.accelerometer_raw, BUS_PRIORITY_IMU, imuDeadline,
+                                     ("LSM9DS1", "accelerometer"))
+        if temp_accel is not None:
+            publish_values(accel_x=temp_accel.get('x'), accel_y=temp_accel.get('y'), accel_z=temp_accel.get('z'))
+
+    def update_magnetometer(self):
+        """Updates the magnetic forces in the sensor snapshot from the Sense HAT's IMU.
+        """
+        temp_mag = bus_transaction("LSM9DS1", lambda: sensehat.compass_raw, BUS_PRIORITY_IMU, imuDeadline,
+                                   ("LSM9DS1", "magnetometer"))
+        if temp_mag is not None:
+            publish_values(mag_x=temp_mag.get('x'), mag_y=temp_mag.get('y'), mag_z=temp_mag.get('z'))
+
+    def show_message(self, message):
+        """Scrolls a message across the Sense HAT's LED matrix.
+
+        :param message: String of the message to show.
+        """
+        sensehat.show_message(message)
+
+
+class SimulatedBackend(SensorBackend):
+    """Sensor backend which makes up plausible values, for trying out the Client and its API without a hat.
+
+    Values follow slow sine waves with a little noise, in the same units the Sensorian reports.
+    """
+    name = "Simulated"
+    accelScale = 1000.0
+
+    def update_light(self):
+        """Publishes a light level cycling between about 100 and 700 lux every 10 minutes.
+        """
+        publish_values(light=400 + 300 * math.sin(time.time() * 2 * math.pi / 600) + random.uniform(-5, 5))
+
+    def update_ambient(self):
+        """Publishes a temperature around 21C and a pressure around 101.3kPa, in Pa.
+        """
+        publish_values(ambient_temp=round(21 + math.sin(time.time() * 2 * math.pi / 3600), 2),
+                       ambient_pressure=int(101325 + 200 * math.sin(time.time() * 2 * math.pi / 7200)))
+
+    def update_accelerometer(self):
+        """Publishes a board lying flat in landscape, with about 1000mg on the Z axis.
+        """
+        publish_values(accel_x=random.randint(-20, 20), accel_y=random.randint(-20, 20),
+                       accel_z=1000 + random.randint(-20, 20), mode=0)
+
+    def update_magnetometer(self):
+        """Publishes magnetic forces near those of the Earth's field with a little noise.
+        """
+        publish_values(mag_x=300 + random.randint(-10, 10), mag_y=-150 + random.randint(-10, 10),
+                       mag_z=450 + random.randint(-10, 10))
+
+
+# Backend classes by the name of the hat they support, as used in the hatused config variable
+backends = {"Sensorian": SensorianBackend,
+            "Sense HAT": SenseHatBackend,
+            "Simulated": SimulatedBackend
+            }
+# The backend chosen by select_backend() when setup() is called
+backend = SensorBackend()
+
+
+class Sentinel(object):
+    """A flag which keeps a job or thread running while enabled, which waiting threads are woken by as soon as it changes.
+
+    Takes the string name of the sentinel and its initial boolean state.
+    Listeners are called with the name and new state whenever the state changes, eg. to wake the scheduler.
+    """
+    def __init__(self, name, state=False):
+        self.name = name
+        self.enabled = threading.Event()
+        self.disabled = threading.Event()
+        self.listeners = []
+        self.lock = threading.Lock()
+        if state:
+            self.enabled.set()
+        else:
+            self.disabled.set()
+
+    def is_set(self):
+        """Checks if the sentinel is enabled.
+
+        :return: Boolean of the state of the sentinel.
+        """
+        return self.enabled.is_set()
+
+    def set(self, state):
+        """Sets the state of the sentinel, waking any threads waiting on it and notifying listeners if it changed.
+
+        :param state: Boolean state to set the sentinel to.
+        """
+        self.lock.acquire()
+        try:
+            changed = state != self.enabled.is_set()
+            if state:
+                self.disabled.clear()
+                self.enabled.set()
+            else:
+                self.enabled.clear()
+                self.disabled.set()
+            listeners = list(self.listeners)
+        finally:
+            self.lock.release()
+        if changed:
+            for listener in listeners:
+                listener(self.name, state)
+
+    def wait_enabled(self, timeout=None):
+        """Blocks until the sentinel is enabled or the timeout passes.
+
+        :param timeout: Float of the most seconds to wait, None to wait forever.
+        :return: Boolean of if the sentinel is enabled.
+        """
+        return self.enabled.wait(timeout)
+
+    def wait_disabled(self, timeout=None):
+        """Blocks until the sentinel is disabled or the timeout passes.
+
+        :param timeout: Float of the most seconds to wait, None to wait forever.
+        :return: Boolean of if the sentinel is disabled.
+        """
+        return self.disabled.wait(timeout)
+
+    def add_listener(self, listener):
+        """Adds a function to be called with the sentinel's name and new state whenever its state changes.
+
+        :param listener: Function taking the string name and boolean state of the sentinel.
+        """
+        self.lock.acquire()
+        self.listeners.append(listener)
+        self.lock.release()
+
+
+# Thread sentinels - Jobs and threads stop when disabled, looked up by name in check_sentinel()/set_sentinel()
+sentinels = dict((name, Sentinel(name, state)) for name, state in (
+    ("UpdateDateTime", True),
+    ("UpdateAmbient", True),
+    ("UpdateLight", True),
+    ("UpdateCPUTemp", True),
+    ("UpdateWatchedInterfaceIP", True),
+    ("UpdatePublicIP", True),
+    ("UpdateIMU", True),
+    ("ButtonEnabled", True),
+    ("SendValues", False),
+    ("SocketSentinel", False)))
+
+# Immutable snapshot of the latest sensor/IP values, replaced as a whole by publish_values()
+# so readers always get a consistent set of values without taking a lock
+SensorSnapshot = collections.namedtuple("SensorSnapshot", [
+    "version", "date_time", "serial", "light", "ambient_temp", "ambient_pressure", "cpu_temp", "mode",
+    "accel_x", "accel_y", "accel_z", "mag_x", "mag_y", "mag_z", "interface_ip", "public_ip", "button"])
+snapshot = SensorSnapshot(version=0, date_time=datetime.datetime(2000, 1, 1, 0, 0, 0), serial="0000000000000000",
+                          light=-1, ambient_temp=-1, ambient_pressure=-1, cpu_temp=-1, mode=-1,
+                          accel_x=0, accel_y=0, accel_z=0, mag_x=0, mag_y=0, mag_z=0,
+                          interface_ip="0.0.0.0", public_ip="0.0.0.0", button=0)
+
+# Declarative schema of every config file variable: its section, name, type, default value, a validator the parsed
+# value must pass, the label printed when the config is read and if it's listed by get_all_config()
+ConfigOption = collections.namedtuple("ConfigOption", ["section", "name", "type", "default", "validator", "label",
+                                                       "listed"])
+
+
+def positive(value):
+    """Validator for config values which must be greater than zero, like intervals and timeouts.
+
+    :param value: Integer/Float value to check.
+    :return: Boolean of if the value is valid.
+    """
+    return value > 0
+
+
+# Ways the accelerometer can be read, polled by the IMU job, streamed through its FIFO or read on its interrupt
+accelModes = ("Poll", "Stream", "Interrupt")
+# Ways the ambient temperature and pressure can be measured, a one-shot conversion each update or logged by the
+# sensor in its FIFO and drained in batches
+ambientModes = ("OneShot", "FIFO")
+# Oversample ratio of each ambient profile as a power of 2, from 6ms conversions to 512ms with the least noise
+ambientProfiles = {"LowLatency": 0, "Balanced": 4, "MaxPrecision": 7}
+# Ways the light can be read, polled by the Light job or read when its threshold interrupt says it changed
+lightModes = ("Poll", "Threshold")
+
+CONFIG_SCHEMA = [
+    ConfigOption('UI', 'defaultorientation', int, 0, lambda value: 0 <= value <= 3, "Default Orientation", True),
+    ConfigOption('UI', 'lockorientation', bool, False, None, "Lock Orientation", True),
+    ConfigOption('UI', 'refreshinterval', float, 1, positive, "Refresh Interval", True),
+    ConfigOption('UI', 'buttondebounce', float, 0.05, positive, "Button Debounce", True),
+    ConfigOption('UI', 'buttonlongpress', float, 1, positive, "Button Long Press", True),
+    ConfigOption('General', 'watchedinterface', str, "eth0", None, "Watched Interface", True),
+    ConfigOption('Requests', 'sendenabled', bool, False, None, "Send Enabled", True),
+    ConfigOption('Requests', 'postinterval', float, 4, positive, "POST Interval", True),
+    ConfigOption('Requests', 'posttimeout', float, 5, positive, "POST Timeout", True),
+    ConfigOption('Ambient', 'ambientenabled', bool, True, None, "Ambient Enabled", True),
+    ConfigOption('Ambient', 'ambientinterval', float, 5, positive, "Ambient Interval", True),
+    ConfigOption('Ambient', 'pressureenabled', bool, True, None, "Pressure Enabled", True),
+    ConfigOption('Ambient', 'ambientprofile', str, "MaxPrecision", lambda value: value in ambientProfiles,
+                 "Ambient Profile", True),
+    ConfigOption('Ambient', 'ambientmode', str, "OneShot", lambda value: value in ambientModes, "Ambient Mode", True),
+    ConfigOption('Ambient', 'ambientfifostep', int, 0, lambda value: 0 <= value <= 15, "Ambient FIFO Step", True),
+    ConfigOption('Light', 'lightenabled', bool, True, None, "Light Enabled", True),
+    ConfigOption('Light', 'lightinterval', float, 1, positive, "Light Interval", True),
+    ConfigOption('Light', 'lightmode', str, "Poll", lambda value: value in lightModes, "Light Mode", True),
+    ConfigOption('Light', 'lightthreshold', float, 0.1, lambda value: 0 < value < 1, "Light Threshold", True),
+    ConfigOption('General', 'cputempinterval', float, 5, positive, "CPU Temp Interval", True),
+    ConfigOption('General', 'rtcresyncinterval', float, 3600, positive, "RTC Resync Interval", True),
+    ConfigOption('General', 'interfaceinterval', float, 5, positive, "Local IP Interval", True),
+    ConfigOption('General', 'publicinterval', float, 30, positive, "Public IP Interval", True),
+    ConfigOption('Sensors', 'hatenabled', bool, True, None, "Hat Enabled", True),
+    ConfigOption('Sensors', 'hatused', str, "Sensorian", None, "Hat Used", True),
+    ConfigOption('Accelerometer', 'accelenabled', bool, True, None, "Accel Enabled", True),
+    ConfigOption('Accelerometer', 'accelinterval', float, 1, positive, "Accelerometer Interval", True),
+    ConfigOption('Accelerometer', 'accelmode', str, "Poll", lambda value: value in accelModes, "Accel Mode", True),
+    ConfigOption('Accelerometer', 'accelstreamrate', float, 800,
+                 lambda value: value in ACCEL_SENSOR.STREAM_DATA_RATES, "Accel Stream Rate", True),
+    ConfigOption('Accelerometer', 'accelwatermark', int, 16,
+                 lambda value: 1 <= value <= ACCEL_SENSOR.FXOS8700CQ_FIFO_SIZE, "Accel Watermark", True),
+    ConfigOption('UI', 'displayenabled', bool, True, None, "Display Enabled", True),
+    ConfigOption('UI', 'printenabled', bool, False, None, "Print Enabled", True),
+    ConfigOption('Requests', 'serverurl', str, "http://localhost/", None, "Server URL", True),
+    ConfigOption('Requests', 'iftttkey', str, "xxxxxxxxxxxxxxxxxxxxxx", None, "IFTTT Key", True),
+    ConfigOption('Requests', 'iftttevent', str, "SensorianEvent", None, "IFTTT Event", True),
+    ConfigOption('RemoteConfig', 'flaskenabled', bool, False, None, "Flask Enabled", False),
+    ConfigOption('RemoteConfig', 'socketenabled', bool, False, None, "Socket Enabled", False),
+    ConfigOption('RemoteConfig', 'relayaddress', str, "0.0.0.0", None, "Relay Address", True),
+    ConfigOption('RemoteConfig', 'relayport', int, 8000, lambda value: 1 <= value <= 65535, "Relay Port", True),
+    ConfigOption('RemoteConfig', 'configusername', str, "configUsername", None, "Config Username", False),
+    ConfigOption('RemoteConfig', 'configpassword', str, "configPassword", None, "Config Password", False),
+    ConfigOption('Magnetometer', 'magnetenabled', bool, True, None, "Magnet Enabled", False),
+    ConfigOption('Magnetometer', 'magnetinterval', float, 1, positive, "Magnetometer Interval", False)
+]
+configOptions = dict((option.name, option) for option in CONFIG_SCHEMA)
+
+# Published dictionary of the current value of every config variable by name, replaced as a whole on each change
+# so it can be read without a lock. Use get_config() for a typed value or get_config_value() for a string
+configValues = dict((option.name, option.default) for option in CONFIG_SCHEMA)
+# Functions to call with the name and new value when a config variable changes, by name or None for any variable
+configSubscribers = {}
+
+# Update jobs run by the schedulers, with the sentinel which keeps each running and the config variables
+# which enable it and set its interval, None where it can't be configured
+# Tuples of (job name, sentinel name, enabled config variable, interval config variable)
+# A job sampling several sensors at once has tuples of their variables, and runs at the shortest enabled interval
+updateJobs = [
+    ("TimeThread", "UpdateDateTime", None, None),
+    ("AmbientThread", "UpdateAmbient", "ambientenabled", "ambientinterval"),
+    ("LightThread", "UpdateLight", "lightenabled", "lightinterval"),
+    ("CPUTempThread", "UpdateCPUTemp", None, "cputempinterval"),
+    ("InterfaceIPThread", "UpdateWatchedInterfaceIP", None, "interfaceinterval"),
+    ("PublicIPThread", "UpdatePublicIP", None, "publicinterval"),
+    ("IMUThread", "UpdateIMU", ("accelenabled", "magnetenabled"), ("accelinterval", "magnetinterval")),
+    ("SendThread", "SendValues", "sendenabled", "postinterval"),
+    ("SocketThread", "SocketSentinel", "socketenabled", None)
+]
+
+# Longest interval some jobs can be run at by sentinel name, set by the backend when a sensor would lose samples
+# if read any less often, like the accelerometer FIFO when streaming or the barometer FIFO when logging
+jobIntervalLimits = {}
+
+# Set while the Client is running between setup() and cleanup(), config changes only reboot jobs when set
+clientRunning = False
+
 inMenu = False
 currentMenu = "Top"
 menuElements = []
 topMenuElements = ["Exit", "General", "UI", "Requests", "Accelerometer", "Light", "Ambient", "System"]
 menuPosition = 0
 parser = ConfigParser.SafeConfigParser()
-threads = []
+scheduler = None
+highRateScheduler = None
+# Shortest interval in seconds the IMU and light sensors can be updated at
+highRateInterval = 0.005
 killWatch = False
-magnetX = 0
-magnetY = 0
-magnetZ = 0
-magnetInterval = 1
-configUsername = 'configUsername'
-configPassword = 'configPassword'
-relayAddress = "0.0.0.0"
-relayPort = 8000
 
 # Board Pin Numbers
 INT_PIN = 11  # Ambient Light Sensor Interrupt - BCM 17
 LED_PIN = 12  # LED - BCM 18
 CAP_PIN = 13  # Capacitive Touch Button Interrupt - BCM 27
+ACCEL_PIN = 7  # Accelerometer/Magnetometer Interrupt - BCM 4
 GPIO.setmode(GPIO.BOARD)
 
-# Lock to ensure one sensor used at a time
-# Sensorian firmware not thread-safe without
-I2CLock = threading.Lock()
-
-# Sentinel Thread Locks - Make sure the thread and main program aren't
-# accessing the thread sentinels at the same time
-timeEnabledLock = threading.Lock()
-ambientEnabledLock = threading.Lock()
-lightEnabledLock = threading.Lock()
-accelEnabledLock = threading.Lock()
-interfaceIPEnabledLock = threading.Lock()
-publicIPEnabledLock = threading.Lock()
-cpuEnabledLock = threading.Lock()
-pressureEnabledLock = threading.Lock()
-buttonEnabledLock = threading.Lock()
-sendEnabledLock = threading.Lock()
+# Seconds an IMU read can wait for the bus before it's dropped, as the next sample would supersede it
+imuDeadline = 0.05
+# How many times its expected conversion time an ambient conversion can take before it's started again
+ambientTimeout = 4
+# Fraction of the difference between the expected and actual time of a FIFO read that streamed timestamps are
+# corrected by each batch, to follow the Pi's clock without adding its scheduling jitter to every sample
+streamClockCorrection = 0.1
+# Shortest and longest seconds between reads of the buttons while they're held, doubling while nothing changes
+buttonPollInterval = 0.05
+buttonPollMax = 0.4
+# How many times a failed read of the buttons is tried, and the seconds before the first retry which then doubles
+buttonReadAttempts = 4
+buttonRetryDelay = 0.005
+# The bus manager which owns the I2C bus, started by get_bus_manager()
+busManager = None
+# Set by stop_bus_manager() so a job still finishing during cleanup() can't start a new bus manager nothing stops
+busManagerStopped = False
+# Lock to ensure only one bus manager is started at a time
+busManagerLock = threading.Lock()
+
+# Lock to ensure only one writer publishes a new sensor snapshot at a time
+# Readers don't need it as the snapshot is replaced in a single assignment
+snapshotLock = threading.Lock()
+
+# Lock to ensure only one writer publishes new config values at a time
+# Readers don't need it as the values are replaced in a single assignment
+configLock = threading.Lock()
+
+# Lock to ensure only one writer changes the subscriptions at a time
+# publish_values() doesn't need it as they're replaced in a single assignment
+subscriptionLock = threading.Lock()
 
 # Global Variable Thread Locks - Make sure the thread and main program aren't
-# accessing the global sensor variables at the same time
-serialLock = threading.Lock()
-ambientTempLock = threading.Lock()
-lightLock = threading.Lock()
-modeLock = threading.Lock()
-watchedInterfaceLock = threading.Lock()
-interfaceIPLock = threading.Lock()
-publicIPLock = threading.Lock()
-cpuTempLock = threading.Lock()
-ambientPressureLock = threading.Lock()
-rtcLock = threading.Lock()
-buttonLock = threading.Lock()
-accelXLock = threading.Lock()
-accelYLock = threading.Lock()
-accelZLock = threading.Lock()
+# accessing the global menu variables at the same time
 inMenuLock = threading.Lock()
 currentMenuLock = threading.Lock()
 menuElementsLock = threading.Lock()
 menuPositionLock = threading.Lock()
-defaultOrientationLock = threading.Lock()
-lockOrientationLock = threading.Lock()
-printEnabledLock = threading.Lock()
-displayEnabledLock = threading.Lock()
-sleepTimeLock = threading.Lock()
-postTimeoutLock = threading.Lock()
 killWatchLock = threading.Lock()
-flaskEnabledLock = threading.Lock()
-interfaceIntervalLock = threading.Lock()
-publicIntervalLock = threading.Lock()
-postIntervalLock = threading.Lock()
-serverURLLock = threading.Lock()
-iftttKeyLock = threading.Lock()
-iftttEventLock = threading.Lock()
-ambientIntervalLock = threading.Lock()
-lightIntervalLock = threading.Lock()
-accelIntervalLock = threading.Lock()
-cpuTempIntervalLock = threading.Lock()
-socketEnabledLock = threading.Lock()
-magnetXLock = threading.Lock()
-magnetYLock = threading.Lock()
-magnetZLock = threading.Lock()
-magnetIntervalLock = threading.Lock()
-magnetEnabledLock = threading.Lock()
-relayAddressLock = threading.Lock()
-relayPortLock = threading.Lock()
-configUsernameLock = threading.Lock()
-configPasswordLock = threading.Lock()
-hatEnabledLock = threading.Lock()
-hatUsedLock = threading.Lock()
 
 app = Flask(__name__)
 api = Api(app)
@@ -249,14 +1002,8 @@ def get_password(username):
 
     Accepts a single username and password from the config file.
     """
-    configUsernameLock.acquire()
-    temp_config_username = configUsername
-    configUsernameLock.release()
-    if username == temp_config_username:
-        configPasswordLock.acquire()
-        temp_config_password = configPassword
-        configPasswordLock.release()
-        return temp_config_password
+    if username == get_config("configusername"):
+        return get_config("configpassword")
     return None
 
 
@@ -395,24 +1142,285 @@ def kill_flask():
     Needs to be called for shutdown_server() to work.
     """
     url = 'http://127.0.0.1:5000/shutdown'
-    configUsernameLock.acquire()
-    temp_config_username = configUsername
-    configUsernameLock.release()
-    configPasswordLock.acquire()
-    temp_config_password = configPassword
-    configPasswordLock.release()
     try:
-        requests.post(url, auth=(temp_config_username, temp_config_password))
+        requests.post(url, auth=(get_config("configusername"), get_config("configpassword")))
     except requests.exceptions.ConnectionError:
         print("Flask server already shut down")
 
 
+def publish_values(**values):
+    """Publishes a new sensor snapshot with the given values changed and the rest carried over from the last one.
+
+    Only the writers are serialized, readers keep using whichever snapshot they already had.
+    Numeric values are also added to the history of their channel, timestamped with monotonic_time().
+    Subscribers of a channel are notified of the new value if it passes their filters, see subscribe().
+    :param values: Keyword arguments of the SensorSnapshot fields to change, eg. accel_x=0, accel_y=0, accel_z=1000.
+    :return: SensorSnapshot which was published.
+    """
+    global snapshot
+    now = monotonic_time()
+    snapshotLock.acquire()
+    try:
+        snapshot = snapshot._replace(version=snapshot.version + 1, **values)
+        current_subscriptions = subscriptions
+        for channel, value in values.items():
+            if channel in history:
+                history[channel].append(now, value)
+            for subscription in current_subscriptions.get(channel, ()):
+                if subscription.offer(now, value):
+                    subscription.notify(now, value)
+        return snapshot
+    finally:
+        snapshotLock.release()
+
+
+def publish_stream(channel, timestamps, samples, fields, scale=1):
+    """Publishes a batch of samples streamed from a sensor's FIFO.
+
+    The latest sample goes in the sensor snapshot and every sample in the history of its fields, both multiplied by
+    the scale. Subscribers of the stream channel are handed the timestamps and samples as they are, and subscribers
+    of the fields are notified of the latest sample as if it were published with publish_values().
+    :param channel: String name of the stream channel, one of streamChannels eg. accel_stream.
+    :param timestamps: NumPy array of the Float monotonic time in seconds of each sample.
+    :param samples: NumPy array of the samples oldest first, with a column for each field.
+    :param fields: Tuple of String names of the SensorSnapshot fields of the columns, eg. accel_x, accel_y, accel_z.
+    :param scale: Integer/Float the samples are multiplied by to get the units of the fields.
+    :return: SensorSnapshot which was published.
+    """
+    global snapshot
+    now = timestamps[-1]
+    scaled = samples * scale
+    latest = dict((field, float(scaled[-1, column])) for column, field in enumerate(fields))
+    snapshotLock.acquire()
+    try:
+        snapshot = snapshot._replace(version=snapshot.version + 1, **latest)
+        current_subscriptions = subscriptions
+        for column, field in enumerate(fields):
+            if field in history:
+                history[field].extend(timestamps, scaled[:, column])
+            for subscription in current_subscriptions.get(field, ()):
+                if subscription.offer(now, latest[field]):
+                    subscription.notify(now, latest[field])
+        for subscription in current_subscriptions.get(channel, ()):
+            subscription.notify(now, (timestamps, samples))
+        return snapshot
+    finally:
+        snapshotLock.release()
+
+
+def get_snapshot():
+    """Gets the latest sensor snapshot, a consistent set of every sensor/IP value from the same moment.
+
+    :return: SensorSnapshot namedtuple of the latest values, see SensorSnapshot for the fields.
+    """
+    return snapshot
+
+
+# Number of samples kept per channel, 4096 samples across the channels below is about 1.5MB in total
+historyCapacity = 4096
+# Ring buffer history of each numeric snapshot field, added to by publish_values()
+history = dict((channel, ChannelHistory(historyCapacity)) for channel in (
+    "light", "ambient_temp", "ambient_pressure", "cpu_temp", "mode", "accel_x", "accel_y", "accel_z",
+    "mag_x", "mag_y", "mag_z", "button"))
+
+
+def get_history(channel, since=None, max_points=None):
+    """Gets a copy of the recent history of a sensor channel.
+
+    :param channel: String name of the channel, one of the numeric SensorSnapshot fields eg. light, accel_x.
+    :param since: Float monotonic time in seconds from monotonic_time(), only later samples are returned.
+    :param max_points: Integer of the most samples to return, the latest are kept.
+    :return: Tuple of NumPy arrays of the timestamps and values oldest first, or None if no such channel.
+    """
+    channel_history = history.get(channel)
+    if channel_history is None:
+        return None
+    return channel_history.get(since, max_points)
+
+
+def get_window(channel, seconds):
+    """Gets a copy of the samples of a sensor channel from the last given number of seconds.
+
+    :param channel: String name of the channel, one of the numeric SensorSnapshot fields eg. light, accel_x.
+    :param seconds: Integer/Float of how many seconds back to get samples from.
+    :return: Tuple of NumPy arrays of the timestamps and values oldest first, or None if no such channel.
+    """
+    return get_history(channel, since=monotonic_time() - seconds)
+
+
+class Subscription(object):
+    """A subscriber to one sensor channel, notified when a new sample changes by more than its delta.
+
+    Created by subscribe(), only publish_values() decides whether to notify so no lock is needed for its state.
+    Counts the notifications delivered and those dropped because a queue was full.
+    """
+    def __init__(self, channel, target, min_delta=0, rate_limit=None):
+        """Initializes a subscription to a channel with the callback or queue to notify and the filters to apply.
+        """
+        self.channel = channel
+        self.target = target
+        self.isQueue = hasattr(target, "put_nowait")
+        self.minDelta = min_delta
+        if rate_limit:
+            self.minimumGap = 1.0 / rate_limit
+        else:
+            self.minimumGap = 0
+        self.lastValue = None
+        self.lastTime = None
+        self.delivered = 0
+        self.dropped = 0
+
+    def offer(self, timestamp, value):
+        """Checks a new sample against the delta and rate limit, remembering it as the last notified if it passes.
+
+        Numeric samples must differ from the last notified by more than the delta, other samples must just differ.
+        :param timestamp: Float monotonic time in seconds the sample was published.
+        :param value: New value of the channel.
+        :return: Boolean of whether the subscriber should be notified of the sample.
+        """
+        if self.lastTime is not None:
+            if timestamp - self.lastTime < self.minimumGap:
+                return False
+            if isinstance(value, numbers.Number) and isinstance(self.lastValue, numbers.Number):
+                if abs(value - self.lastValue) <= self.minDelta:
+                    return False
+            elif value == self.lastValue:
+                return False
+        self.lastValue = value
+        self.lastTime = timestamp
+        return True
+
+    def notify(self, timestamp, value):
+        """Hands a notification to the subscriber's queue, or the dispatcher for callbacks, without ever blocking.
+
+        :param timestamp: Float monotonic time in seconds the sample was published.
+        :param value: New value of the channel.
+        """
+        try:
+            if self.isQueue:
+                self.target.put_nowait((self.channel, value, timestamp))
+                self.delivered += 1
+            else:
+                notificationQueue.put_nowait((self, self.channel, value, timestamp))
+        except Queue.Full:
+            self.dropped += 1
+
+    def get_stats(self):
+        """Gets how many notifications were delivered to and dropped for the subscriber.
+
+        :return: Dictionary of the channel, delivered and dropped counts.
+        """
+        return {'channel': self.channel, 'delivered': self.delivered, 'dropped': self.dropped}
+
+
+class NotificationThread(threading.Thread):
+    """A Thread which calls the callbacks of subscribers with their notifications, one at a time in order.
+
+    Keeps slow callbacks off the sampling path, started by subscribe() and stopped by cleanup().
+    """
+    def __init__(self, thread_id=3, name="NotificationThread"):
+        """Initializes the Notification thread with an ID and name.
+        """
+        threading.Thread.__init__(self)
+        self.threadID = thread_id
+        self.name = name
+
+    def run(self):
+        """Calls callbacks with notifications from the notification queue until handed None.
+        """
+        while True:
+            notification = notificationQueue.get()
+            if notification is None:
+                break
+            subscription, channel, value, timestamp = notification
+            if subscription not in subscriptions.get(channel, ()):
+                continue
+            try:
+                subscription.target(channel, value, timestamp)
+                subscription.delivered += 1
+            except Exception as e:
+                print("EXCEPTION IN subscriber of " + channel + ": " + str(e))
+        print("Killing " + self.name)
+
+
+# Channels of batches of samples published by publish_stream(), subscribers are given (timestamps, samples) tuples
+streamChannels = ("accel_stream", "ambient_stream")
+# Most notifications waiting for callbacks before new ones are dropped
+notificationQueueSize = 256
+notificationQueue = Queue.Queue(notificationQueueSize)
+notificationThread = None
+# Subscriptions by channel, replaced whole on change so publish_values() can read them without the lock
+subscriptions = {}
+
+
+def subscribe(channel, target, min_delta=0, rate_limit=None):
+    """Subscribes to a sensor channel to be notified as soon as a new sample changes it by more than the delta.
+
+    Notifications never block sampling, if the subscriber falls behind they're dropped and counted instead.
+    :param channel: String name of the channel, one of the SensorSnapshot fields eg. light, mag_x, public_ip, or
+    one of the streamChannels to be given every batch of samples, eg. accel_stream.
+    :param target: Function called with the channel, value and monotonic timestamp of each notification, or a Queue
+    given (channel, value, timestamp) tuples. A Queue should have a maxsize so a stalled reader can't use up memory.
+    :param min_delta: Integer/Float of how much a numeric sample must differ from the last one notified.
+    Not used for stream channels.
+    :param rate_limit: Float of the most notifications per second, None for no limit. Not used for stream channels.
+    :return: Subscription to pass to unsubscribe(), or None if there's no such channel.
+    """
+    global subscriptions, notificationThread
+    if channel not in SensorSnapshot._fields and channel not in streamChannels:
+        print("No channel named " + channel + " to subscribe to")
+        return None
+    subscription = Subscription(channel, target, min_delta, rate_limit)
+    subscriptionLock.acquire()
+    try:
+        new_subscriptions = dict(subscriptions)
+        new_subscriptions[channel] = subscriptions.get(channel, ()) + (subscription,)
+        subscriptions = new_subscriptions
+        if not subscription.isQueue and (notificationThread is None or not notificationThread.is_alive()):
+            notificationThread = NotificationThread()
+            notificationThread.start()
+    finally:
+        subscriptionLock.release()
+    return subscription
+
+
+def unsubscribe(subscription):
+    """Stops notifying a subscriber, any notifications already waiting for its callback are discarded.
+
+    :param subscription: Subscription returned by subscribe().
+    """
+    global subscriptions
+    subscriptionLock.acquire()
+    try:
+        new_subscriptions = dict(subscriptions)
+        remaining = tuple(s for s in subscriptions.get(subscription.channel, ()) if s is not subscription)
+        if remaining:
+            new_subscriptions[subscription.channel] = remaining
+        else:
+            new_subscriptions.pop(subscription.channel, None)
+        subscriptions = new_subscriptions
+    finally:
+        subscriptionLock.release()
+
+
+def stop_notifications():
+    """Stops the notification thread once it has called back the notifications already waiting.
+    """
+    global notificationThread
+    subscriptionLock.acquire()
+    try:
+        if notificationThread is not None:
+            notificationQueue.put(None)
+            notificationThread = None
+    finally:
+        subscriptionLock.release()
+
+
 def update_serial():
-    """Updates the global CPU serial variable by reading it from the cpuinfo file.
+    """Updates the CPU serial in the sensor snapshot by reading it from the cpuinfo file.
 
     Really only needs to be called once when the Client is initialized. It's not going to change.
     """
-    global cpuSerial
     temp_serial = "0000000000000000"
     # Get serial from the file, if fails, return error serial
     try:
@@ -425,112 +1433,807 @@ def update_serial():
             f.close()
     except (IOError, OSError):
         temp_serial = "ERROR000000000"
-    # Update the serial global variable when safe
+    # Publish the serial whether it was found or not
     finally:
-        serialLock.acquire()
-        cpuSerial = temp_serial
-        serialLock.release()
+        publish_values(serial=temp_serial)
 
 
 def get_serial():
-    """Gets the CPU serial from the global variable when not locked.
+    """Gets the CPU serial from the latest sensor snapshot.
 
     :return: String of the CPU serial.
     """
-    serialLock.acquire()
-    temp_serial = cpuSerial
-    serialLock.release()
-    return temp_serial
+    return snapshot.serial
 
 
-class GeneralThread(threading.Thread):
-    """General Thread class to repeatedly update a variable at a given interval
+class ScheduledJob(object):
+    """A repeating job run by the SchedulerThread at a given interval.
 
-    Takes an arbitrary int thread_id and string name to identify the thread.
-    Takes an integer or float interval for how long in seconds to wait between updating values.
-    Takes the string method which is the name of the method to call contained in the methods dictionary.
+    Takes the string name to identify the job and the string method which is the name of the method to call
+    contained in the methods dictionary, also used as the name of the sentinel which keeps the job alive.
+    Takes an integer or float interval for how long in seconds between updating values, no less than minimum.
+    Blocking jobs, ie. ones which wait on the network, are handed to the worker pool instead of being run inline.
+    Run N of the job is due at anchor + N * interval on the monotonic clock, so the time the job takes to run
+    doesn't push later runs back. Runs which can't be started before the next one is due are skipped and counted.
+    A one-shot job is run once and then removed.
     """
-    # Initializes a thread upon creation
-    def __init__(self, thread_id, name, interval, method):
-        threading.Thread.__init__(self)
-        self.threadID = thread_id
+    # Number of recent runs the rolling jitter and rate statistics are taken over
+    statsWindow = 100
+
+    def __init__(self, name, interval, method, blocking=False, minimum=1, oneshot=False):
         self.name = name
-        if interval < 1:
-            self.interval = 1
-        else:
-            self.interval = interval
+        self.oneshot = oneshot
+        self.minimum = minimum
+        self.interval = max(interval, minimum)
         self.method = method
-        self.repeat = check_sentinel(self.method)
-        self.slept = 0
-        self.toSleep = 0
-
-    def run(self):
-        # Thread loops as long as the sentinel remains True
-        while self.repeat:
-            methods[self.method]()
-            self.slept = 0
-            # Keep sleeping until it's time to update again
-            while self.slept < self.interval:
-                # Check the global sentinel for this thread every second at most
-                self.repeat = check_sentinel(self.method)
-                # If the sentinel changed to false this second, kill the thread
-                if not self.repeat:
-                    print("Killing " + self.name)
-                    break
-                # If it did not, sleep for another second unless less than a
-                # second needs to pass to reach the end of the current loop
-                if self.interval - self.slept < 1:
-                    self.toSleep = self.interval - self.slept
-                else:
-                    self.toSleep = 1
-                time.sleep(self.toSleep)
-                self.slept += self.toSleep
-
+        self.blocking = blocking
+        self.anchor = 0
+        self.tick = 0
+        self.due = 0
+        self.generation = 0
+        self.running = False
+        self.cancelled = False
+        self.runs = 0
+        self.overruns = 0
+        self.maxLateness = 0
+        self.lateness = collections.deque(maxlen=self.statsWindow)
+        self.startTimes = collections.deque(maxlen=self.statsWindow)
+
+    def set_anchor(self, anchor):
+        """Anchors the job's deadlines to the given time, with the first run due at that time.
+
+        :param anchor: Float monotonic time in seconds of the job's first run.
+        """
+        self.anchor = anchor
+        self.tick = 0
+        self.due = anchor
 
-class FlaskThread(threading.Thread):
-    """A Thread class specifically to run a Flask server in the background.
+    def set_interval(self, interval, now):
+        """Changes the interval of the job, re-anchoring its deadlines to the due time of its last run.
 
-    Terminates when an authenticated POST to /shutdown is made or shutdown_server() is called.
-    """
-    def __init__(self):
-        """Initializes a Flask Thread with only a default ID and name.
+        The next run is due one new interval after the last one was due, or straight away if that has already passed.
+        A running job is re-anchored to the run in progress, so it moves on to the new deadline when it finishes.
+        :param interval: Integer/Float of the new interval in seconds.
+        :param now: Float monotonic time in seconds of the change.
         """
-        threading.Thread.__init__(self)
-        self.threadID = 99
-        self.name = "FlaskThread"
+        interval = max(interval, self.minimum)
+        self.interval = interval
+        if self.runs == 0:
+            return
+        self.anchor = self.startTimes[-1] - self.lateness[-1]
+        if self.running:
+            self.tick = 0
+        elif self.anchor + interval > now:
+            self.tick = 1
+        else:
+            self.anchor = now
+            self.tick = 0
+        self.due = self.anchor + self.tick * interval
 
-    def run(self):
-        """Runs a Flask server continuously until terminated.
+    def record_start(self, now):
+        """Records how far behind its due time the job was started.
 
-        Can be terminated by an authenticated POST to /shutdown or call of shutdown_server().
+        :param now: Float monotonic time in seconds the job was started.
         """
-        run_flask()
-        print("Killing FlaskThread")
+        lateness = now - self.due
+        self.runs += 1
+        self.lateness.append(lateness)
+        self.startTimes.append(now)
+        if lateness > self.maxLateness:
+            self.maxLateness = lateness
 
+    def advance(self, now):
+        """Moves the job on to its next deadline after running, skipping any that have already passed.
 
-class SocketThread(threading.Thread):
-    """A Thread class specifically to establish a socket with a Sensorian Hub Site relay server.
-
-    The socket code is kind of janky with no real schema yet, but allows for configuration behind NATs and firewalls.
-    """
-    def __init__(self):
-        """Initializes the Socket thread with the config values for address, port and defaults for timings and ID/name.
+        :param now: Float monotonic time in seconds the job finished running.
+        """
+        self.tick += 1
+        self.due = self.anchor + self.tick * self.interval
+        if self.due <= now:
+            missed = int((now - self.due) / self.interval) + 1
+            self.overruns += missed
+            self.tick += missed
+            self.due = self.anchor + self.tick * self.interval
+
+    def get_stats(self):
+        """Gets the scheduling statistics of the job in dictionary format.
+
+        Jitter and rate are taken over the last statsWindow runs. The rate is the achieved runs per second.
+        :return: Dictionary of the job's name, interval, configured and achieved rate, run and overrun count and
+        last, average, max and standard deviation of lateness in seconds.
+        """
+        stats = {'name': self.name,
+                 'interval': self.interval,
+                 'rate': 1.0 / self.interval if self.interval else 0,
+                 'achievedrate': 0,
+                 'runs': self.runs,
+                 'overruns': self.overruns,
+                 'lastlateness': 0,
+                 'averagelateness': 0,
+                 'maxlateness': self.maxLateness,
+                 'jitter': 0}
+        lateness = list(self.lateness)
+        start_times = list(self.startTimes)
+        if lateness:
+            average = sum(lateness) / len(lateness)
+            stats['lastlateness'] = lateness[-1]
+            stats['averagelateness'] = average
+            stats['jitter'] = (sum((late - average) ** 2 for late in lateness) / len(lateness)) ** 0.5
+        if len(start_times) > 1 and start_times[-1] > start_times[0]:
+            stats['achievedrate'] = (len(start_times) - 1) / (start_times[-1] - start_times[0])
+        return stats
+
+
+class SchedulerThread(threading.Thread):
+    """A single Thread which runs every scheduled job at its due time, replacing a thread per sensor.
+
+    Jobs are kept in a heap ordered by due time. Non-blocking jobs run inline one after the other while blocking
+    network jobs are passed to a small pool of worker threads so they can't hold up the sensors.
+    A job is dropped when its sentinel is found to be False at its due time. A job added while an earlier job of the
+    same name is still running waits for that one to finish, so the two never run at once.
+    Jobs are given intervals no shorter than minimum_interval in seconds, so a scheduler for high-rate sensors
+    can be made with a small minimum and no worker pool.
+    """
+    # Python 2's Condition.wait() with a timeout polls in steps of up to 50ms,
+    # so waits shorter than this are slept through instead to keep high-rate jobs on time
+    shortWait = 0.05
+
+    def __init__(self, thread_id=1, name="SchedulerThread", pool_size=2, minimum_interval=1):
+        """Initializes the Scheduler thread with an empty job heap and a worker pool of the given size.
         """
         threading.Thread.__init__(self)
-        self.threadID = 100
-        self.name = "SocketThread"
-        self.connected = False
-        self.host = get_config_value("relayaddress")
-        self.port = get_config_value("relayport")
-        self.repeat = check_sentinel("SocketSentinel")
-        self.slept = 0
-        self.keep_alive = 5
-        self.timeout = 5.0
+        self.threadID = thread_id
+        self.name = name
+        self.minimumInterval = minimum_interval
+        self.condition = threading.Condition()
+        self.heap = []
+        self.jobs = {}
+        # Jobs running right now and jobs added while one of the same name was, by name
+        self.runningJobs = {}
+        self.waitingJobs = {}
+        self.sequence = 0
+        self.repeat = True
+        self.poolQueue = Queue.Queue()
+        self.pool = []
+        for pool_id in range(pool_size):
+            worker = WorkerThread(pool_id, self.name + "Worker" + str(pool_id), self)
+            self.pool.append(worker)
+
+    def start(self):
+        """Starts the worker pool and then the scheduler itself.
+        """
+        for worker in self.pool:
+            worker.start()
+        threading.Thread.start(self)
+
+    def _push(self, job):
+        # Must be called with the condition held. Old heap entries for the job
+        # are left in place and skipped when popped as their generation is stale
+        job.generation += 1
+        self.sequence += 1
+        heapq.heappush(self.heap, (job.due, self.sequence, job.generation, job))
+        # Rebuild the heap without the stale entries if frequent changes to
+        # jobs with long intervals have left it much bigger than the job table
+        if len(self.heap) > 2 * len(self.jobs) + 16:
+            self.heap = [entry for entry in self.heap
+                         if not entry[3].cancelled and entry[2] == entry[3].generation]
+            heapq.heapify(self.heap)
+        self.condition.notify()
+
+    def add_job(self, name, interval, method, blocking=False):
+        """Adds a new job to be run immediately and then at its interval, replacing any job of the same name.
+
+        :param name: String name of the job.
+        :param interval: Integer/Float of how often to run the job in seconds.
+        :param method: String name of the method to call, also the name of its sentinel.
+        :param blocking: Boolean of if the job should be run on the worker pool.
+        """
+        self.condition.acquire()
+        try:
+            self._add(name, interval, method, blocking)
+        finally:
+            self.condition.release()
+
+    def _add(self, name, interval, method, blocking):
+        # Must be called with the condition held
+        old_job = self.jobs.get(name)
+        if old_job is not None:
+            old_job.cancelled = True
+        job = ScheduledJob(name, interval, method, blocking, self.minimumInterval)
+        self.jobs[name] = job
+        job.set_anchor(monotonic_time())
+        self._push_or_wait(job)
+
+    def _push_or_wait(self, job):
+        # Must be called with the condition held. A new job whose name is still
+        # running, even cancelled, is held back until finish_job() sees it end
+        if job.name in self.runningJobs:
+            self.waitingJobs[job.name] = job
+        else:
+            self._push(job)
 
-    def run(self):
-        """Loops attempts to establish a socket and waits for commands from the server when one is established.
+    def add_oneshot(self, name, delay, method, blocking=False):
+        """Adds a job to be run once after the given delay, replacing any job of the same name.
 
-        Can be terminated by setting the SocketSentinel to False.
+        Lets a job which has started something on a sensor come back for the result without sleeping in between.
+        The delay isn't held to the scheduler's minimum interval.
+        :param name: String name of the job.
+        :param delay: Integer/Float of how many seconds from now to run the job.
+        :param method: String name of the method to call, also the name of its sentinel.
+        :param blocking: Boolean of if the job should be run on the worker pool.
+        """
+        self.condition.acquire()
+        try:
+            old_job = self.jobs.get(name)
+            if old_job is not None:
+                old_job.cancelled = True
+            job = ScheduledJob(name, delay, method, blocking, 0, True)
+            self.jobs[name] = job
+            job.set_anchor(monotonic_time() + delay)
+            self._push_or_wait(job)
+        finally:
+            self.condition.release()
+
+    def update_job(self, name, interval, method, blocking=False):
+        """Applies a new interval to a scheduled job in place, or adds the job if it isn't scheduled.
+
+        The job's next deadline is recomputed straight away and its statistics are kept. Nothing is joined or
+        restarted, so this returns immediately even if the job is running.
+        :param name: String name of the job.
+        :param interval: Integer/Float of how often to run the job in seconds.
+        :param method: String name of the method to call, also the name of its sentinel.
+        :param blocking: Boolean of if the job should be run on the worker pool.
+        """
+        self.condition.acquire()
+        try:
+            job = self.jobs.get(name)
+            if job is None or job.method != method:
+                self._add(name, interval, method, blocking)
+                return
+            job.blocking = blocking
+            job.set_interval(interval, monotonic_time())
+            # A running job is pushed back onto the heap when it finishes, and a waiting one when its predecessor does
+            if not job.running and self.waitingJobs.get(name) is not job:
+                self._push(job)
+        finally:
+            self.condition.release()
+
+    def set_interval(self, name, interval):
+        """Changes the interval of a scheduled job in place, moving its next due time to match.
+
+        :param name: String name of the job.
+        :param interval: Integer/Float of the new interval in seconds.
+        :return: Boolean of if the job was found.
+        """
+        self.condition.acquire()
+        try:
+            job = self.jobs.get(name)
+            if job is None:
+                return False
+            job.set_interval(interval, monotonic_time())
+            # A running job is pushed back onto the heap when it finishes, and a waiting one when its predecessor does
+            if not job.running and self.waitingJobs.get(name) is not job:
+                self._push(job)
+            return True
+        finally:
+            self.condition.release()
+
+    def remove_job(self, name):
+        """Removes a job from the schedule. It is not interrupted if it is currently running.
+
+        :param name: String name of the job.
+        """
+        self.condition.acquire()
+        try:
+            job = self.jobs.pop(name, None)
+            if job is not None:
+                job.cancelled = True
+        finally:
+            self.condition.release()
+
+    def sentinel_changed(self, name, state):
+        """Drops the jobs of a sentinel as soon as it is disabled rather than when they next come due.
+
+        Registered as a listener on every sentinel when the scheduler is created.
+        :param name: String name of the sentinel which changed.
+        :param state: Boolean new state of the sentinel.
+        """
+        if state:
+            return
+        self.condition.acquire()
+        try:
+            for job_name, job in list(self.jobs.items()):
+                if job.method == name:
+                    job.cancelled = True
+                    del self.jobs[job_name]
+                    print("Killing " + job_name)
+            self.condition.notify()
+        finally:
+            self.condition.release()
+
+    def get_jobs(self):
+        """Gets the state of every scheduled job.
+
+        :return: List of dictionaries of each job's name, method, interval, if its sentinel is enabled,
+        if it's running right now and how many seconds until it's next due.
+        """
+        now = monotonic_time()
+        self.condition.acquire()
+        try:
+            jobs = [{'name': job.name,
+                     'method': job.method,
+                     'interval': job.interval,
+                     'enabled': check_sentinel(job.method),
+                     'running': job.running,
+                     'nextrun': max(job.due - now, 0)} for job in self.jobs.values()]
+        finally:
+            self.condition.release()
+        return jobs
+
+    def get_stats(self):
+        """Gets the scheduling statistics of every job.
+
+        :return: List of dictionaries of each job's statistics, see ScheduledJob.get_stats().
+        """
+        self.condition.acquire()
+        try:
+            jobs = list(self.jobs.values())
+        finally:
+            self.condition.release()
+        return [job.get_stats() for job in jobs]
+
+    def join(self, timeout=None):
+        """Waits for the scheduler and then its worker pool to finish, after stop() has been called.
+
+        :param timeout: Float of the most seconds to wait for each thread, None to wait however long it takes.
+        """
+        threading.Thread.join(self, timeout)
+        for worker in self.pool:
+            worker.join(timeout)
+
+    def stop(self):
+        """Signals the scheduler and its worker pool to stop once any running jobs finish.
+        """
+        self.condition.acquire()
+        self.repeat = False
+        self.condition.notify()
+        self.condition.release()
+        for _ in self.pool:
+            self.poolQueue.put(None)
+
+    def finish_job(self, job):
+        """Reschedules a job after it has been run, called by the scheduler or the worker which ran it.
+
+        A job of the same name which was added while it ran is scheduled now, due straight away if its time has passed.
+        :param job: ScheduledJob which just finished running.
+        """
+        self.condition.acquire()
+        try:
+            job.running = False
+            if self.runningJobs.get(job.name) is job:
+                del self.runningJobs[job.name]
+            waiting = self.waitingJobs.pop(job.name, None)
+            if waiting is not None and not waiting.cancelled:
+                now = monotonic_time()
+                if waiting.due < now:
+                    waiting.set_anchor(now)
+                self._push(waiting)
+            if job.oneshot:
+                job.cancelled = True
+                if self.jobs.get(job.name) is job:
+                    del self.jobs[job.name]
+            elif not job.cancelled:
+                job.advance(monotonic_time())
+                self._push(job)
+        finally:
+            self.condition.release()
+
+    def run(self):
+        """Runs each job as it comes due until stopped.
+        """
+        while True:
+            self.condition.acquire()
+            try:
+                job = None
+                while self.repeat and job is None:
+                    if not self.heap:
+                        self.condition.wait()
+                        continue
+                    due, sequence, generation, job = self.heap[0]
+                    if job.cancelled or generation != job.generation:
+                        heapq.heappop(self.heap)
+                        job = None
+                        continue
+                    wait_time = due - monotonic_time()
+                    if wait_time > self.shortWait:
+                        self.condition.wait(wait_time)
+                        job = None
+                        continue
+                    elif wait_time > 0:
+                        self.condition.release()
+                        try:
+                            time.sleep(wait_time)
+                        finally:
+                            self.condition.acquire()
+                        job = None
+                        continue
+                    heapq.heappop(self.heap)
+                if not self.repeat:
+                    break
+                # Drop the job if its sentinel was disabled since it last ran
+                if not check_sentinel(job.method):
+                    print("Killing " + job.name)
+                    if self.jobs.get(job.name) is job:
+                        del self.jobs[job.name]
+                    continue
+                job.record_start(monotonic_time())
+                job.running = True
+                self.runningJobs[job.name] = job
+            finally:
+                self.condition.release()
+            if job.blocking:
+                self.poolQueue.put(job)
+            else:
+                run_job(job)
+                self.finish_job(job)
+        print("Killing " + self.name)
+
+
+class WorkerThread(threading.Thread):
+    """A Thread in the scheduler's pool which runs blocking jobs, like network requests, as they're handed to it.
+    """
+    def __init__(self, thread_id, name, scheduler):
+        """Initializes a Worker thread with an ID, name and the scheduler it takes jobs from.
+        """
+        threading.Thread.__init__(self)
+        self.threadID = thread_id
+        self.name = name
+        self.scheduler = scheduler
+
+    def run(self):
+        """Runs jobs from the scheduler's pool queue until it hands over None.
+        """
+        while True:
+            job = self.scheduler.poolQueue.get()
+            if job is None:
+                break
+            run_job(job)
+            self.scheduler.finish_job(job)
+        print("Killing " + self.name)
+
+
+def run_job(job):
+    """Calls the method of a scheduled job, catching any exception so one failing sensor can't stop the others.
+
+    :param job: ScheduledJob to run.
+    """
+    try:
+        methods[job.method]()
+    except Exception as e:
+        print("EXCEPTION IN " + job.name + ": " + str(e))
+
+
+def bus_transaction(device, method, priority, deadline=None, key=None):
+    """Runs a transfer on the I2C bus through the bus manager, waiting for its turn, and returns its result.
+
+    :param device: String name of the device used, eg. "APDS9300".
+    :param method: Function doing the transfer with the device's driver, taking no parameters.
+    :param priority: Integer priority, one of the BUS_PRIORITY constants.
+    :param deadline: Float of how many seconds the transfer can wait for the bus before being dropped, None to wait.
+    :param key: Hashable naming what a read returns so duplicate reads can be merged, None to never merge.
+    :return: Whatever the method returned, or None if the deadline passed first.
+    """
+    return get_bus_manager().submit(device, method, priority, deadline, key).wait()
+
+
+def get_bus_manager():
+    """Gets the running bus manager, starting one if there isn't one yet.
+
+    Once stop_bus_manager() has been called no new one is started until setup() is called again.
+    :return: BusManager which owns the I2C bus.
+    """
+    global busManager
+    busManagerLock.acquire()
+    try:
+        if busManagerStopped:
+            raise IOError("The I2C bus manager has been stopped")
+        if busManager is None:
+            busManager = BusManager()
+            busManager.start()
+        return busManager
+    finally:
+        busManagerLock.release()
+
+
+def stop_bus_manager():
+    """Stops the bus manager once the transactions already waiting have run and waits for it to finish.
+
+    Transactions submitted after this raise an IOError rather than starting a new bus manager.
+    """
+    global busManager, busManagerStopped
+    busManagerLock.acquire()
+    try:
+        stopping = busManager
+        busManager = None
+        busManagerStopped = True
+    finally:
+        busManagerLock.release()
+    if stopping is not None:
+        stopping.stop()
+        stopping.join()
+
+
+def get_bus_stats():
+    """Gets how much each device has used the I2C bus, to see what is keeping it busy.
+
+    :return: List of dictionaries of the bus use of each device, see BusManager.get_stats(). Empty if not running.
+    """
+    current_bus_manager = busManager
+    if current_bus_manager is None:
+        return []
+    return current_bus_manager.get_stats()
+
+
+class InterruptThread(threading.Thread):
+    """A Thread which runs a method each time a GPIO interrupt fires, so the GPIO callback is never held up by the bus.
+
+    Interrupts which fire while the method is already running are merged into one more run.
+    """
+    def __init__(self, thread_id, name, method):
+        """Initializes an Interrupt thread with an ID, name and the method to run on each interrupt.
+        """
+        threading.Thread.__init__(self)
+        self.threadID = thread_id
+        self.name = name
+        self.method = method
+        self.event = threading.Event()
+        self.running = True
+
+    def trigger(self, pin=None):
+        """Wakes the thread to run the method, used as the GPIO event callback.
+
+        :param pin: Pin number that the interrupt event came from, passed by the event.
+        """
+        self.event.set()
+
+    def stop(self):
+        """Tells the thread to stop without running the method again.
+        """
+        self.running = False
+        self.event.set()
+
+    def run(self):
+        """Runs the method each time the thread is triggered until stopped.
+        """
+        while True:
+            self.event.wait()
+            self.event.clear()
+            if not self.running:
+                break
+            try:
+                self.method()
+            except Exception as e:
+                print("EXCEPTION IN " + self.name + ": " + str(e))
+        print("Killing " + self.name)
+
+
+# Ways the buttons can be touched which button_handler() acts on
+buttonGestures = ("press", "long", "multi")
+# Most button interrupts waiting for the dispatcher before new ones are dropped
+buttonQueueSize = 64
+buttonEvents = Queue.Queue(buttonQueueSize)
+buttonDispatcher = None
+
+
+class ButtonDispatcherThread(threading.Thread):
+    """A Thread which turns the button interrupts queued by button_event_handler() into button gestures.
+
+    Reads which buttons are touched after each interrupt, retrying a failed read after a doubling delay, and reads
+    them at a doubling interval while held in case a release is missed. A touch is a press once let go for the
+    debounce time, or a long press once held for the long press time. Touching several buttons is a multi-touch.
+    Each gesture is acted on by button_handler(), timing how long after the input it started and how long it took,
+    then the LCD is redrawn to show the result.
+    """
+    def __init__(self, thread_id=7, name="ButtonDispatcherThread"):
+        """Initializes the Button Dispatcher thread with an ID and name.
+        """
+        threading.Thread.__init__(self)
+        self.threadID = thread_id
+        self.name = name
+        self.running = True
+        # Buttons touched since the press started, 0 when none are
+        self.touched = 0
+        self.pressStart = 0
+        self.pressLong = False
+        # When the buttons were let go, None until then
+        self.releaseTime = None
+        self.pollInterval = buttonPollInterval
+        self.interrupts = 0
+        self.dropped = 0
+        self.debounced = 0
+        self.readErrors = 0
+        self.gestures = dict((gesture, 0) for gesture in buttonGestures)
+        self.latencyTotal = 0
+        self.latencyMax = 0
+        self.actionTotal = 0
+        self.actionMax = 0
+
+    def stop(self):
+        """Tells the thread to stop without acting on any more gestures.
+        """
+        self.running = False
+        try:
+            buttonEvents.put_nowait((monotonic_time(), None))
+        except Queue.Full:
+            pass
+
+    def get_stats(self):
+        """Gets how many interrupts and gestures the dispatcher handled and how long the gestures took.
+
+        :return: Dictionary of the interrupt, dropped, debounced and read error counts, the count of each gesture and
+        the mean and max latency from the input to its action starting and of the action itself, in seconds.
+        """
+        actions = sum(self.gestures.values())
+        return {'interrupts': self.interrupts, 'dropped': self.dropped, 'debounced': self.debounced,
+                'readerrors': self.readErrors, 'gestures': dict(self.gestures),
+                'latency': self.latencyTotal / actions if actions else 0, 'maxlatency': self.latencyMax,
+                'action': self.actionTotal / actions if actions else 0, 'maxaction': self.actionMax}
+
+    def next_timeout(self, now):
+        """Gets how long to wait for an interrupt before checking on the buttons anyway.
+
+        :param now: Float monotonic time in seconds.
+        :return: Float of the seconds to wait, None to wait for the next interrupt however long it takes.
+        """
+        if self.releaseTime is not None:
+            return max(self.releaseTime + get_config("buttondebounce") - now, 0)
+        if not self.touched:
+            return None
+        if self.pressLong:
+            return self.pollInterval
+        return max(min(self.pollInterval, self.pressStart + get_config("buttonlongpress") - now), 0)
+
+    def read_touches(self):
+        """Reads which buttons are touched, trying again after a doubling delay if the read fails.
+
+        :return: Integer bits of the touched buttons, None if every attempt failed.
+        """
+        delay = buttonRetryDelay
+        for attempt in range(buttonReadAttempts):
+            try:
+                return bus_transaction("CAP1203", CapTouch.readTouches, BUS_PRIORITY_INPUT, key=("CAP1203", "touches"))
+            except Exception as e:
+                self.readErrors += 1
+                print("EXCEPTION IN " + self.name + ": " + str(e))
+                time.sleep(delay)
+                delay *= 2
+        return None
+
+    def dispatch(self, gesture, input_time):
+        """Acts on a gesture of the touched buttons.
+
+        :param gesture: String of the gesture, one of buttonGestures.
+        :param input_time: Float monotonic time in seconds of the input which completed the gesture.
+        """
+        pressed = CAP_TOUCH.BUTTONS.get(self.touched, 0)
+        start = monotonic_time()
+        latency = start - input_time
+        self.latencyTotal += latency
+        self.latencyMax = max(self.latencyMax, latency)
+        self.gestures[gesture] += 1
+        if pressed:
+            publish_values(button=pressed)
+        try:
+            button_handler(pressed, gesture)
+            # Redraw straight away rather than on the next refresh, so the LCD keeps up with the buttons
+            if get_config("displayenabled"):
+                display_values(input_time)
+        except Exception as e:
+            print("EXCEPTION IN " + self.name + ": " + str(e))
+        action = monotonic_time() - start
+        self.actionTotal += action
+        self.actionMax = max(self.actionMax, action)
+
+    def run(self):
+        """Reads the buttons after each interrupt and acts on their gestures until stopped.
+        """
+        while True:
+            try:
+                event_time, pin = buttonEvents.get(True, self.next_timeout(monotonic_time()))
+                self.interrupts += 1
+                # Interrupts which queued up while busy only need one read
+                while True:
+                    try:
+                        buttonEvents.get_nowait()
+                        self.interrupts += 1
+                    except Queue.Empty:
+                        break
+                self.pollInterval = buttonPollInterval
+            except Queue.Empty:
+                event_time = None
+            if not self.running:
+                break
+            now = monotonic_time()
+            if event_time is None:
+                if self.releaseTime is not None:
+                    # Let go for the whole debounce time, so the press is over
+                    if not self.pressLong:
+                        self.dispatch("multi" if self.touched not in CAP_TOUCH.BUTTONS else "press",
+                                      self.releaseTime)
+                    self.touched = 0
+                    self.releaseTime = None
+                    GPIO.output(LED_PIN, False)
+                    continue
+                # Still held without an interrupt, read it less often the longer that goes on
+                event_time = now
+                self.pollInterval = min(self.pollInterval * 2, buttonPollMax)
+            touches = self.read_touches()
+            if touches is None:
+                continue
+            if touches:
+                if self.releaseTime is not None:
+                    # Touched again before the debounce time was up, the same press bouncing
+                    self.releaseTime = None
+                    self.debounced += 1
+                elif not self.touched:
+                    self.pressStart = event_time
+                    self.pressLong = False
+                    GPIO.output(LED_PIN, True)
+                self.touched |= touches
+            elif self.touched and self.releaseTime is None:
+                self.releaseTime = event_time
+            long_press_time = self.pressStart + get_config("buttonlongpress")
+            if (self.touched in CAP_TOUCH.BUTTONS and not self.pressLong and self.releaseTime is None and
+                    monotonic_time() >= long_press_time):
+                self.pressLong = True
+                self.dispatch("long", long_press_time)
+        print("Killing " + self.name)
+
+
+class FlaskThread(threading.Thread):
+    """A Thread class specifically to run a Flask server in the background.
+
+    Terminates when an authenticated POST to /shutdown is made or shutdown_server() is called.
+    """
+    def __init__(self):
+        """Initializes a Flask Thread with only a default ID and name.
+        """
+        threading.Thread.__init__(self)
+        self.threadID = 99
+        self.name = "FlaskThread"
+
+    def run(self):
+        """Runs a Flask server continuously until terminated.
+
+        Can be terminated by an authenticated POST to /shutdown or call of shutdown_server().
+        """
+        run_flask()
+        print("Killing FlaskThread")
+
+
+class SocketThread(threading.Thread):
+    """A Thread class specifically to establish a socket with a Sensorian Hub Site relay server.
+
+    The socket code is kind of janky with no real schema yet, but allows for configuration behind NATs and firewalls.
+    """
+    def __init__(self):
+        """Initializes the Socket thread with the config values for address, port and defaults for timings and ID/name.
+        """
+        threading.Thread.__init__(self)
+        self.threadID = 100
+        self.name = "SocketThread"
+        self.connected = False
+        self.host = get_config("relayaddress")
+        self.port = get_config("relayport")
+        self.repeat = check_sentinel("SocketSentinel")
+        self.slept = 0
+        self.keep_alive = 5
+        self.timeout = 5.0
+
+    def run(self):
+        """Loops attempts to establish a socket and waits for commands from the server when one is established.
+
+        Can be terminated by setting the SocketSentinel to False.
         """
         while self.repeat:
             if not self.connected:
@@ -569,248 +2272,105 @@ class SocketThread(threading.Thread):
                 self.slept = 0
             elif self.slept < self.keep_alive:
                 self.slept += 1
-            self.repeat = check_sentinel("SocketSentinel")
-            time.sleep(1)
+            # Wait a second between loops, waking straight away if the sentinel is disabled
+            self.repeat = not sentinels["SocketSentinel"].wait_disabled(1)
         s.close()
         print("Killing SocketThread")
 
 
 def update_light():
-    """Updates the global light variable by reading the Lux value from the Sensorian ambient light sensor.
+    """Updates the light value in the sensor snapshot from the selected backend.
 
-    This is called by the Light Thread, but can be called directly as well.
+    The Light job calls the backend directly, but this can be called directly as well.
     """
-    global light
-    if get_config_value("hatenabled") == "True":
-        if get_config_value("hatused") == "Sensorian":
-            temp_light = -1
-            I2CLock.acquire()
-            # Try to initialize and update the light value
-            # Sometimes it excepts, so catch it if it does
-            try:
-                ambient_light = LUX_SENSOR.APDS9300()
-                channel1 = ambient_light.readChannel(1)
-                channel2 = ambient_light.readChannel(0)
-                temp_light = ambient_light.getLuxLevel(channel1, channel2)
-            except:
-                print("EXCEPTION IN LIGHT UPDATE")
-            I2CLock.release()
-            # Update the global light level when safe
-            lightLock.acquire()
-            light = temp_light
-            lightLock.release()
-        elif get_config_value("hatused") == "Sense HAT":
-            lightLock.acquire()
-            light = -1
-            lightLock.release()
+    backend.update_light()
 
 
 def get_light():
-    """Gets the most recent update of the global light variable when not locked.
+    """Gets the light value from the latest sensor snapshot.
 
     :return: Float of the last updated light value.
     """
-    lightLock.acquire()
-    try:
-        temp_light = light
-    finally:
-        lightLock.release()
-    return temp_light
+    return snapshot.light
 
 
 def get_ambient_temp():
-    """Gets the most recent update of the global ambient temperature variable when not locked.
+    """Gets the ambient temperature from the latest sensor snapshot.
 
     :return: Float of the last updated ambient temperature.
     """
-    ambientTempLock.acquire()
-    return_temp = ambientTemp
-    ambientTempLock.release()
-    return return_temp
+    return snapshot.ambient_temp
 
 
 def get_ambient_pressure():
-    """Gets the most recent update of the global barometric pressure variable when not locked.
+    """Gets the barometric pressure from the latest sensor snapshot in kPa.
 
     :return: Float of the last updated barometric pressure.
     """
-    ambientPressureLock.acquire()
-    return_press = float(ambientPressure) / 1000
-    ambientPressureLock.release()
-    return return_press
+    return float(snapshot.ambient_pressure) / 1000
 
 
 def update_ambient():
-    """Updates the global ambient temperature and pressure variables by using the Sensorian Altibar sensor.
-
-    This is called by the Ambient Thread, but can be called directly as well.
-    """
-    global ambientTemp
-    global ambientPressure
-    if get_config_value("hatenabled") == "True":
-        if get_config_value("hatused") == "Sensorian":
-            # Sensor needs some wait time between calls
-            time.sleep(0.5)
-            # Update the ambient temperature global variable
-            I2CLock.acquire()
-            temp = AltiBar.ReadTemperature()
-            I2CLock.release()
-            time.sleep(0.5)
-            ambientTempLock.acquire()
-            ambientTemp = temp
-            ambientTempLock.release()
-            # Check to see if pressure is desired
-            pressureEnabledLock.acquire()
-            temp_enabled = pressureEnabled
-            pressureEnabledLock.release()
-            # If pressure is needed, update the global variable when safe
-            if temp_enabled:
-                I2CLock.acquire()
-                press = AltiBar.ReadBarometricPressure()
-                I2CLock.release()
-                ambientPressureLock.acquire()
-                ambientPressure = press
-                ambientPressureLock.release()
-            else:
-                print("NoPressureNeeded")
-            # Getting altitude as well would result in additional sleeps
-            # for the sensor, may calculate from location/pressure/temp
-            '''
-            altitudeEnabledLock.acquire()
-            temp_enabled = pressureEnabled
-            altitudeEnabledLock.release()
-            if (temp_enabled):
-                I2CLock.acquire()
-                alt = AltiBar.ReadBarometricPressure()
-                I2CLock.release()
-                ambientPressureLock.acquire()
-                ambientPressure = press
-                ambientPressureLock.release()
-            else:
-                print "NoAltitudeNeeded"
-            '''
-        elif get_config_value("hatused") == "Sense HAT":
-            # Update the ambient temperature global variable
-            I2CLock.acquire()
-            temp = sensehat.temperature
-            I2CLock.release()
-            ambientTempLock.acquire()
-            ambientTemp = temp
-            ambientTempLock.release()
-            # Check to see if pressure is desired
-            pressureEnabledLock.acquire()
-            temp_enabled = pressureEnabled
-            pressureEnabledLock.release()
-            # If pressure is needed, update the global variable when safe
-            if temp_enabled:
-                I2CLock.acquire()
-                press = sensehat.pressure
-                I2CLock.release()
-                ambientPressureLock.acquire()
-                ambientPressure = press
-                ambientPressureLock.release()
-            else:
-                print("NoPressureNeeded")
+    """Updates the ambient temperature and pressure in the sensor snapshot from the selected backend.
+
+    The Ambient job calls the backend directly, but this can be called directly as well.
+    """
+    backend.update_ambient()
 
 
 def update_date_time():
-    """Updates the global RTC date/time object by polling the date and time from the Sensorian real-time clock.
-
-    This is called by the Time Thread, but can be called directly as well.
-    """
-    global currentDateTime
-    if get_config_value("hatenabled") == "True":
-        if get_config_value("hatused") == "Sensorian":
-            I2CLock.acquire()
-            temp_date_time = RTC.GetTime()
-            I2CLock.release()
-            temp_date = datetime.date(2000 + temp_date_time.year, temp_date_time.month, temp_date_time.date)
-            temp_time = datetime.time(temp_date_time.hour, temp_date_time.min, temp_date_time.sec)
-            temp_datetime = datetime.datetime.combine(temp_date, temp_time)
-            rtcLock.acquire()
-            currentDateTime = temp_datetime
-            rtcLock.release()
-        elif get_config_value("hatused") == "Sense HAT":
-            rtcLock.acquire()
-            currentDateTime = datetime.datetime.now()
-            rtcLock.release()
-        else:
-            rtcLock.acquire()
-            currentDateTime = datetime.datetime.now()
-            rtcLock.release()
-    else:
-        rtcLock.acquire()
-        currentDateTime = datetime.datetime.now()
-        rtcLock.release()
+    """Updates the date/time in the sensor snapshot from the selected backend.
+
+    The Time job calls the backend directly, but this can be called directly as well.
+    """
+    backend.update_date_time()
 
 
 def get_date_time():
-    """Gets the most recent update of the global RTC date/time object when not locked.
+    """Gets the date/time object from the latest sensor snapshot.
 
-    :return: RTC date/time object containing the last updated date and time.
+    :return: Date/time object containing the last updated date and time.
     """
-    rtcLock.acquire()
-    temp_date_time = currentDateTime
-    rtcLock.release()
-    return temp_date_time
+    return snapshot.date_time
 
 
 def update_cpu_temp():
-    """Updates the global CPU temperature variable by reading the value from the system temperature file.
+    """Updates the CPU temperature in the sensor snapshot by reading the value from the system temperature file.
 
-    This is called by the CPU Thread, but can be called directly as well.
+    This is called by the CPU job, but can be called directly as well.
     """
     # Read the CPU temperature from the system file
-    global cpuTemp
     temp_path = '/sys/class/thermal/thermal_zone0/temp'
     temp_file = open(temp_path)
     cpu = temp_file.read()
     temp_file.close()
-    temp = (float(cpu) / 1000)
-    # Update the global variable when safe
-    cpuTempLock.acquire()
-    cpuTemp = temp
-    cpuTempLock.release()
+    publish_values(cpu_temp=float(cpu) / 1000)
 
 
 def get_cpu_temp():
-    """Gets the most recent update of the global CPU temperature variable when not locked.
+    """Gets the CPU temperature from the latest sensor snapshot.
 
     :return: Float containing the last updated CPU temperature in Celcius.
     """
-    cpuTempLock.acquire()
-    temp = cpuTemp
-    cpuTempLock.release()
-    return temp
+    return snapshot.cpu_temp
 
 
 def update_watched_interface_ip():
-    """Updates the global Watched Network Interface IP variable by calling get_interface_ip().
+    """Updates the Watched Network Interface IP in the sensor snapshot by calling get_interface_ip().
 
-    This is called by the Update Watched IP Thread, but can be called directly as well.
+    This is called by the Update Watched IP job, but can be called directly as well.
     """
-    global interfaceIP
-    watchedInterfaceLock.acquire()
-    temp_interface = watchedInterface
-    watchedInterfaceLock.release()
-    ipaddr = get_interface_ip(temp_interface)
-    interfaceIPLock.acquire()
-    interfaceIP = ipaddr
-    interfaceIPLock.release()
-    if get_config_value("hatenabled") == "True":
-        if get_config_value("hatused") == "Sense HAT":
-            sensehat.show_message("IP: " + ipaddr)
+    ipaddr = get_interface_ip(get_config("watchedinterface"))
+    publish_values(interface_ip=ipaddr)
+    backend.show_message("IP: " + ipaddr)
 
 
 def get_watched_interface_ip():
-    """Gets the most recent update of the global watched network interface IP variable when not locked.
+    """Gets the watched network interface IP from the latest sensor snapshot.
 
     :return: String of the watched network interface's IP from the last update.
     """
-    interfaceIPLock.acquire()
-    temp_ip = interfaceIP
-    interfaceIPLock.release()
-    return temp_ip
+    return snapshot.interface_ip
 
 
 def get_interface_ip(interface):
@@ -840,356 +2400,175 @@ def get_interface_ip(interface):
 
 
 def update_public_ip():
-    """Updates the global Public IP variable by calling curl on icanhazip.com
+    """Updates the Public IP in the sensor snapshot by calling curl on icanhazip.com
 
-    Called by Update Public IP Thread, but can be called directly as well.
+    Called by the Update Public IP job, but can be called directly as well.
     Gets the IP from icanhazip.com. As with any Internet resource, please be respectful.
     Ie. Don't update too frequently, that's not cool.
     """
-    global publicIP
     # Initiate a subprocess to run a curl request for the public IP
     proc = subprocess.Popen(["curl", "-s", "-4", "icanhazip.com"], stdout=subprocess.PIPE)
     (out, err) = proc.communicate()
-    # Store the response of the request when safe
-    publicIPLock.acquire()
-    publicIP = out.rstrip()
-    publicIPLock.release()
+    publish_values(public_ip=out.rstrip())
 
 
 def get_public_ip():
-    """Gets the most recent update of the global public IP variable when not locked.
+    """Gets the public IP from the latest sensor snapshot.
 
     :return: String of the public IP of the Client from the last update.
     """
-    publicIPLock.acquire()
-    temp_ip = publicIP
-    publicIPLock.release()
-    return temp_ip
+    return snapshot.public_ip
 
 
 def update_accelerometer():
-    """Updates all the various Accelerometer-related global variables by polling the Sensorian's Accelerometer.
+    """Updates the acceleration and orientation in the sensor snapshot from the selected backend.
 
-    This is called by the Accel Thread, but can be called directly as well.
+    The IMU job calls the backend's update_imu() instead, but this can be called directly.
     """
-    global mode, modeprevious, accelX, accelY, accelZ
-    if get_config_value("hatenabled") == "True":
-        if get_config_value("hatused") == "Sensorian":
-            I2CLock.acquire()
-            # If the accelerometer is ready, read the orientation and forces
-            if imuSensor.readStatusReg() & 0x80:
-                x, y, z = imuSensor.pollAccelerometer()
-                orienta = imuSensor.getOrientation()
-                I2CLock.release()
-                # Store the various global variables when safe
-                accelXLock.acquire()
-                accelX = x
-                accelXLock.release()
-                accelYLock.acquire()
-                accelY = y
-                accelYLock.release()
-                accelZLock.acquire()
-                accelZ = z
-                accelZLock.release()
-                modeLock.acquire()
-                mode = (orienta >> 1) & 0x03
-                modeLock.release()
-                if mode != modeprevious:
-                    # Alert change in orientation if required
-                    # print "Changed orientation"
-                    modeprevious = get_mode()
-            else:
-                I2CLock.release()
-        elif get_config_value("hatused") == "Sense HAT":
-            I2CLock.acquire()
-            temp_accel = sensehat.accelerometer_raw
-            I2CLock.release()
-            x = temp_accel.get('x')
-            y = temp_accel.get('y')
-            z = temp_accel.get('z')
-            accelXLock.acquire()
-            accelX = x
-            accelXLock.release()
-            accelYLock.acquire()
-            accelY = y
-            accelYLock.release()
-            accelZLock.acquire()
-            accelZ = z
-            accelZLock.release()
+    backend.update_accelerometer()
+
+
+def update_imu():
+    """Updates the enabled IMU values in the sensor snapshot from the selected backend, from one sample if it can.
+
+    The IMU job calls the backend directly, but this can be called directly as well.
+    """
+    backend.update_imu()
 
 
 def update_magnetometer():
-    """Updates all the various Magnetometer-related global variables by polling the Sensorian's Magnetometer.
+    """Updates the magnetic forces in the sensor snapshot from the selected backend.
 
-    This is called by the Magnet Thread, but can be called directly as well.
+    The IMU job calls the backend's update_imu() instead, but this can be called directly.
     """
-    global magnetX, magnetY, magnetZ
-    if get_config_value("hatenabled") == "True":
-        if get_config_value("hatused") == "Sensorian":
-            I2CLock.acquire()
-            # If the magnetometer is ready, read the magnetic forces
-            if imuSensor.readStatusReg() & 0x80:
-                magnet_x, magnet_y, magnet_z = imuSensor.pollMagnetometer()
-                I2CLock.release()
-                # Store the various global variables when safe
-                magnetXLock.acquire()
-                magnetX = magnet_x
-                magnetXLock.release()
-                magnetYLock.acquire()
-                magnetY = magnet_y
-                magnetYLock.release()
-                magnetZLock.acquire()
-                magnetZ = magnet_z
-                magnetZLock.release()
-            else:
-                I2CLock.release()
-        elif get_config_value("hatused") == "Sense HAT":
-            I2CLock.acquire()
-            temp_mag = sensehat.compass_raw
-            I2CLock.release()
-            magnet_x = temp_mag.get('x')
-            magnet_y = temp_mag.get('y')
-            magnet_z = temp_mag.get('z')
-            magnetXLock.acquire()
-            magnetX = magnet_x
-            magnetXLock.release()
-            magnetYLock.acquire()
-            magnetY = magnet_y
-            magnetYLock.release()
-            magnetZLock.acquire()
-            magnetZ = magnet_z
-            magnetZLock.release()
+    backend.update_magnetometer()
 
 
 def get_mag_x():
-    """Gets the most recent update of the global magnetic force x variable when not locked.
+    """Gets the magnetic force x from the latest sensor snapshot.
 
     :return: Integer of the last updated magnetic force in the X direction
     """
-    magnetXLock.acquire()
-    x = magnetX
-    magnetXLock.release()
-    return x
+    return snapshot.mag_x
 
 
 def get_mag_y():
-    """Gets the most recent update of the global magnetic force y variable when not locked.
+    """Gets the magnetic force y from the latest sensor snapshot.
 
     :return: Integer of the last updated magnetic force in the Y direction
     """
-    magnetYLock.acquire()
-    y = magnetY
-    magnetYLock.release()
-    return y
+    return snapshot.mag_y
 
 
 def get_mag_z():
-    """Gets the most recent update of the global magnetic force z variable when not locked.
+    """Gets the magnetic force z from the latest sensor snapshot.
 
     :return: Integer of the last updated magnetic force in the Z direction
     """
-    magnetZLock.acquire()
-    z = magnetZ
-    magnetZLock.release()
-    return z
+    return snapshot.mag_z
 
 
 def get_mode():
-    """Gets the most recent update of the global orientation variable when not locked.
+    """Gets the orientation from the latest sensor snapshot.
 
     :return: Integer of the last updated orientation
     """
-    modeLock.acquire()
-    temp_mode = mode
-    modeLock.release()
-    return temp_mode
+    return snapshot.mode
 
 
 def get_accel_x():
-    """Gets the most recent update of the global acceleration x variable when not locked.
+    """Gets the acceleration x from the latest sensor snapshot.
 
     :return: Integer of the last updated acceleration in the X direction
     """
-    accelXLock.acquire()
-    x = accelX
-    accelXLock.release()
-    return x
+    return snapshot.accel_x
 
 
 def get_accel_y():
-    """Gets the most recent update of the global acceleration y variable when not locked.
+    """Gets the acceleration y from the latest sensor snapshot.
 
     :return: Integer of the last updated acceleration in the Y direction
     """
-    accelYLock.acquire()
-    y = accelY
-    accelYLock.release()
-    return y
+    return snapshot.accel_y
 
 
 def get_accel_z():
-    """Gets the most recent update of the global acceleration z variable when not locked.
+    """Gets the acceleration z from the latest sensor snapshot.
 
     :return: Integer of the last updated acceleration in the Z direction
     """
-    accelZLock.acquire()
-    z = accelZ
-    accelZLock.release()
-    return z
+    return snapshot.accel_z
 
 
 def button_event_handler(pin):
     """Method that is called when an interrupt is generated on the Sensorian Capacitive Button interrupt pin.
 
-    Updates the global button variable with the button pressed and calls the button_handler with that button.
-    Called by the interrupt event exclusively. Could be called directly with CAP_PIN passed with unknown results.
+    Only queues the time of the interrupt for the ButtonDispatcherThread, which reads the buttons and acts on them,
+    so the GPIO callback thread is never held up. Interrupts are dropped and counted if the queue is full.
+    Called by the interrupt event exclusively. Could be called directly with CAP_PIN passed to simulate one.
     :param pin: Pin number that the interrupt event came from, passed by the event.
     """
     # Confirms that the interrupt came from the button pin just
     # so your IDE doesn't complain about pin going unused
     if pin == CAP_PIN:
-        GPIO.output(LED_PIN, True)
-        global button
-        I2CLock.acquire()
-        temp_new_button = CapTouch.readPressedButton()
-        I2CLock.release()
-        buttonLock.acquire()
-        button = temp_new_button
-        buttonLock.release()
-        while temp_new_button == 0:
-            I2CLock.acquire()
-            temp_new_button = CapTouch.readPressedButton()
-            I2CLock.release()
-        button_handler(temp_new_button)
-        GPIO.output(LED_PIN, False)
+        try:
+            buttonEvents.put_nowait((monotonic_time(), pin))
+        except Queue.Full:
+            if buttonDispatcher is not None:
+                buttonDispatcher.dropped += 1
+
+
+def get_button_stats():
+    """Gets how many button gestures were dispatched and how long they took to act on, to see if the buttons lag.
+
+    :return: Dictionary of the button statistics, see ButtonDispatcherThread.get_stats(). Empty if not running.
+    """
+    current_dispatcher = buttonDispatcher
+    if current_dispatcher is None:
+        return {}
+    return current_dispatcher.get_stats()
 
 
 def get_button():
-    """Gets the number of the button pressed from the last update/interrupt.
+    """Gets the number of the button pressed from the latest sensor snapshot.
 
     :return: Integer of which was the last button pressed.
     """
-    buttonLock.acquire()
-    temp_button = button
-    buttonLock.release()
-    return temp_button
+    return snapshot.button
 
 
 def check_sentinel(sentinel):
-    """Checks the current state of the global sentinel boolean variable passed to the method.
+    """Checks the current state of the sentinel passed to the method.
 
-    Called by threads to check if they should be started at boot/continue executing.
-    Can be called directly to check the current state of these sentinel variables safely.
-    :param sentinel: String name of the Sentinel variable to be checked.
+    Called by jobs and threads to check if they should be started at boot/continue executing.
+    Can be called directly to check the current state of these sentinels safely.
+    :param sentinel: String name of the Sentinel to be checked.
     :return: Boolean of the state of the sentinel checked, defaults to False if not found.
     """
-    # Check the thread's method name against the statements to
-    # find their respective sentinel variables
-    if sentinel == "UpdateDateTime":
-        timeEnabledLock.acquire()
-        state = timeEnabled
-        timeEnabledLock.release()
-    elif sentinel == "UpdateAmbient":
-        ambientEnabledLock.acquire()
-        state = ambientEnabled
-        ambientEnabledLock.release()
-    elif sentinel == "UpdateLight":
-        lightEnabledLock.acquire()
-        state = lightEnabled
-        lightEnabledLock.release()
-    elif sentinel == "UpdateCPUTemp":
-        cpuEnabledLock.acquire()
-        state = cpuEnabled
-        cpuEnabledLock.release()
-    elif sentinel == "UpdateWatchedInterfaceIP":
-        interfaceIPEnabledLock.acquire()
-        state = interfaceIPEnabled
-        interfaceIPEnabledLock.release()
-    elif sentinel == "UpdatePublicIP":
-        publicIPEnabledLock.acquire()
-        state = publicIPEnabled
-        publicIPEnabledLock.release()
-    elif sentinel == "UpdateAccelerometer":
-        accelEnabledLock.acquire()
-        state = accelEnabled
-        accelEnabledLock.release()
-    elif sentinel == "ButtonEnabled":
-        buttonEnabledLock.acquire()
-        state = buttonEnabled
-        buttonEnabledLock.release()
-    elif sentinel == "SendValues":
-        sendEnabledLock.acquire()
-        state = sendEnabled
-        sendEnabledLock.release()
-    elif sentinel == "SocketSentinel":
-        socketEnabledLock.acquire()
-        state = socketEnabled
-        socketEnabledLock.release()
-    elif sentinel == "UpdateMagnetometer":
-        magnetEnabledLock.acquire()
-        state = magnetEnabled
-        magnetEnabledLock.release()
-    else:
-        state = False
-    return state
+    sentinel_flag = sentinels.get(sentinel)
+    return sentinel_flag is not None and sentinel_flag.is_set()
 
 
 def set_sentinel(sentinel, state):
-    """Sets the current state of the global sentinel boolean variable passed to the method to the passed state.
-
-    Called in cleanup() to terminate all the threads at the end of the Client's execution.
-    Can be called directly to stop a specific thread or to prepare a thread to be started.
-    :param sentinel: String name of the Sentinel variable to be set.
-    :param state: Boolean state to which the Sentinel variable will be set.
-    """
-    global timeEnabled, ambientEnabled, lightEnabled, cpuEnabled, interfaceIPEnabled, publicIPEnabled, \
-        accelEnabled, buttonEnabled, sendEnabled, socketEnabled, magnetEnabled
-    # Check the thread's method name against the statements to
-    # find their respective sentinel variables
-    if sentinel == "UpdateDateTime":
-        timeEnabledLock.acquire()
-        timeEnabled = state
-        timeEnabledLock.release()
-    elif sentinel == "UpdateAmbient":
-        ambientEnabledLock.acquire()
-        ambientEnabled = state
-        ambientEnabledLock.release()
-    elif sentinel == "UpdateLight":
-        lightEnabledLock.acquire()
-        lightEnabled = state
-        lightEnabledLock.release()
-    elif sentinel == "UpdateCPUTemp":
-        cpuEnabledLock.acquire()
-        cpuEnabled = state
-        cpuEnabledLock.release()
-    elif sentinel == "UpdateWatchedInterfaceIP":
-        interfaceIPEnabledLock.acquire()
-        interfaceIPEnabled = state
-        interfaceIPEnabledLock.release()
-    elif sentinel == "UpdatePublicIP":
-        publicIPEnabledLock.acquire()
-        publicIPEnabled = state
-        publicIPEnabledLock.release()
-    elif sentinel == "UpdateAccelerometer":
-        accelEnabledLock.acquire()
-        accelEnabled = state
-        accelEnabledLock.release()
-    elif sentinel == "ButtonEnabled":
-        buttonEnabledLock.acquire()
-        buttonEnabled = state
-        buttonEnabledLock.release()
-    elif sentinel == "SendValues":
-        sendEnabledLock.acquire()
-        sendEnabled = state
-        sendEnabledLock.release()
-    elif sentinel == "SocketSentinel":
-        socketEnabledLock.acquire()
-        socketEnabled = state
-        socketEnabledLock.release()
-    elif sentinel == "UpdateMagnetometer":
-        magnetEnabledLock.acquire()
-        magnetEnabled = state
-        magnetEnabledLock.release()
+    """Sets the current state of the sentinel passed to the method to the passed state.
+
+    Called in cleanup() to terminate all the jobs and threads at the end of the Client's execution.
+    Can be called directly to stop a specific job or thread or to prepare one to be started.
+    Any job or thread waiting on the sentinel is woken as soon as it changes.
+    :param sentinel: String name of the Sentinel to be set.
+    :param state: Boolean state to which the Sentinel will be set.
+    """
+    sentinel_flag = sentinels.get(sentinel)
+    if sentinel_flag is not None:
+        sentinel_flag.set(state)
+
+
+def get_sentinel_states():
+    """Gets the state of every sentinel.
+
+    :return: Dictionary of the boolean state of each sentinel by name.
+    """
+    return dict((name, sentinel_flag.is_set()) for name, sentinel_flag in sentinels.items())
 
 
 def ifttt_trigger(key="xxxxxxxxxxxxxxxxxxxxxx", event="SensorianEvent", timeout=5, value1="", value2="", value3=""):
@@ -1240,12 +2619,15 @@ def set_menu_elements(new_list):
     menuElementsLock.release()
 
 
-def button_handler(pressed):
+def button_handler(pressed, gesture="press"):
     """Handles button presses on the Sensorian Shield to fire an event or display/interact with a local config menu.
 
-    Called by button_event_handler() when a button interrupt is received.
+    A long press closes the menu, or fires an event for the button outside of it. Touching several buttons at once
+    fires an event outside of the menu.
+    Called by the ButtonDispatcherThread when a button gesture is complete.
     Could be called directly to automate menu interactions for demonstration purposes.
-    :param pressed: Integer of the last button pressed.
+    :param pressed: Integer of the last button pressed, 0 for several at once.
+    :param gesture: String of how the button was touched, one of buttonGestures.
     """
     if check_sentinel("ButtonEnabled"):
         global inMenu
@@ -1254,7 +2636,18 @@ def button_handler(pressed):
         inMenuLock.acquire()
         temp_in_menu = inMenu
         inMenuLock.release()
-        if not temp_in_menu:
+        if gesture == "long" and temp_in_menu:
+            print("Menu Long Pressed " + str(pressed))
+            close_menu()
+        elif gesture == "long":
+            print("Display Long Pressed " + str(pressed))
+            ifttt_trigger(key=get_config("iftttkey"), event="SensorianButton" + str(pressed) + "Long",
+                          value1=get_serial())
+        elif gesture == "multi":
+            if not temp_in_menu:
+                print("Display Multi-Touched")
+                ifttt_trigger(key=get_config("iftttkey"), event="SensorianMultiTouch", value1=get_serial())
+        elif not temp_in_menu:
             print("Display Pressed " + str(pressed))
             if pressed == 2:
                 inMenuLock.acquire()
@@ -1264,9 +2657,9 @@ def button_handler(pressed):
                 set_menu_elements(topMenuElements)
                 cursor_to_top()
             elif pressed == 1:
-                ifttt_trigger(key=iftttKey, event="SensorianButton1", value1=get_serial())
+                ifttt_trigger(key=get_config("iftttkey"), event="SensorianButton1", value1=get_serial())
             elif pressed == 3:
-                ifttt_trigger(key=iftttKey, event="SensorianButton3", value1=get_serial())
+                ifttt_trigger(key=get_config("iftttkey"), event="SensorianButton3", value1=get_serial())
         else:
             print("Menu Pressed " + str(pressed))
             currentMenuLock.acquire()
@@ -1673,458 +3066,95 @@ def cursor_to_top():
     menuPositionLock.release()
 
 
+def get_config(name, default=None):
+    """Gets the current typed value of the passed config variable name without taking a lock.
+
+    :param name: String name of the config value to be checked. Naming matches that of the config file.
+    :param default: Value to return if there's no config variable by that name.
+    :return: Current value of the config variable as the type in its schema, eg. Float for intervals.
+    """
+    return configValues.get(name, default)
+
+
 def get_config_value(name):
-    """Gets the current value of the passed config variable name.
+    """Gets the current value of the passed config variable name as a string.
 
-    Functionality may be combined/reorganized with that of check_sentinel() in the future.
     :param name: String name of the config value to be checked. Naming matches that of the config file.
     :return: String of the current value of the config variable, needs to be casted back if string not desired.
+    "ConfigNotFound" if there's no config variable by that name.
     """
-    # UI Section
-    if name == "defaultorientation":
-        defaultOrientationLock.acquire()
-        return_value = defaultOrientation
-        defaultOrientationLock.release()
-    elif name == "lockorientation":
-        lockOrientationLock.acquire()
-        return_value = lockOrientation
-        lockOrientationLock.release()
-    elif name == "refreshinterval":
-        sleepTimeLock.acquire()
-        return_value = sleepTime
-        sleepTimeLock.release()
-    elif name == "displayenabled":
-        displayEnabledLock.acquire()
-        return_value = displayEnabled
-        displayEnabledLock.release()
-    elif name == "printenabled":
-        printEnabledLock.acquire()
-        return_value = printEnabled
-        printEnabledLock.release()
-    # General Section
-    elif name == "watchedinterface":
-        watchedInterfaceLock.acquire()
-        return_value = watchedInterface
-        watchedInterfaceLock.release()
-    elif name == "cputempinterval":
-        cpuTempIntervalLock.acquire()
-        return_value = cpuTempInterval
-        cpuTempIntervalLock.release()
-    elif name == "interfaceinterval":
-        interfaceIntervalLock.acquire()
-        return_value = interfaceInterval
-        interfaceIntervalLock.release()
-    elif name == "publicinterval":
-        publicIntervalLock.acquire()
-        return_value = publicInterval
-        publicIntervalLock.release()
-    # Requests Section
-    elif name == "sendenabled":
-        sendEnabledLock.acquire()
-        return_value = sendEnabled
-        sendEnabledLock.release()
-    elif name == "postinterval":
-        postIntervalLock.acquire()
-        return_value = postInterval
-        postIntervalLock.release()
-    elif name == "posttimeout":
-        postTimeoutLock.acquire()
-        return_value = postTimeout
-        postTimeoutLock.release()
-    elif name == "serverurl":
-        serverURLLock.acquire()
-        return_value = serverURL
-        serverURLLock.release()
-    elif name == "iftttkey":
-        iftttKeyLock.acquire()
-        return_value = iftttKey
-        iftttKeyLock.release()
-    elif name == "iftttevent":
-        iftttEventLock.acquire()
-        return_value = iftttEvent
-        iftttEventLock.release()
-    # Ambient Section
-    elif name == "ambientenabled":
-        ambientEnabledLock.acquire()
-        return_value = ambientEnabled
-        ambientEnabledLock.release()
-    elif name == "ambientinterval":
-        ambientIntervalLock.acquire()
-        return_value = ambientInterval
-        ambientIntervalLock.release()
-    # Light Section
-    elif name == "lightenabled":
-        lightEnabledLock.acquire()
-        return_value = lightEnabled
-        lightEnabledLock.release()
-    elif name == "lightinterval":
-        lightIntervalLock.acquire()
-        return_value = lightInterval
-        lightIntervalLock.release()
-    # Accelerometer Section
-    elif name == "accelenabled":
-        accelEnabledLock.acquire()
-        return_value = accelEnabled
-        accelEnabledLock.release()
-    elif name == "accelinterval":
-        accelIntervalLock.acquire()
-        return_value = accelInterval
-        accelIntervalLock.release()
-    elif name == "relayaddress":
-        relayAddressLock.acquire()
-        return_value = relayAddress
-        relayAddressLock.release()
-    elif name == "relayport":
-        relayPortLock.acquire()
-        return_value = relayPort
-        relayPortLock.release()
-    elif name == "configusername":
-        configUsernameLock.acquire()
-        return_value = configUsername
-        configUsernameLock.release()
-    elif name == "configpassword":
-        configPasswordLock.acquire()
-        return_value = configPassword
-        configPasswordLock.release()
-    elif name == "hatenabled":
-        hatEnabledLock.acquire()
-        return_value = hatEnabled
-        hatEnabledLock.release()
-    elif name == "hatused":
-        hatUsedLock.acquire()
-        return_value = hatUsed
-        hatUsedLock.release()
-    # If variable name wasn't found in the config, return this message
-    else:
-        return_value = "ConfigNotFound"
-    return str(return_value)
+    if name not in configValues:
+        return "ConfigNotFound"
+    return str(configValues[name])
+
+
+def parse_config_value(option, value):
+    """Casts a value to the type of the passed config variable and checks it against the variable's validator.
+
+    :param option: ConfigOption from the CONFIG_SCHEMA of the variable.
+    :param value: String or already typed value to be parsed.
+    :return: 2-item list, with a boolean indicating if the value is valid and if so the parsed value in the second item.
+    """
+    if option.type is bool:
+        if isinstance(value, bool):
+            return [True, value]
+        return bool_check(str(value))
+    try:
+        parsed = option.type(value)
+    except (TypeError, ValueError):
+        return [False, None]
+    if option.validator is not None and not option.validator(parsed):
+        return [False, None]
+    return [True, parsed]
+
+
+def publish_config(changes):
+    """Publishes new config values with the given changes and notifies the subscribers of each value that changed.
+
+    :param changes: Dictionary of the new typed values by config variable name.
+    """
+    global configValues
+    configLock.acquire()
+    try:
+        new_values = dict(configValues)
+        new_values.update(changes)
+        changed = [(name, value) for name, value in changes.items() if configValues.get(name) != value]
+        configValues = new_values
+    finally:
+        configLock.release()
+    for name, value in changed:
+        for subscriber in configSubscribers.get(name, []) + configSubscribers.get(None, []):
+            subscriber(name, value)
+
+
+def subscribe_config(name, subscriber):
+    """Adds a function to be called with the name and new value whenever the passed config variable changes.
+
+    :param name: String name of the config variable to watch, or None to be notified of every variable.
+    :param subscriber: Function taking the string name and typed new value of the config variable.
+    """
+    configLock.acquire()
+    configSubscribers.setdefault(name, []).append(subscriber)
+    configLock.release()
 
 
 def set_config_value(name, value):
     """Sets a config value in both the Config Parser memory and Client memory with a passed name and new value.
 
-    Functionality may be combined/reorganized with that of set_sentinel() in the future.
+    Subscribers of the variable are notified if the value changed.
     :param name: String name of the config value to be set. Naming matches that of the config file.
     :param value: String value of the new value to be set to the config variable. Auto-casted to the appropriate type.
     :return: Boolean of if the set operation was successful or not. Could fail for unknown variable or wrong data type.
     """
-    succeeded = False
-    global defaultOrientation, lockOrientation, sleepTime, displayEnabled, printEnabled, watchedInterface, \
-        cpuTempInterval, interfaceInterval, publicInterval, sendEnabled, postInterval, postTimeout, serverURL, \
-        iftttKey, iftttEvent, ambientEnabled, ambientInterval, lightEnabled, lightInterval, accelEnabled, \
-        accelInterval, relayAddress, relayPort, configUsername, configPassword, hatEnabled, hatUsed
-    # UI Section
-    if name == "defaultorientation":
-        defaultOrientationLock.acquire()
-        try:
-            defaultOrientation = int(value)
-            parser.set('UI', 'defaultorientation', value)
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            defaultOrientationLock.release()
-    elif name == "lockorientation":
-        lockOrientationLock.acquire()
-        lock_bool = bool_check(str(value))
-        if lock_bool[0]:
-            lockOrientation = lock_bool[1]
-            parser.set('UI', 'lockorientation', str(lock_bool[1]))
-            succeeded = True
-        elif not lock_bool[0]:
-            succeeded = False
-        lockOrientationLock.release()
-    elif name == "refreshinterval":
-        sleepTimeLock.acquire()
-        try:
-            sleepTime = float(value)
-            parser.set('UI', 'refreshinterval', value)
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            sleepTimeLock.release()
-    elif name == "displayenabled":
-        displayEnabledLock.acquire()
-        lock_bool = bool_check(str(value))
-        if lock_bool[0]:
-            displayEnabled = lock_bool[1]
-            parser.set('UI', 'displayenabled', str(lock_bool[1]))
-            succeeded = True
-        elif not lock_bool[0]:
-            succeeded = False
-        displayEnabledLock.release()
-    elif name == "printenabled":
-        printEnabledLock.acquire()
-        lock_bool = bool_check(str(value))
-        if lock_bool[0]:
-            printEnabled = lock_bool[1]
-            parser.set('UI', 'printenabled', str(lock_bool[1]))
-            succeeded = True
-        elif not lock_bool[0]:
-            succeeded = False
-        printEnabledLock.release()
-    # General Section
-    elif name == "watchedinterface":
-        watchedInterfaceLock.acquire()
-        try:
-            watchedInterface = value
-            parser.set('General', 'watchedinterface', value)
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            watchedInterfaceLock.release()
-    elif name == "cputempinterval":
-        cpuTempIntervalLock.acquire()
-        try:
-            cpuTempInterval = float(value)
-            parser.set('General', 'cputempinterval', value)
-            reboot_thread("CPUTempThread", cpuTempInterval, "UpdateCPUTemp")
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            cpuTempIntervalLock.release()
-    elif name == "interfaceinterval":
-        interfaceIntervalLock.acquire()
-        try:
-            interfaceInterval = float(value)
-            parser.set('General', 'interfaceinterval', value)
-            reboot_thread("InterfaceIPThread", interfaceInterval, "UpdateWatchedInterfaceIP")
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            interfaceIntervalLock.release()
-    elif name == "publicinterval":
-        publicIntervalLock.acquire()
-        try:
-            publicInterval = float(value)
-            parser.set('General', 'publicinterval', value)
-            reboot_thread("PublicIPThread", publicInterval, "UpdatePublicIP")
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            publicIntervalLock.release()
-    # Requests Section
-    elif name == "sendenabled":
-        lock_bool = bool_check(str(value))
-        if lock_bool[0]:
-            sendEnabledLock.acquire()
-            if lock_bool[1] != sendEnabled:
-                sendEnabled = lock_bool[1]
-                sendEnabledLock.release()
-                if lock_bool[1]:
-                    postIntervalLock.acquire()
-                    temp_post_interval = postInterval
-                    postIntervalLock.release()
-                    reboot_thread("SendThread", temp_post_interval, "SendValues")
-            parser.set('Requests', 'sendenabled', str(lock_bool[1]))
-            succeeded = True
-        elif not lock_bool[0]:
-            succeeded = False
-    elif name == "postinterval":
-        postIntervalLock.acquire()
-        try:
-            postInterval = float(value)
-            parser.set('Requests', 'postinterval', value)
-            reboot_thread("SendThread", postInterval, "SendValues")
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            postIntervalLock.release()
-    elif name == "posttimeout":
-        postTimeoutLock.acquire()
-        try:
-            postTimeout = float(value)
-            parser.set('Requests', 'posttimeout', value)
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            postTimeoutLock.release()
-    elif name == "serverurl":
-        serverURLLock.acquire()
-        try:
-            serverURL = value
-            parser.set('Requests', 'serverurl', value)
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            serverURLLock.release()
-    elif name == "iftttkey":
-        iftttKeyLock.acquire()
-        try:
-            iftttKey = value
-            parser.set('Requests', 'iftttkey', value)
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            iftttKeyLock.release()
-    elif name == "iftttevent":
-        iftttEventLock.acquire()
-        try:
-            iftttEvent = value
-            parser.set('Requests', 'iftttevent', value)
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            iftttEventLock.release()
-    # Ambient Section
-    elif name == "ambientenabled":
-        lock_bool = bool_check(str(value))
-        if lock_bool[0]:
-            ambientEnabledLock.acquire()
-            if lock_bool[1] != ambientEnabled:
-                ambientEnabled = lock_bool[1]
-                ambientEnabledLock.release()
-                if lock_bool[1]:
-                    ambientIntervalLock.acquire()
-                    temp_ambient_interval = ambientInterval
-                    ambientIntervalLock.release()
-                    reboot_thread("AmbientThread", temp_ambient_interval, "UpdateAmbient")
-            parser.set('Ambient', 'ambientenabled', str(lock_bool[1]))
-            succeeded = True
-        elif not lock_bool[0]:
-            succeeded = False
-    elif name == "ambientinterval":
-        ambientIntervalLock.acquire()
-        try:
-            ambientInterval = float(value)
-            parser.set('Ambient', 'ambientinterval', value)
-            reboot_thread("AmbientThread", ambientInterval, "UpdateAmbient")
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            ambientIntervalLock.release()
-    # Light Section
-    elif name == "lightenabled":
-        lock_bool = bool_check(str(value))
-        if lock_bool[0]:
-            lightEnabledLock.acquire()
-            if lock_bool[1] != lightEnabled:
-                lightEnabled = lock_bool[1]
-                lightEnabledLock.release()
-                if lock_bool[1]:
-                    lightIntervalLock.acquire()
-                    temp_light_interval = lightInterval
-                    lightIntervalLock.release()
-                    reboot_thread("LightThread", temp_light_interval, "UpdateLight")
-            parser.set('Light', 'lightenabled', str(lock_bool[1]))
-            succeeded = True
-        elif not lock_bool[0]:
-            succeeded = False
-    elif name == "lightinterval":
-        lightIntervalLock.acquire()
-        try:
-            lightInterval = float(value)
-            parser.set('Light', 'lightinterval', value)
-            reboot_thread("LightThread", lightInterval, "UpdateLight")
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            lightIntervalLock.release()
-    # Accelerometer Section
-    elif name == "accelenabled":
-        lock_bool = bool_check(str(value))
-        if lock_bool[0]:
-            accelEnabledLock.acquire()
-            if lock_bool[1] != accelEnabled:
-                accelEnabled = lock_bool[1]
-                accelEnabledLock.release()
-                if lock_bool[1]:
-                    accelIntervalLock.acquire()
-                    temp_accel_interval = accelInterval
-                    accelIntervalLock.release()
-                    reboot_thread("AccelThread", temp_accel_interval, "UpdateAccelerometer")
-            parser.set('Accelerometer', 'accelenabled', str(lock_bool[1]))
-            succeeded = True
-        elif not lock_bool[0]:
-            succeeded = False
-    elif name == "accelinterval":
-        accelIntervalLock.acquire()
-        try:
-            accelInterval = float(value)
-            parser.set('Accelerometer', 'accelinterval', value)
-            reboot_thread("AccelThread", accelInterval, "UpdateAccelerometer")
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            accelIntervalLock.release()
-    elif name == "relayaddress":
-        relayAddressLock.acquire()
-        try:
-            relayAddress = value
-            parser.set('RemoteConfig', 'relayaddress', value)
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            relayAddressLock.release()
-    elif name == "relayport":
-        relayPortLock.acquire()
-        try:
-            validate = int(value)
-            if 1 <= validate <= 65535:
-                relayPort = int(value)
-                parser.set('RemoteConfig', 'relayport', value)
-                succeeded = True
-            else:
-                succeeded = False
-        except TypeError:
-            succeeded = False
-        finally:
-            relayPortLock.release()
-    elif name == "configusername":
-        configUsernameLock.acquire()
-        try:
-            configUsername = value
-            parser.set('RemoteConfig', 'configusername', value)
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            configUsernameLock.release()
-    elif name == "configpassword":
-        configPasswordLock.acquire()
-        try:
-            configPassword = value
-            parser.set('RemoteConfig', 'configpassword', value)
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            configPasswordLock.release()
-    elif name == "hatenabled":
-        hatEnabledLock.acquire()
-        lock_bool = bool_check(str(value))
-        if lock_bool[0]:
-            hatEnabled = lock_bool[1]
-            parser.set('Sensors', 'hatenabled', str(lock_bool[1]))
-            succeeded = True
-        elif not lock_bool[0]:
-            succeeded = False
-        hatEnabledLock.release()
-    elif name == "hatused":
-        hatUsedLock.acquire()
-        try:
-            hatUsed = value
-            parser.set('Sensors', 'hatused', value)
-            succeeded = True
-        except TypeError:
-            succeeded = False
-        finally:
-            hatUsedLock.release()
-    return succeeded
+    option = configOptions.get(name)
+    if option is None:
+        return False
+    valid, parsed = parse_config_value(option, value)
+    if not valid:
+        return False
+    parser.set(option.section, option.name, str(parsed) if option.type is bool else str(value))
+    publish_config({name: parsed})
+    return True
 
 
 def bool_check(value):
@@ -2142,151 +3172,595 @@ def bool_check(value):
 
 
 def get_all_config():
-    """Gets a list of all the config file variable names and values in dictionary format.
+    """Gets a list of all the listed config file variable names and values in dictionary format.
 
     Called by ConfigListAPI() when all variables are GET requested.
     :return: List of all the config file variable names and values in dictionary format.
     """
-    config_list = list()
-    # UI Section
-    config_list.append({'name': "defaultorientation", 'value': get_config_value("defaultorientation")})
-    config_list.append({'name': "lockorientation", 'value': get_config_value("lockorientation")})
-    config_list.append({'name': "refreshinterval", 'value': get_config_value("refreshinterval")})
-    config_list.append({'name': "displayenabled", 'value': get_config_value("displayenabled")})
-    config_list.append({'name': "printenabled", 'value': get_config_value("printenabled")})
-    # General Section
-    config_list.append({'name': "watchedinterface", 'value': get_config_value("watchedinterface")})
-    config_list.append({'name': "cputempinterval", 'value': get_config_value("cputempinterval")})
-    config_list.append({'name': "interfaceinterval", 'value': get_config_value("interfaceinterval")})
-    config_list.append({'name': "publicinterval", 'value': get_config_value("publicinterval")})
-    # Sensor Section
-    config_list.append({'name': "hatenabled", 'value': get_config_value("hatenabled")})
-    config_list.append({'name': "hatused", 'value': get_config_value("hatused")})
-    # Requests Section
-    config_list.append({'name': "sendenabled", 'value': get_config_value("sendenabled")})
-    config_list.append({'name': "postinterval", 'value': get_config_value("postinterval")})
-    config_list.append({'name': "posttimeout", 'value': get_config_value("posttimeout")})
-    config_list.append({'name': "serverurl", 'value': get_config_value("serverurl")})
-    config_list.append({'name': "iftttkey", 'value': get_config_value("iftttkey")})
-    config_list.append({'name': "iftttevent", 'value': get_config_value("iftttevent")})
-    # Remote Config Section
-    config_list.append({'name': "relayaddress", 'value': get_config_value("relayaddress")})
-    config_list.append({'name': "relayport", 'value': get_config_value("relayport")})
-    # Ambient Section
-    config_list.append({'name': "ambientenabled", 'value': get_config_value("ambientenabled")})
-    config_list.append({'name': "ambientinterval", 'value': get_config_value("ambientinterval")})
-    # Light Section
-    config_list.append({'name': "lightenabled", 'value': get_config_value("lightenabled")})
-    config_list.append({'name': "lightinterval", 'value': get_config_value("lightinterval")})
-    # Accelerometer Section
-    config_list.append({'name': "accelenabled", 'value': get_config_value("accelenabled")})
-    config_list.append({'name': "accelinterval", 'value': get_config_value("accelinterval")})
-    return config_list
+    values = configValues
+    return [{'name': option.name, 'value': str(values[option.name])} for option in CONFIG_SCHEMA if option.listed]
+
+
+def update_job_config(name, value):
+    """Applies a change to a config variable which enables an update job or sets its interval.
+
+    Enabling or disabling sets the job's sentinel, and while the Client is running a job which is enabled
+    or has its interval changed is rebooted with the new interval.
+    :param name: String name of the config variable which changed.
+    :param value: New typed value of the config variable.
+    """
+    for job_name, sentinel_name, enabled_option, interval_option in updateJobs:
+        if name in job_options(enabled_option):
+            enabled = job_enabled(enabled_option)
+            set_sentinel(sentinel_name, enabled)
+            if enabled and clientRunning and interval_option is not None:
+                reboot_thread(job_name, job_interval(enabled_option, interval_option), sentinel_name)
+        elif name in job_options(interval_option) and clientRunning:
+            reboot_thread(job_name, job_interval(enabled_option, interval_option), sentinel_name)
+
+
+def job_options(option):
+    """Gets the config variables in a column of the updateJobs table as a tuple.
+
+    :param option: String name of a config variable, tuple of them or None.
+    :return: Tuple of String names of config variables, empty for None.
+    """
+    if option is None:
+        return ()
+    if isinstance(option, tuple):
+        return option
+    return (option,)
+
+
+def job_enabled(enabled_option):
+    """Checks whether an update job is enabled by its config variables, any of them for a job sampling several sensors.
+
+    :param enabled_option: String name of the config variable enabling the job, tuple of them or None.
+    :return: Boolean of whether the job should run, always True when it can't be configured.
+    """
+    options = job_options(enabled_option)
+    if not options:
+        return True
+    return any(get_config(option) for option in options)
+
+
+def job_interval(enabled_option, interval_option):
+    """Gets the interval an update job should run at from its config variables.
+
+    :param enabled_option: String name of the config variable enabling the job, tuple of them or None.
+    :param interval_option: String name of the config variable of the interval, tuple of them or None.
+    :return: Integer/Float of the interval in seconds, the shortest of those enabled for a job sampling several
+    sensors, 1 if it can't be configured.
+    """
+    intervals = job_options(interval_option)
+    if not intervals:
+        return 1
+    enabled = job_options(enabled_option)
+    if len(enabled) == len(intervals):
+        enabled_intervals = [interval for option, interval in zip(enabled, intervals) if get_config(option)]
+        if enabled_intervals:
+            intervals = enabled_intervals
+    return min(get_config(interval, 1) for interval in intervals)
+
+
+# Keep the update jobs in step with their config variables
+for job_config in updateJobs:
+    for job_option in job_options(job_config[2]) + job_options(job_config[3]):
+        subscribe_config(job_option, update_job_config)
+
+
+# Config variables which change how the backend reads a sensor, with the config variable of the mode, the name of
+# the backend method which applies it and the sentinel of the job reading the sensor
+backendModeOptions = {
+    "accelmode": ("accelmode", "set_accel_mode", "UpdateIMU"),
+    "accelstreamrate": ("accelmode", "set_accel_mode", "UpdateIMU"),
+    "accelwatermark": ("accelmode", "set_accel_mode", "UpdateIMU"),
+    "ambientmode": ("ambientmode", "set_ambient_mode", "UpdateAmbient"),
+    "ambientprofile": ("ambientmode", "set_ambient_mode", "UpdateAmbient"),
+    "ambientfifostep": ("ambientmode", "set_ambient_mode", "UpdateAmbient"),
+    "lightmode": ("lightmode", "set_light_mode", "UpdateLight")
+}
+
+
+def update_backend_mode(name, value):
+    """Applies a change to how a sensor is read while the Client is running.
+
+    The job reading the sensor is rebooted after so it runs often enough for the new mode.
+    :param name: String name of the config variable which changed.
+    :param value: New typed value of the config variable.
+    """
+    if not clientRunning:
+        return
+    mode_option, method_name, job_sentinel = backendModeOptions[name]
+    getattr(backend, method_name)(get_config(mode_option))
+    for job_name, sentinel_name, enabled_option, interval_option in updateJobs:
+        if sentinel_name == job_sentinel:
+            reboot_thread(job_name, job_interval(enabled_option, interval_option), sentinel_name)
+
+
+for mode_config in backendModeOptions:
+    subscribe_config(mode_config, update_backend_mode)
+
+
+def update_imu_enabled(name=None, value=None):
+    """Applies the accelerometer and magnetometer toggles to the backend, once when they change rather than on
+    every IMU sample.
+
+    :param name: String name of the config variable which changed, passed by publish_config().
+    :param value: New typed value of the config variable, passed by publish_config().
+    """
+    backend.set_imu_enabled(get_config("accelenabled"), get_config("magnetenabled"))
+
+
+subscribe_config("accelenabled", update_imu_enabled)
+subscribe_config("magnetenabled", update_imu_enabled)
+
+
+def select_backend():
+    """Selects the sensor backend for the hat in the config and binds its update methods for the scheduler to call.
+
+    Called once by setup(). Falls back on the base backend, which only keeps the time, if the hat is disabled
+    or has no backend.
+    :return: SensorBackend which was selected.
+    """
+    global backend
+    if get_config("hatenabled"):
+        backend_class = backends.get(get_config("hatused"))
+        if backend_class is None:
+            print("No backend for " + get_config("hatused") + ", only the system values will be updated")
+            backend_class = SensorBackend
+    else:
+        backend_class = SensorBackend
+    backend = backend_class()
+    update_imu_enabled()
+    for method, backend_method in backendMethods.items():
+        methods[method] = getattr(backend, backend_method)
+    return backend
 
 
 def reboot_thread(thread_name, thread_interval, sentinel_name):
-    """Reboots a thread with a new interval, or starts it if not running in the first place.
+    """Applies a new interval to a running update job, or starts it if not running in the first place.
 
-    Called in setup() when the Client is started or in set_config_value() when a thread should be started.
-    :param thread_name: String name of the thread to start. Defined in methods.
+    Called in setup() when the Client is started or when a config change enables a job or changes its interval.
+    The change is made to the scheduled job in place without waiting for it, so it's safe to call from API requests.
+    :param thread_name: String name of the job to start.
     :param thread_interval: Integer/Float of how often to update the value in seconds.
-    :param sentinel_name: String name of the sentinel which determines if the thread should be running.
+    :param sentinel_name: String name of the sentinel which determines if the job should be running. Defined in methods.
     """
-    global threads
+    if sentinel_name in jobIntervalLimits:
+        thread_interval = min(thread_interval, jobIntervalLimits[sentinel_name])
     if check_sentinel(sentinel_name):
-        set_sentinel(sentinel_name, False)
-        for t in threads:
-            if t.getName() == thread_name:
-                t.join()
-        set_sentinel(sentinel_name, True)
-        new_thread = GeneralThread(len(threads) + 1, thread_name, thread_interval, sentinel_name)
-        new_thread.start()
-        threads.append(new_thread)
+        get_scheduler(sentinel_name).update_job(thread_name, thread_interval, sentinel_name,
+                                                blocking=sentinel_name in blockingMethods)
+
+
+def get_scheduler(method=None):
+    """Gets the scheduler which runs the given update method, creating and starting it if it isn't running yet.
+
+    The IMU and light sensors run on their own high-rate scheduler so they can be updated many times a second
+    without being held up by the slower sensors.
+    :param method: String name of the method to be scheduled, or None for the general scheduler.
+    :return: SchedulerThread running the update jobs for the method.
+    """
+    global scheduler, highRateScheduler
+    if method in highRateMethods:
+        if highRateScheduler is None:
+            highRateScheduler = SchedulerThread(2, "HighRateSchedulerThread", 0, highRateInterval)
+            start_scheduler(highRateScheduler)
+        return highRateScheduler
+    if scheduler is None:
+        scheduler = SchedulerThread()
+        start_scheduler(scheduler)
+    return scheduler
+
+
+def start_scheduler(new_scheduler):
+    """Starts a scheduler and registers it with every sentinel so it hears about disabled jobs straight away.
+
+    :param new_scheduler: SchedulerThread to start.
+    """
+    for sentinel_flag in sentinels.values():
+        sentinel_flag.add_listener(new_scheduler.sentinel_changed)
+    new_scheduler.start()
+
+
+def get_jobs():
+    """Gets the state of every scheduled update job along with every sentinel which has no job.
+
+    :return: List of dictionaries of each job's name, method, interval, if its sentinel is enabled,
+    if it's running right now and how many seconds until it's next due.
+    """
+    jobs = []
+    for running_scheduler in (scheduler, highRateScheduler):
+        if running_scheduler is not None:
+            jobs.extend(running_scheduler.get_jobs())
+    scheduled = set(job['method'] for job in jobs)
+    for name, state in get_sentinel_states().items():
+        if name not in scheduled:
+            jobs.append({'name': name, 'method': name, 'interval': None, 'enabled': state, 'running': False,
+                         'nextrun': None})
+    return jobs
 
 
-def display_values():
+def get_job_stats():
+    """Gets the scheduling statistics of every update job, useful for seeing if any sensors are falling behind.
+
+    :return: List of dictionaries of each job's name, interval, run count and lateness in seconds.
+    """
+    stats = []
+    for running_scheduler in (scheduler, highRateScheduler):
+        if running_scheduler is not None:
+            stats.extend(running_scheduler.get_stats())
+    return stats
+
+
+def get_clock_stats():
+    """Gets how the hat's real-time clock drifts from the monotonic clock the date/time is kept with between reads.
+
+    :return: Dictionary of the clock statistics, see SensorianBackend.get_clock_stats(). Empty without a clock.
+    """
+    return backend.get_clock_stats()
+
+
+class DashboardWidget(object):
+    """A line of text drawn at a fixed position on a Dashboard, only drawn again when its text changes.
+    """
+
+    def __init__(self, position, format_text):
+        """Initializes the widget, its bounds are set when it is added to a Dashboard.
+
+        :param position: Tuple of the Integer x and y pixel coordinates of the top left of the text.
+        :param format_text: Function taking the Dashboard's values and returning the String text to draw.
+        """
+        self.position = position
+        self.format_text = format_text
+        self.text = None
+        self.bounds = None
+
+
+class Dashboard(object):
+    """Retained-mode layout of the LCD with static labels drawn once into a background layer and widgets over it.
+
+    Each render() only draws the widgets whose formatted text changed since the last one, over a copy of the
+    background, and returns the regions of the image it changed so the display only converts and sends those.
+    """
+
+    def __init__(self, size, labels, widgets):
+        """Initializes the layout, nothing is drawn until the first render().
+
+        :param size: Tuple of the Integer width and height of the layout in pixels.
+        :param labels: List of Tuples of a position and the String text of each static label.
+        :param widgets: List of DashboardWidgets drawn over the labels.
+        """
+        self.size = size
+        self.labels = labels
+        self.widgets = widgets
+        self.background = None
+        self.image = None
+
+    def build(self):
+        """Draws the static labels into the background layer and sets the bounds each widget can draw within.
+        """
+        self.background = Image.new("RGB", self.size)
+        label_draw = ImageDraw.Draw(self.background)
+        for position, text in self.labels:
+            label_draw.text(position, text, font=font)
+        # Every widget is cleared to the right edge so shorter text doesn't leave the end of the last behind
+        text_height = font.getsize("Ayg")[1]
+        for widget in self.widgets:
+            x, y = widget.position
+            widget.bounds = (x, y, self.size[0] - 1, min(y + text_height, self.size[1]) - 1)
+            widget.text = None
+        self.image = self.background.copy()
+
+    def render(self, values, full=False):
+        """Draws the widgets whose text changed for the given values.
+
+        :param values: Values passed to each widget's format_text function, eg. a SensorSnapshot.
+        :param full: Boolean to draw every widget over a fresh copy of the background, as when first shown.
+        :return: Tuple of the PIL Image of the layout and a List of the (x0, y0, x1, y1) inclusive bounds of the
+        regions which changed.
+        """
+        if self.image is None:
+            self.build()
+            full = True
+        changed = []
+        for widget in self.widgets:
+            text = widget.format_text(values)
+            if text != widget.text:
+                widget.text = text
+                changed.append(widget)
+        if full:
+            self.image = self.background.copy()
+            widget_draw = ImageDraw.Draw(self.image)
+            for widget in self.widgets:
+                widget_draw.text(widget.position, widget.text, font=font)
+            return self.image, [(0, 0, self.size[0] - 1, self.size[1] - 1)]
+        regions = []
+        for widget in changed:
+            # Redraw the widget's bounds from the background, along with any text of other widgets reaching into it
+            x0, y0, x1, y1 = widget.bounds
+            tile = self.background.crop((x0, y0, x1 + 1, y1 + 1))
+            tile_draw = ImageDraw.Draw(tile)
+            for other in self.widgets:
+                ox0, oy0, ox1, oy1 = other.bounds
+                if other.text and ox0 <= x1 and x0 <= ox1 and oy0 <= y1 and y0 <= oy1:
+                    tile_draw.text((other.position[0] - x0, other.position[1] - y0), other.text, font=font)
+            self.image.paste(tile, (x0, y0))
+            regions.append(widget.bounds)
+        return self.image, regions
+
+
+def format_date(values):
+    """Formats the date of a snapshot for the dashboard.
+
+    :param values: SensorSnapshot to format.
+    :return: String of the day/month/year.
+    """
+    return str(values.date_time.day) + "/" + str(values.date_time.month) + "/" + str(values.date_time.year)
+
+
+def format_time(values):
+    """Formats the time of a snapshot for the dashboard.
+
+    :param values: SensorSnapshot to format.
+    :return: String of the hours:minutes:seconds.
+    """
+    return '{:02d}'.format(values.date_time.hour) + ":" + '{:02d}'.format(values.date_time.minute) + ":" + \
+        '{:02d}'.format(values.date_time.second)
+
+
+# Pixels between lines of text on the LCD
+lineHeight = 12
+# Degrees the LCD's contents are rotated counter-clockwise for each orientation, others are shown unrotated
+orientationAngles = {0: 90, 1: 270, 2: 180, 3: 0}
+# Lines of the menu shown on the LCD at once
+menuLines = 10
+# Label and value formatting function of each line of the dashboard, from the top
+dashboardLines = [
+    ("HW: ", lambda values: values.serial),
+    ("Date: ", format_date),
+    ("Time: ", format_time),
+    ("Light: ", lambda values: str(values.light) + " lx"),
+    ("Temp: ", lambda values: str(values.ambient_temp) + " C"),
+    ("Press: ", lambda values: str(float(values.ambient_pressure) / 1000) + " kPa"),
+    ("CPU Temp: ", lambda values: str(values.cpu_temp) + " C"),
+    ("LAN IP: ", lambda values: str(values.interface_ip)),
+    ("WAN IP: ", lambda values: str(values.public_ip)),
+    ("X: ", lambda values: str(values.accel_x) + " Y: " + str(values.accel_y) + " Z: " + str(values.accel_z))
+]
+# Dashboards already laid out by the page name and size they were laid out for, see get_dashboard()
+dashboards = {}
+# Key of the Dashboard last drawn to the LCD, a different one has to be drawn in full
+lastDashboard = None
+
+
+def get_dashboard(page, size):
+    """Gets the Dashboard laying out a page of the LCD at the given size, creating it the first time.
+
+    :param page: String name of the page, Values for the sensor values or Menu for the local configuration menu.
+    :param size: Tuple of the Integer width and height of the layout in pixels.
+    :return: Dashboard of the page.
+    """
+    key = (page, size)
+    if key not in dashboards:
+        if page == "Values":
+            labels = [((0, line * lineHeight), label) for line, (label, _) in enumerate(dashboardLines)]
+            widgets = [DashboardWidget((font.getsize(label)[0], line * lineHeight), format_text)
+                       for line, (label, format_text) in enumerate(dashboardLines)]
+        else:
+            # The menu's values are the elements and position, each line has a cursor and an element
+            labels = []
+            widgets = []
+            for line in range(menuLines):
+                widgets.append(DashboardWidget((0, line * lineHeight),
+                                               lambda menu, line=line: ">>" if menu[1] == line else ""))
+                widgets.append(DashboardWidget((18, line * lineHeight),
+                                               lambda menu, line=line: str(menu[0][line])
+                                               if line < len(menu[0]) else ""))
+        dashboards[key] = Dashboard(size, labels, widgets)
+    return dashboards[key]
+
+
+# The thread sending frames to the LCD, started by sensorian_setup()
+displayThread = None
+# Lock to ensure only one frame is drawn at a time, as the main loop and button dispatcher can both draw one
+displayLock = threading.Lock()
+
+
+class DisplayThread(threading.Thread):
+    """A Thread which sends the frames drawn by display_values() to the LCD, so drawing never waits on the SPI bus.
+
+    Each frame is copied into a back buffer, which is swapped with the front buffer the thread sends from. A frame
+    submitted before the thread took the last one replaces it, adding the regions the last one changed, so the LCD
+    always gets the latest frame and stale ones are dropped under load.
+    """
+    def __init__(self, thread_id=8, name="DisplayThread"):
+        """Initializes the Display thread with an ID and name.
+        """
+        threading.Thread.__init__(self)
+        self.threadID = thread_id
+        self.name = name
+        self.running = True
+        self.condition = threading.Condition()
+        self.front = None
+        self.back = None
+        # Set while the back buffer holds a frame the thread hasn't taken yet
+        self.pending = False
+        self.regions = None
+        self.angle = 0
+        self.inputTime = None
+        self.submitted = 0
+        self.frames = 0
+        self.dropped = 0
+        self.inputFrames = 0
+        self.renderTotal = 0
+        self.renderMax = 0
+        self.sendTotal = 0
+        self.sendMax = 0
+        self.latencyTotal = 0
+        self.latencyMax = 0
+
+    def submit(self, image, regions, angle, input_time=None, render_time=0):
+        """Copies a frame into the back buffer for the thread to send, replacing one it hasn't taken yet.
+
+        :param image: PIL Image of the frame, copied so the caller can keep drawing on it.
+        :param regions: List of the (x0, y0, x1, y1) bounds of the regions changed since the last frame, or None to
+        compare the whole frame.
+        :param angle: Integer degrees the LCD is rotated to show the frame at, see TFT.setOrientation().
+        :param input_time: Float monotonic time in seconds of the input the frame shows the result of, or None.
+        :param render_time: Float seconds the frame took to draw.
+        """
+        self.condition.acquire()
+        try:
+            if self.back is None or self.back.size != image.size:
+                self.back = image.copy()
+            else:
+                self.back.paste(image)
+            if self.pending:
+                # The replaced frame was never sent, so what it changed still has to be
+                self.dropped += 1
+                if self.regions is None or regions is None:
+                    regions = None
+                else:
+                    regions = self.regions + regions
+                if input_time is None or (self.inputTime is not None and self.inputTime < input_time):
+                    input_time = self.inputTime
+            self.regions = regions
+            self.angle = angle
+            self.inputTime = input_time
+            self.pending = True
+            self.submitted += 1
+            self.renderTotal += render_time
+            self.renderMax = max(self.renderMax, render_time)
+            self.condition.notify()
+        finally:
+            self.condition.release()
+
+    def stop(self):
+        """Tells the thread to stop without sending any more frames.
+        """
+        self.condition.acquire()
+        self.running = False
+        self.condition.notify()
+        self.condition.release()
+
+    def get_stats(self):
+        """Gets how many frames were drawn, sent and dropped and how long they took.
+
+        :return: Dictionary of the submitted, sent, dropped and input frame counts, the mean and max seconds to draw
+        and to send a frame, the mean and max latency from an input to the frame showing it being sent, and the LCD's
+        refresh counters, see TFT.getStats().
+        """
+        return {'submitted': self.submitted, 'frames': self.frames, 'dropped': self.dropped,
+                'inputframes': self.inputFrames,
+                'render': self.renderTotal / self.submitted if self.submitted else 0, 'maxrender': self.renderMax,
+                'send': self.sendTotal / self.frames if self.frames else 0, 'maxsend': self.sendMax,
+                'latency': self.latencyTotal / self.inputFrames if self.inputFrames else 0,
+                'maxlatency': self.latencyMax, 'display': disp.getStats()}
+
+    def run(self):
+        """Sends the latest frame each time one is submitted until stopped.
+        """
+        while True:
+            self.condition.acquire()
+            try:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                self.front, self.back = self.back, self.front
+                regions = self.regions
+                angle = self.angle
+                input_time = self.inputTime
+                self.pending = False
+            finally:
+                self.condition.release()
+            start = monotonic_time()
+            try:
+                disp.setOrientation(angle)
+                disp.display(self.front, regions=regions)
+            except Exception as e:
+                print("EXCEPTION IN " + self.name + ": " + str(e))
+            now = monotonic_time()
+            self.frames += 1
+            self.sendTotal += now - start
+            self.sendMax = max(self.sendMax, now - start)
+            if input_time is not None:
+                self.inputFrames += 1
+                self.latencyTotal += now - input_time
+                self.latencyMax = max(self.latencyMax, now - input_time)
+        print("Killing " + self.name)
+
+
+def get_display_stats():
+    """Gets how long frames take to draw and reach the LCD and how many were dropped, to see if the display lags.
+
+    :return: Dictionary of the display statistics, see DisplayThread.get_stats(). Empty if not running.
+    """
+    current_display_thread = displayThread
+    if current_display_thread is None:
+        return {}
+    return current_display_thread.get_stats()
+
+
+def display_values(input_time=None):
     """Displays the watched variables on the LCD or the menu if it is active.
 
     Called on a loop in the main method when enabled to keep refreshing the screen, but can be called directly as well.
-    """
-    if get_config_value("hatenabled") == "True":
-        if get_config_value("hatused") == "Sensorian":
-            disp.clear()
+    Only the values which changed since the last call are drawn again, see Dashboard. The frame is handed to the
+    DisplayThread to send, or sent before returning if it isn't running.
+    The LCD controller is told to rotate its contents when the orientation changes so the frames are never rotated.
+    :param input_time: Float monotonic time in seconds of the input this frame shows the result of, like a button
+    press, to measure how long it takes to reach the LCD. None for a regular refresh.
+    """
+    global lastDashboard
+    if backend.hasDisplay:
+        displayLock.acquire()
+        try:
+            start = monotonic_time()
+            # Take one snapshot so every value on screen comes from the same moment
+            values = get_snapshot()
             # Checks if the orientation of the display should be locked
             # If so, force the default orientation from the config file
-            lockOrientationLock.acquire()
-            temp_lock_orientation = lockOrientation
-            lockOrientationLock.release()
-            accelEnabledLock.acquire()
-            temp_accel_enabled = accelEnabled
-            accelEnabledLock.release()
-            if not temp_lock_orientation and temp_accel_enabled:
-                orientation = get_mode()
+            if not get_config("lockorientation") and get_config("accelenabled"):
+                orientation = values.mode
             else:
-                defaultOrientationLock.acquire()
-                orientation = defaultOrientation
-                defaultOrientationLock.release()
-            # Depending on the orientation, prepare the display layout image
-            if orientation == 0:
-                text_draw = Image.new('RGB', (160, 128))
-                angle = 90
-            elif orientation == 1:
-                text_draw = Image.new('RGB', (160, 128))
-                angle = 270
-            elif orientation == 2:
-                text_draw = Image.new('RGB', (128, 160))
-                angle = 180
-            elif orientation == 3:
-                text_draw = Image.new('RGB', (128, 160))
-                angle = 0
+                orientation = get_config("defaultorientation")
+            # Depending on the orientation, lay out for the width and height the display will have once rotated
+            angle = orientationAngles.get(orientation, 0)
+            if angle in (90, 270):
+                size = (GLCD.TFT_HEIGHT, GLCD.TFT_WIDTH)
             else:
-                text_draw = Image.new('RGB', (128, 160))
-                angle = 90
-
-            # Draw the text objects for all the respective variables by getting
-            # the latest values from their Get methods
-            text_draw2 = ImageDraw.Draw(text_draw)
+                size = (GLCD.TFT_WIDTH, GLCD.TFT_HEIGHT)
 
             inMenuLock.acquire()
             temp_in_menu = inMenu
             inMenuLock.release()
             if not temp_in_menu:
-                text_draw2.text((0, 0), "HW: " + get_serial(), font=font)
-                rtc_time = get_date_time()
-                dat = "Date: " + str(rtc_time.day) + "/" + str(rtc_time.month) + "/" + str(
-                    rtc_time.year)  # convert to string and print it
-                text_draw2.text((0, 12), dat, font=font)
-                tmr = "Time: " + '{:02d}'.format(rtc_time.hour) + ":" + '{:02d}'.format(rtc_time.minute) + \
-                      ":" + '{:02d}'.format(rtc_time.second)  # convert to string and print it
-                text_draw2.text((0, 24), tmr, font=font)
-                text_draw2.text((0, 36), "Light: " + str(get_light()) + " lx", font=font)
-                text_draw2.text((0, 48), "Temp: " + str(get_ambient_temp()) + " C", font=font)
-                text_draw2.text((0, 60), "Press: " + str(get_ambient_pressure()) + " kPa", font=font)
-                text_draw2.text((0, 72), "CPU Temp: " + str(get_cpu_temp()) + " C", font=font)
-                text_draw2.text((0, 84), "LAN IP: " + str(get_watched_interface_ip()), font=font)
-                text_draw2.text((0, 96), "WAN IP: " + str(get_public_ip()), font=font)
-                # text_draw2.text((0, 108), "Button Pressed: " + str(GetButton()), font=font)
-                text_draw2.text((0, 108), "X: " + str(get_accel_x()) + " Y: " + str(get_accel_y()) + " Z: " +
-                                str(get_accel_z()), font=font)
+                dashboard = get_dashboard("Values", size)
             else:
                 menuElementsLock.acquire()
                 temp_elements = menuElements
                 menuElementsLock.release()
-                for x in range(0, 10):
-                    try:
-                        text_draw2.text((18, x * 12), str(temp_elements[x]), font=font)
-                    except IndexError:
-                        break
                 menuPositionLock.acquire()
                 temp_menu_pos = menuPosition
                 menuPositionLock.release()
-                text_draw2.text((0, temp_menu_pos * 12), ">>", font=font)
-
-            # Rotate the image to the set orientation and add it to the LCD
-            text_draw3 = text_draw.rotate(angle)
-            canvas = Image.new("RGB", (128, 160))
-            canvas.paste(text_draw3, (0, 0))
-            disp.display(canvas)
+                dashboard = get_dashboard("Menu", size)
+                values = (temp_elements, temp_menu_pos)
+            # Only the changed values are drawn, unless the LCD was showing another page or orientation
+            key = (dashboard, angle)
+            layout, regions = dashboard.render(values, key != lastDashboard)
+            lastDashboard = key
+
+            current_display_thread = displayThread
+            if current_display_thread is not None:
+                current_display_thread.submit(layout, regions, angle, input_time, monotonic_time() - start)
+            else:
+                disp.setOrientation(angle)
+                disp.display(layout, regions=regions)
+        finally:
+            displayLock.release()
 
 
 def print_values():
@@ -2300,22 +3774,23 @@ def print_values():
                2: "Portrait Up",
                3: "Portrait Down"
                }
-    # Get the current date and time and the latest update of all the watched
+    # Get one snapshot of the current date and time and all the watched
     # variables and print them to the console
-    rtc_time = get_date_time()
-    print("HW: " + get_serial())
+    values = get_snapshot()
+    rtc_time = values.date_time
+    print("HW: " + values.serial)
     print("Date: " + str(rtc_time.day) + "/" + str(rtc_time.month) + "/" + str(
         rtc_time.year))  # convert to string and print it
     print("Time: " + '{:02d}'.format(rtc_time.hour) + ":" + '{:02d}'.format(rtc_time.minute) + ":" + '{:02d}'.format(
         rtc_time.second))
-    print("Light: " + str(get_light()) + " lx")
-    print("Temp: " + str(get_ambient_temp()) + " C")
-    print("Pressure: " + str(get_ambient_pressure()) + " kPa")
-    print("CPU Temp: " + str(get_cpu_temp()) + " C")
-    print("LAN IP: " + str(get_watched_interface_ip()))
-    print("WAN IP: " + get_public_ip())
-    print("Mode: " + options[get_mode()])
-    print("Button Pressed: " + str(get_button()))
+    print("Light: " + str(values.light) + " lx")
+    print("Temp: " + str(values.ambient_temp) + " C")
+    print("Pressure: " + str(float(values.ambient_pressure) / 1000) + " kPa")
+    print("CPU Temp: " + str(values.cpu_temp) + " C")
+    print("LAN IP: " + str(values.interface_ip))
+    print("WAN IP: " + values.public_ip)
+    print("Mode: " + options[values.mode])
+    print("Button Pressed: " + str(values.button))
     print("--------------------")
 
 
@@ -2324,40 +3799,32 @@ def send_values():
 
     Called by the Send Thread on a regular interval if enabled, but can be called directly as well.
     """
-    rtc_time = get_date_time()
+    # Take one snapshot so the values sent all come from the same moment
+    values = get_snapshot()
+    rtc_time = values.date_time
     time_string = '{:04d}'.format(rtc_time.year) + "-" + '{:02d}'.format(rtc_time.month) + "-" + '{:02d}'.format(
         rtc_time.day) + " " + '{:02d}'.format(rtc_time.hour) + ":" + '{:02d}'.format(
         rtc_time.minute) + ":" + '{:02d}'.format(rtc_time.second)
     # Prepare a JSON of the variables
-    if get_config_value("hatenabled") == "True" and get_config_value("hatused") == "Sensorian":
-        accel_x = get_accel_x() / 1000.0
-        accel_y = get_accel_y() / 1000.0
-        accel_z = get_accel_z() / 1000.0
-    else:
-        accel_x = get_accel_x()
-        accel_y = get_accel_y()
-        accel_z = get_accel_z()
+    accel_x = values.accel_x / backend.accelScale
+    accel_y = values.accel_y / backend.accelScale
+    accel_z = values.accel_z / backend.accelScale
 
-    payload = {'HW': str(get_serial()),
+    payload = {'HW': str(values.serial),
                'TS': time_string,
-               'IP': str(get_watched_interface_ip()),
-               'CPU': str(get_cpu_temp()),
-               'LUX': str(get_light()),
-               'Temp': str(get_ambient_temp()),
-               'Press': str(get_ambient_pressure()),
+               'IP': str(values.interface_ip),
+               'CPU': str(values.cpu_temp),
+               'LUX': str(values.light),
+               'Temp': str(values.ambient_temp),
+               'Press': str(float(values.ambient_pressure) / 1000),
                'X': str(accel_x),
                'Y': str(accel_y),
                'Z': str(accel_z)
                }
     # Attempt to POST the JSON to the given URL, catching any failures
-    serverURLLock.acquire()
-    temp_url = serverURL
-    serverURLLock.release()
-    postTimeoutLock.acquire()
-    temp_timeout = postTimeout
-    postTimeoutLock.release()
     try:
-        post_request = requests.post(temp_url, data=json.dumps(payload), timeout=temp_timeout)
+        post_request = requests.post(get_config("serverurl"), data=json.dumps(payload),
+                                     timeout=get_config("posttimeout"))
         print(post_request.text)  # For debugging POST requests
     except requests.ConnectionError:
         print("POST ERROR - Check connection and server")
@@ -2372,14 +3839,25 @@ methods = {"UpdateDateTime": update_date_time,
            "UpdateCPUTemp": update_cpu_temp,
            "UpdateWatchedInterfaceIP": update_watched_interface_ip,
            "UpdatePublicIP": update_public_ip,
-           "UpdateAccelerometer": update_accelerometer,
-           "SendValues": send_values,
-           "UpdateMagnetometer": update_magnetometer
+           "UpdateIMU": update_imu,
+           "SendValues": send_values
            }
 
+# Methods in the dictionary above which are replaced with the selected backend's by select_backend()
+backendMethods = {"UpdateDateTime": "update_date_time",
+                  "UpdateAmbient": "update_ambient",
+                  "UpdateLight": "update_light",
+                  "UpdateIMU": "update_imu"
+                  }
+
+# Methods which wait on the network, run on the scheduler's worker pool so they can't delay the sensors
+blockingMethods = ("UpdateWatchedInterfaceIP", "UpdatePublicIP", "SendValues")
+# Methods which can be run at sub-second intervals down to highRateInterval, on their own scheduler
+highRateMethods = ("UpdateIMU", "UpdateLight")
+
 
 def config():
-    """Reads the client.cfg configuration file and sets global variables from it or default values if missing.
+    """Reads the client.cfg configuration file and sets the config values from it or default values if missing.
 
     Called on startup to initialize the Client from the config file, but can be called directly to read it again.
     """
@@ -2390,380 +3868,23 @@ def config():
     # Read the config file if present
     parser.read('client.cfg')
 
-    # The following similar blocks of code check every variable that should
-    # be in the config file, setting the global variable for it if it exists
-    # and setting it to default if it does not
-    global defaultOrientation
-    try:
-        defaultOrientation = parser.getint('UI', 'defaultorientation')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('UI', 'defaultorientation', str(defaultOrientation))
-        except ConfigParser.NoSectionError:
-            parser.add_section('UI')
-            parser.set('UI', 'defaultorientation', str(defaultOrientation))
-    finally:
-        print("Default Orientation: " + str(defaultOrientation))
-
-    global lockOrientation
-    try:
-        lockOrientation = parser.getboolean('UI', 'lockorientation')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('UI', 'lockorientation', str(lockOrientation))
-        except ConfigParser.NoSectionError:
-            parser.add_section('UI')
-            parser.set('UI', 'lockorientation', str(lockOrientation))
-    finally:
-        print("Lock Orientation: " + str(lockOrientation))
-
-    global sleepTime
-    try:
-        sleepTime = parser.getfloat('UI', 'refreshinterval')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('UI', 'refreshinterval', str(sleepTime))
-        except ConfigParser.NoSectionError:
-            parser.add_section('UI')
-            parser.set('UI', 'refreshinterval', str(sleepTime))
-    finally:
-        print("Refresh Interval: " + str(sleepTime))
-
-    global watchedInterface
-    try:
-        watchedInterface = parser.get('General', 'watchedinterface')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('General', 'watchedinterface', watchedInterface)
-        except ConfigParser.NoSectionError:
-            parser.add_section('General')
-            parser.set('General', 'watchedinterface', watchedInterface)
-    finally:
-        print("Watched Interface: " + watchedInterface)
-
-    global sendEnabled
-    try:
-        sendEnabled = parser.getboolean('Requests', 'sendenabled')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Requests', 'sendenabled', str(sendEnabled))
-        except ConfigParser.NoSectionError:
-            parser.add_section('Requests')
-            parser.set('Requests', 'sendenabled', str(sendEnabled))
-    finally:
-        print("Send Enabled: " + str(sendEnabled))
-
-    global postInterval
-    try:
-        postInterval = parser.getfloat('Requests', 'postinterval')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Requests', 'postinterval', str(postInterval))
-        except ConfigParser.NoSectionError:
-            parser.add_section('Requests')
-            parser.set('Requests', 'postinterval', str(postInterval))
-    finally:
-        print("POST Interval: " + str(postInterval))
-
-    global postTimeout
-    try:
-        postTimeout = parser.getfloat('Requests', 'posttimeout')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Requests', 'posttimeout', str(postTimeout))
-        except ConfigParser.NoSectionError:
-            parser.add_section('Requests')
-            parser.set('Requests', 'posttimeout', str(postTimeout))
-    finally:
-        print("POST Timeout: " + str(postTimeout))
-
-    global ambientEnabled
-    try:
-        ambientEnabled = parser.getboolean('Ambient', 'ambientenabled')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Ambient', 'ambientenabled', str(ambientEnabled))
-        except ConfigParser.NoSectionError:
-            parser.add_section('Ambient')
-            parser.set('Ambient', 'ambientenabled', str(ambientEnabled))
-    finally:
-        print("Ambient Enabled: " + str(ambientEnabled))
-
-    global ambientInterval
-    try:
-        ambientInterval = parser.getfloat('Ambient', 'ambientinterval')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Ambient', 'ambientinterval', str(ambientInterval))
-        except ConfigParser.NoSectionError:
-            parser.add_section('Ambient')
-            parser.set('Ambient', 'ambientinterval', str(ambientInterval))
-    finally:
-        print("Ambient Interval: " + str(ambientInterval))
-
-    global lightEnabled
-    try:
-        lightEnabled = parser.getboolean('Light', 'lightenabled')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Light', 'lightenabled', str(lightEnabled))
-        except ConfigParser.NoSectionError:
-            parser.add_section('Light')
-            parser.set('Light', 'lightenabled', str(lightEnabled))
-    finally:
-        print("Light Enabled: " + str(lightEnabled))
-
-    global lightInterval
-    try:
-        lightInterval = parser.getfloat('Light', 'lightinterval')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Light', 'lightinterval', str(lightInterval))
-        except ConfigParser.NoSectionError:
-            parser.add_section('Light')
-            parser.set('Light', 'lightinterval', str(lightInterval))
-    finally:
-        print("Light Interval: " + str(lightInterval))
-
-    global cpuTempInterval
-    try:
-        cpuTempInterval = parser.getfloat('General', 'cputempinterval')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('General', 'cputempinterval', str(cpuTempInterval))
-        except ConfigParser.NoSectionError:
-            parser.add_section('General')
-            parser.set('General', 'cputempinterval', str(cpuTempInterval))
-    finally:
-        print("CPU Temp Interval: " + str(cpuTempInterval))
-
-    global interfaceInterval
-    try:
-        interfaceInterval = parser.getfloat('General', 'interfaceinterval')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('General', 'interfaceinterval', str(interfaceInterval))
-        except ConfigParser.NoSectionError:
-            parser.add_section('General')
-            parser.set('General', 'interfaceinterval', str(interfaceInterval))
-    finally:
-        print("Local IP Interval: " + str(interfaceInterval))
-
-    global publicInterval
-    try:
-        publicInterval = parser.getfloat('General', 'publicinterval')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('General', 'publicinterval', str(publicInterval))
-        except ConfigParser.NoSectionError:
-            parser.add_section('General')
-            parser.set('General', 'publicinterval', str(publicInterval))
-    finally:
-        print("Public IP Interval: " + str(publicInterval))
-
-    global hatEnabled
-    try:
-        hatEnabled = parser.getboolean('Sensors', 'hatenabled')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Sensors', 'hatenabled', str(hatEnabled))
-        except ConfigParser.NoSectionError:
-            parser.add_section('Sensors')
-            parser.set('Sensors', 'hatenabled', str(hatEnabled))
-    finally:
-        print("Hat Enabled: " + str(hatEnabled))
-
-    global hatUsed
-    try:
-        hatUsed = parser.get('Sensors', 'hatused')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Sensors', 'hatused', hatUsed)
-        except ConfigParser.NoSectionError:
-            parser.add_section('Sensors')
-            parser.set('Sensors', 'hatused', hatUsed)
-    finally:
-        print("Hat Used: " + hatUsed)
-
-    global accelEnabled
-    try:
-        accelEnabled = parser.getboolean('Accelerometer', 'accelenabled')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
+    # Check every variable in the schema that should be in the config file, using its
+    # value if it exists and is valid, otherwise setting it to the current value
+    changes = {}
+    for option in CONFIG_SCHEMA:
         try:
-            parser.set('Accelerometer', 'accelenabled', str(accelEnabled))
-        except ConfigParser.NoSectionError:
-            parser.add_section('Accelerometer')
-            parser.set('Accelerometer', 'accelenabled', str(accelEnabled))
-    finally:
-        print("Accel Enabled: " + str(accelEnabled))
-
-    global accelInterval
-    try:
-        accelInterval = parser.getfloat('Accelerometer', 'accelinterval')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Accelerometer', 'accelinterval', str(accelInterval))
-        except ConfigParser.NoSectionError:
-            parser.add_section('Accelerometer')
-            parser.set('Accelerometer', 'accelinterval', str(accelInterval))
-    finally:
-        print("Accelerometer Interval: " + str(accelInterval))
-
-    global displayEnabled
-    try:
-        displayEnabled = parser.getboolean('UI', 'displayenabled')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('UI', 'displayenabled', str(displayEnabled))
-        except ConfigParser.NoSectionError:
-            parser.add_section('UI')
-            parser.set('UI', 'displayenabled', str(displayEnabled))
-    finally:
-        print("Display Enabled: " + str(displayEnabled))
-
-    global printEnabled
-    try:
-        printEnabled = parser.getboolean('UI', 'printenabled')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('UI', 'printenabled', str(printEnabled))
-        except ConfigParser.NoSectionError:
-            parser.add_section('UI')
-            parser.set('UI', 'printenabled', str(printEnabled))
-    finally:
-        print("Print Enabled: " + str(printEnabled))
-
-    global serverURL
-    try:
-        serverURL = parser.get('Requests', 'serverurl')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Requests', 'serverurl', serverURL)
-        except ConfigParser.NoSectionError:
-            parser.add_section('Requests')
-            parser.set('Requests', 'serverurl', serverURL)
-    finally:
-        print("Server URL: " + serverURL)
-
-    global iftttKey
-    try:
-        iftttKey = parser.get('Requests', 'iftttkey')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Requests', 'iftttkey', iftttKey)
-        except ConfigParser.NoSectionError:
-            parser.add_section('Requests')
-            parser.set('Requests', 'iftttkey', iftttKey)
-    finally:
-        print("IFTTT Key: " + iftttKey)
-
-    global iftttEvent
-    try:
-        iftttEvent = parser.get('Requests', 'iftttevent')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Requests', 'iftttevent', iftttEvent)
-        except ConfigParser.NoSectionError:
-            parser.add_section('Requests')
-            parser.set('Requests', 'iftttevent', iftttEvent)
-    finally:
-        print("IFTTT Event: " + iftttEvent)
-
-    global flaskEnabled
-    try:
-        flaskEnabled = parser.getboolean('RemoteConfig', 'flaskenabled')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('RemoteConfig', 'flaskenabled', str(flaskEnabled))
-        except ConfigParser.NoSectionError:
-            parser.add_section('RemoteConfig')
-            parser.set('RemoteConfig', 'flaskenabled', str(flaskEnabled))
-    finally:
-        print("Flask Enabled: " + str(flaskEnabled))
-
-    global socketEnabled
-    try:
-        socketEnabled = parser.getboolean('RemoteConfig', 'socketenabled')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('RemoteConfig', 'socketenabled', str(socketEnabled))
-        except ConfigParser.NoSectionError:
-            parser.add_section('RemoteConfig')
-            parser.set('RemoteConfig', 'socketenabled', str(socketEnabled))
-    finally:
-        print("Socket Enabled: " + str(socketEnabled))
-
-    global relayAddress
-    try:
-        relayAddress = parser.get('RemoteConfig', 'relayaddress')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('RemoteConfig', 'relayaddress', relayAddress)
-        except ConfigParser.NoSectionError:
-            parser.add_section('RemoteConfig')
-            parser.set('RemoteConfig', 'relayaddress', relayAddress)
-    finally:
-        print("Relay Address: " + relayAddress)
-
-    global relayPort
-    try:
-        relayPort = parser.get('RemoteConfig', 'relayport')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('RemoteConfig', 'relayport', str(relayPort))
-        except ConfigParser.NoSectionError:
-            parser.add_section('RemoteConfig')
-            parser.set('RemoteConfig', 'relayport', str(relayPort))
-    finally:
-        print("Relay Port: " + str(relayPort))
-
-    global configUsername
-    try:
-        configUsername = parser.get('RemoteConfig', 'configusername')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('RemoteConfig', 'configusername', configUsername)
-        except ConfigParser.NoSectionError:
-            parser.add_section('RemoteConfig')
-            parser.set('RemoteConfig', 'configusername', configUsername)
-    finally:
-        print("Config Username: " + configUsername)
-
-    global configPassword
-    try:
-        configPassword = parser.get('RemoteConfig', 'configpassword')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('RemoteConfig', 'configpassword', configPassword)
-        except ConfigParser.NoSectionError:
-            parser.add_section('RemoteConfig')
-            parser.set('RemoteConfig', 'configpassword', configPassword)
-    finally:
-        print("Config Password: " + configPassword)
-
-    global magnetEnabled
-    try:
-        magnetEnabled = parser.getboolean('Magnetometer', 'magnetenabled')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Magnetometer', 'magnetenabled', str(magnetEnabled))
-        except ConfigParser.NoSectionError:
-            parser.add_section('Magnetometer')
-            parser.set('Magnetometer', 'magnetenabled', str(magnetEnabled))
-    finally:
-        print("Magnet Enabled: " + str(magnetEnabled))
-
-    global magnetInterval
-    try:
-        magnetInterval = parser.getfloat('Magnetometer', 'magnetinterval')
-    except (ConfigParser.NoSectionError, ConfigParser.NoOptionError, ValueError):
-        try:
-            parser.set('Magnetometer', 'magnetinterval', str(magnetInterval))
-        except ConfigParser.NoSectionError:
-            parser.add_section('Magnetometer')
-            parser.set('Magnetometer', 'magnetinterval', str(magnetInterval))
-    finally:
-        print("Magnetometer Interval: " + str(magnetInterval))
+            valid, parsed = parse_config_value(option, parser.get(option.section, option.name))
+        except (ConfigParser.NoSectionError, ConfigParser.NoOptionError):
+            valid, parsed = False, None
+        if valid:
+            changes[option.name] = parsed
+        else:
+            parsed = get_config(option.name)
+            if not parser.has_section(option.section):
+                parser.add_section(option.section)
+            parser.set(option.section, option.name, str(parsed))
+        print(option.label + ": " + str(parsed))
+    publish_config(changes)
 
     # Write the config file back to disk with the given values and
     # filling in any blanks with the defaults
@@ -2783,35 +3904,28 @@ def write_config():
 
 
 def setup():
-    """Prepares the Client for execution by starting the threads and enabling interrupts.
+    """Prepares the Client for execution by scheduling the update jobs, starting the threads and enabling interrupts.
 
     Called when the Client is started but should be called directly when using the Client in another project.
     """
     # CPU serial shouldn't change so it is only updated once
     update_serial()
 
-    if get_config_value("hatenabled") == "True":
-        if get_config_value("hatused") == "Sensorian":
-            sensorian_setup()
-        elif get_config_value("hatused") == "Sense HAT":
-            sense_hat_setup()
-
-    # Create threads and start them to monitor the various sensors and
-    # IP variables at their given intervals, 1 second interval for time/buttons
-    reboot_thread("TimeThread", 1, "UpdateDateTime")
-    reboot_thread("AmbientThread", ambientInterval, "UpdateAmbient")
-    reboot_thread("LightThread", lightInterval, "UpdateLight")
-    reboot_thread("CPUTempThread", cpuTempInterval, "UpdateCPUTemp")
-    reboot_thread("InterfaceIPThread", interfaceInterval, "UpdateWatchedInterfaceIP")
-    reboot_thread("PublicIPThread", publicInterval, "UpdatePublicIP")
-    reboot_thread("AccelThread", accelInterval, "UpdateAccelerometer")
-    reboot_thread("SendThread", postInterval, "SendValues")
-    reboot_thread("MagnetThread", magnetInterval, "UpdateMagnetometer")
-
-    flaskEnabledLock.acquire()
-    temp_flask_enabled = flaskEnabled
-    flaskEnabledLock.release()
-    if temp_flask_enabled:
+    # Let the bus manager be started again if the Client was cleaned up before
+    global busManagerStopped
+    busManagerStopped = False
+    select_backend()
+    backend.setup()
+
+    # Schedule jobs to monitor the various sensors and IP variables
+    # at their given intervals, 1 second interval for time/buttons
+    global clientRunning
+    clientRunning = True
+    for job_name, sentinel_name, enabled_option, interval_option in updateJobs:
+        if sentinel_name in methods:
+            reboot_thread(job_name, job_interval(enabled_option, interval_option), sentinel_name)
+
+    if get_config("flaskenabled"):
         flask_thread = FlaskThread()
         flask_thread.start()
 
@@ -2832,22 +3946,13 @@ def main():
     # Loop the display and/or printing of variables if desired, waiting between
     # calls for the set or default refresh interval
     while not temp_kill_watch:
-        printEnabledLock.acquire()
-        temp_print_enabled = printEnabled
-        printEnabledLock.release()
-        if temp_print_enabled:
+        if get_config("printenabled"):
             print_values()
 
-        displayEnabledLock.acquire()
-        temp_display_enabled = displayEnabled
-        displayEnabledLock.release()
-        if temp_display_enabled:
+        if get_config("displayenabled"):
             display_values()
 
-        sleepTimeLock.acquire()
-        temp_sleep_time = sleepTime
-        sleepTimeLock.release()
-        time.sleep(temp_sleep_time)
+        time.sleep(get_config("refreshinterval"))
 
         killWatchLock.acquire()
         temp_kill_watch = killWatch
@@ -2859,25 +3964,35 @@ def cleanup():
 
     Called when the Client is terminated but should be called directly when done using the Client in another project.
     """
+    global clientRunning
+    clientRunning = False
     kill_flask()
 
-    if get_config_value("hatenabled") == "True":
-        if get_config_value("hatused") == "Sensorian":
-            GPIO.cleanup()
-
-    write_config()
-
     set_sentinel("UpdateDateTime", False)
     set_sentinel("UpdateAmbient", False)
     set_sentinel("UpdateLight", False)
-    set_sentinel("UpdateAccelerometer", False)
+    set_sentinel("UpdateIMU", False)
     set_sentinel("UpdateCPUTemp", False)
     set_sentinel("UpdateWatchedInterfaceIP", False)
     set_sentinel("UpdatePublicIP", False)
     set_sentinel("SendValues", False)
-    set_sentinel("UpdateMagnetometer", False)
     set_sentinel("SocketSentinel", False)
 
+    # Wait for the jobs running right now to finish, so none are left using the bus or GPIO once they're released
+    running_schedulers = [running_scheduler for running_scheduler in (scheduler, highRateScheduler)
+                          if running_scheduler is not None]
+    for running_scheduler in running_schedulers:
+        running_scheduler.stop()
+    for running_scheduler in running_schedulers:
+        running_scheduler.join()
+
+    backend.cleanup()
+
+    write_config()
+
+    stop_notifications()
+    stop_bus_manager()
+
 
 # Assuming this program is run itself, execute normally
 if __name__ == "__main__":
@@ -9,10 +9,13 @@ __version__ = "1.0"
 
 import numbers
 import time
+import numpy
 from PIL import Image
 from PIL import ImageDraw
 import RPi.GPIO as GPIO
 import spidev as spi
+from Framebuffer import color565, image_to_data, image_to_565, dirty_rectangles, merge_rectangles, window_bytes, \
+	fits_partial, DIRTY_ROW_GAP, DIRTY_MAX_RECTS, DIRTY_FULL_FRACTION, WINDOW_OVERHEAD
 
 spi = spi.SpiDev()
 
@@ -111,6 +114,14 @@ MADCTL_M8  =  0b11100000
 MADCTL_RGB  = 0x00
 MADCTL_BGR  = 0x08
 
+# MADCTL of each angle in degrees the contents can be rotated counter-clockwise by, 0 is the initialized orientation
+ORIENTATIONS = {
+	0: MADCTL_MY | MADCTL_MX | MADCTL_RGB,
+	90: MADCTL_MX | MADCTL_MV | MADCTL_RGB,
+	180: MADCTL_RGB,
+	270: MADCTL_MY | MADCTL_MV | MADCTL_RGB
+}
+
 GAMMA1 = 0x01
 GAMMA2 = 0x02
 GAMMA3 = 0x04
@@ -125,40 +136,12 @@ DC = 22
 RST = 16
 TFT_CS = 24
 
+#####################################################
+
 ON = 1
 OFF = 0
 
 
-def color565(r, g, b):
-	"""
-	Convert red, green, blue components to a 16-bit 565 RGB value. 
-	Components should be values 0 to 255.
-	
-	
-	:param r: Red byte.
-	:param g: Green byte.
-	:param b: Blue byte.
-	:returns pixel : 16-bit 565 RGB value
-	"""
-	return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
-
-def image_to_data(image):
-	"""Generator function to convert a PIL image to 16-bit 565 RGB bytes.
-	
-	
-	:param image: PIL image
-	:returns imgArray : 
-	"""
-	pixels = image.convert('RGB').load()
-	width, height = image.size
-	for y in range(height):
-		for x in range(width):
-			r,g,b = pixels[(x,y)]
-			color = color565(r, g, b)
-			yield (color >> 8) & 0xFF
-			yield color & 0xFF
-
-
 class TFT(object):
 	"""FW Driver for an ST7735S TFT controller."""
 
@@ -175,6 +158,7 @@ class TFT(object):
 		self.cs = TFT_CS
 		self.width = TFT_WIDTH
 		self.height = TFT_HEIGHT
+		self.angle = 0
 		
 		spi.open(0,1)             		#will open bus 0, CE1. 
 		#spi.max_speed_hz = 8000000
@@ -187,6 +171,10 @@ class TFT(object):
 		GPIO.setup(self.rst, GPIO.OUT)	
 		self.CE_DESELECT()
 		self.buffer = Image.new('RGB', (self.width, self.height))	# Create an image buffer.
+		self.frame = bytearray(self.width * self.height * 2)		# 565 RGB bytes of the frame being converted
+		self.sent = None				# 565 RGB bytes of the frame on the display, None until a full frame is sent
+		self.stats = {'fullframes': 0, 'partialframes': 0, 'skippedframes': 0, 'rectangles': 0,
+					  'bytessent': 0, 'bytessaved': 0}
 	
 	def CE_OUTPUT(self):
 		"""
@@ -235,6 +223,10 @@ class TFT(object):
 		# Convert scalar argument to list so either can be passed as parameter.
 		if isinstance(data, numbers.Number):
 			data = [data & 0xFF]
+		# Newer spidev writes a whole buffer in one call without copying it to a list first
+		if isinstance(data, bytearray) and hasattr(spi, 'writebytes2'):
+			spi.writebytes2(data)
+			return
 		# Write data a chunk at a time.
 		for start in range(0, len(data), length):
 			end = min(start+length, len(data))
@@ -395,6 +387,11 @@ class TFT(object):
 		self.command(NORON)         # Normal display on, no args, w/delay 10ms 0x13
 		time.sleep(0.100) 			# End ST7735S Gamma Sequence
 		self.command(DISPON)  		# Display on
+		self.angle = 0
+		self.width = TFT_WIDTH
+		self.height = TFT_HEIGHT
+		self.buffer = Image.new('RGB', (self.width, self.height))
+		self.invalidate()
 		
 
 	def setAddrWindow(self, x0=0, y0=0, x1=None, y1=None):
@@ -424,27 +421,99 @@ class TFT(object):
 		self.data(y1)					# YEND
 		self.command(RAMWR)		# write to RAM
 
-	def display(self, image=None):
+	def display(self, image=None, full=False, regions=None):
 		"""
 		Write the provided image to the hardware. If no image parameter is provided the display buffer will be written to the hardware.  
 		If an image is provided, it should be RGB format and the same dimensions as the display hardware.
+		Only the rectangles which changed since the last frame are sent, unless they add up to most of the frame
+		or full is True. When the caller knows which regions it drew it can pass them, then only those are
+		converted and sent without comparing the whole frame.
 		
 		
 		:param image: picture image
-		:returns none :
+		:param full: Flag to send the whole frame even if only part of it changed
+		:param regions: List of (x0, y0, x1, y1) inclusive bounds of the only parts of the image which changed, or None
+		:returns rectangles : List of (x0, y0, x1, y1) bounds sent, the whole display for a full frame
 		"""
 		# By default write the internal buffer to the display.
 		if image is None:
 			image = self.buffer
-		# Set address bounds to entire display.
-		self.setAddrWindow()
-		# Convert image to array of 16bit 565 RGB data bytes.
-		# Unfortunate that this copy has to occur, but the SPI byte writing
-		# function needs to take an array of bytes and PIL doesn't natively
-		# store images in 16-bit 565 RGB format.
-		pixelbytes = list(image_to_data(image))
-		# Write data to hardware.
-		self.data(pixelbytes)
+		frameBytes = self.width * self.height * 2
+		if regions is not None and not full and self.sent is not None:
+			rectangles = merge_rectangles(regions)
+			if fits_partial(rectangles, self.width, self.height):
+				# Convert just the regions, keeping the copy of what is on the display up to date as they are sent
+				sentPixels = numpy.frombuffer(self.sent, dtype=numpy.uint16).reshape(self.height, self.width)
+				for x0, y0, x1, y1 in rectangles:
+					data = image_to_565(image.crop((x0, y0, x1 + 1, y1 + 1)))
+					sentPixels[y0:y1 + 1, x0:x1 + 1] = numpy.frombuffer(data, dtype=numpy.uint16).reshape(y1 - y0 + 1, x1 - x0 + 1)
+					self.setAddrWindow(x0, y0, x1, y1)
+					self.data(data)
+				self.countPartial(rectangles)
+				return rectangles
+		# Convert image to 16bit 565 RGB data bytes, PIL doesn't natively
+		# store images in 16-bit 565 RGB format. The conversion reuses the
+		# same frame buffer every time rather than building a new list.
+		self.frame = image_to_565(image, self.frame)
+		rectangles = None
+		if not full and self.sent is not None:
+			rectangles = dirty_rectangles(self.frame, self.sent, self.width, self.height)
+			if not fits_partial(rectangles, self.width, self.height):
+				rectangles = None
+		if rectangles is None:
+			# Set address bounds to entire display and write all the data to hardware.
+			self.setAddrWindow()
+			self.data(self.frame)
+			rectangles = [(0, 0, self.width - 1, self.height - 1)]
+			self.stats['fullframes'] += 1
+			self.stats['bytessent'] += frameBytes + WINDOW_OVERHEAD
+		else:
+			pixels = numpy.frombuffer(self.frame, dtype=numpy.uint16).reshape(self.height, self.width)
+			for x0, y0, x1, y1 in rectangles:
+				self.setAddrWindow(x0, y0, x1, y1)
+				self.data(bytearray(pixels[y0:y1 + 1, x0:x1 + 1].tobytes()))
+			self.countPartial(rectangles)
+		# Keep what is now on the display to compare the next frame against, converting the next into the old one
+		self.sent, self.frame = self.frame, self.sent or bytearray(frameBytes)
+		return rectangles
+
+	def countPartial(self, rectangles):
+		"""
+		Adds a frame sent as the given rectangles, or skipped if there are none, to the refresh counters.
+		
+		
+		:param rectangles: List of (x0, y0, x1, y1) bounds sent
+		:returns none :
+		"""
+		if rectangles:
+			self.stats['partialframes'] += 1
+		else:
+			self.stats['skippedframes'] += 1
+		partialBytes = window_bytes(rectangles)
+		self.stats['rectangles'] += len(rectangles)
+		self.stats['bytessent'] += partialBytes
+		self.stats['bytessaved'] += self.width * self.height * 2 + WINDOW_OVERHEAD - partialBytes
+
+	def invalidate(self):
+		"""
+		Forgets what is on the display so the next display() sends the whole frame.
+		Called whenever the display memory is changed or reinterpreted other than by display().
+		
+		
+		:param none: 
+		:returns none :
+		"""
+		self.sent = None
+
+	def getStats(self):
+		"""
+		Gets how many frames were sent whole, in part or not at all, and the bytes sent and saved by partial frames.
+		
+		
+		:param none: 
+		:returns stats : Dictionary copy of the refresh counters
+		"""
+		return dict(self.stats)
 
 	def clear(self, color=(0,0,0)):
 		"""
@@ -487,6 +556,7 @@ class TFT(object):
 		:param mode: orientation data   
 		:returns none :
 		"""
+		self.invalidate()
 		self.command(MADCTL)
 		if (mode == 0x00):
 			 self.data(MADCTL_MY | MADCTL_MX| MADCTL_BGR)	#portrait
@@ -505,6 +575,28 @@ class TFT(object):
 		else :
 			 self.data(MADCTL_M8 | MADCTL_BGR)				#Landscape mode reflected and inverted
 
+	def setOrientation(self, angle):
+		"""Rotates the contents of the display counter-clockwise by reprogramming how the controller addresses its
+			memory, so frames are drawn in their own orientation without rotating them.
+			At 90 and 270 degrees the width and height swap and display() takes images of the swapped size.
+			Nothing is sent if the display is already at the angle.
+			
+			
+		:param angle: Integer degrees, one of 0, 90, 180 or 270
+		:returns none :
+		"""
+		if angle == self.angle:
+			return
+		self.command(MADCTL)
+		self.data(ORIENTATIONS[angle])
+		self.angle = angle
+		if angle in (90, 270):
+			self.width, self.height = TFT_HEIGHT, TFT_WIDTH
+		else:
+			self.width, self.height = TFT_WIDTH, TFT_HEIGHT
+		self.buffer = Image.new('RGB', (self.width, self.height))
+		self.invalidate()
+
 	def setGamma(self,gamma):
 		"""
 		Sets the  gamma mode of the display.
@@ -0,0 +1,267 @@
+#!/usr/bin/python
+
+"""benchmark.py: Measures how fast the Client can sample the sensors on this Pi.
+
+Must be run on a Raspberry Pi with the hat from client.cfg attached, from the directory containing the shared objects.
+Results are printed to the console, pass the names of benchmarks to run only those.
+"""
+
+from __future__ import print_function
+import sys
+import time
+import numpy
+from PIL import Image
+from PIL import ImageDraw
+import Sensorian_Client
+import TFT
+
+__author__ = "Dylan Kauling"
+__maintainer__ = "Dylan Kauling"
+__status__ = "Development"
+
+# How long in seconds to run each measurement for
+DURATION = 3
+# Intervals in seconds to try the high-rate scheduler at
+INTERVALS = [0.1, 0.05, 0.02, 0.01, 0.005]
+# How many conversions to measure the noise of each ambient profile over
+AMBIENT_SAMPLES = 10
+# Size in pixels of the area changed each frame of the partial display benchmark, about one line of text
+PARTIAL_AREA = (60, 12)
+# Registers of the IMU read for a frame, the status then the accelerometer and magnetometer as the hybrid burst reads
+IMU_REGISTERS = (list(range(Sensorian_Client.ACCEL_SENSOR.STATUS, Sensorian_Client.ACCEL_SENSOR.OUT_Z_LSB_REG + 1)) +
+                 list(range(Sensorian_Client.ACCEL_SENSOR.M_OUT_X_MSB, Sensorian_Client.ACCEL_SENSOR.M_OUT_Z_LSB + 1)))
+
+
+def bench_ceiling():
+    """Calls each high-rate update method back to back to find the most samples per second the Python path allows.
+    """
+    print("-------------------------")
+    print("Ceiling (back to back calls)")
+    for method in Sensorian_Client.highRateMethods:
+        update = Sensorian_Client.methods[method]
+        calls = 0
+        slowest = 0
+        start = Sensorian_Client.monotonic_time()
+        end = start + DURATION
+        now = start
+        while now < end:
+            before = now
+            update()
+            now = Sensorian_Client.monotonic_time()
+            slowest = max(slowest, now - before)
+            calls += 1
+        elapsed = now - start
+        print("%-22s %8.1f samples/s  mean %7.3fms  max %7.3fms" %
+              (method, calls / elapsed, elapsed / calls * 1000, slowest * 1000))
+
+
+def bench_scheduler():
+    """Runs each high-rate update method on the scheduler at shrinking intervals, reporting the rate achieved.
+    """
+    print("-------------------------")
+    print("Scheduler (achieved rate at each interval)")
+    for method in Sensorian_Client.highRateMethods:
+        for interval in INTERVALS:
+            scheduler = Sensorian_Client.SchedulerThread(10, "BenchmarkSchedulerThread", 0,
+                                                         Sensorian_Client.highRateInterval)
+            scheduler.start()
+            scheduler.add_job("Benchmark", interval, method)
+            time.sleep(DURATION)
+            stats = scheduler.get_stats()[0]
+            scheduler.stop()
+            scheduler.join()
+            print("%-22s %6.3fs  target %6.1f/s  achieved %6.1f/s  jitter %7.3fms  overruns %d" %
+                  (method, interval, stats['rate'], stats['achievedrate'], stats['jitter'] * 1000,
+                   stats['overruns']))
+
+
+def bench_ambient():
+    """Times one-shot conversions of the barometer at each ambient profile and measures their noise.
+
+    Only the Sensorian has profiles, the configured profile and mode are restored after.
+    """
+    print("-------------------------")
+    print("Ambient profiles (conversion time versus noise)")
+    if Sensorian_Client.AltiBar is None:
+        print("The " + Sensorian_Client.backend.name + " backend has no ambient profiles")
+        return
+    altibar = Sensorian_Client.AltiBar
+    profiles = sorted(Sensorian_Client.ambientProfiles.items(), key=lambda profile: profile[1])
+    for profile, oversample in profiles:
+        Sensorian_Client.bus_transaction("MPL3115A2", altibar.OneShotMode, Sensorian_Client.BUS_PRIORITY_ENVIRONMENT)
+        Sensorian_Client.bus_transaction("MPL3115A2", lambda: altibar.OversampleRate(oversample),
+                                         Sensorian_Client.BUS_PRIORITY_ENVIRONMENT)
+        durations = []
+        pressures = []
+        temperatures = []
+        for sample in range(AMBIENT_SAMPLES):
+            expected = Sensorian_Client.bus_transaction("MPL3115A2", altibar.StartConversion,
+                                                        Sensorian_Client.BUS_PRIORITY_ENVIRONMENT)
+            start = Sensorian_Client.monotonic_time()
+            while not Sensorian_Client.bus_transaction("MPL3115A2", altibar.DataReady,
+                                                       Sensorian_Client.BUS_PRIORITY_ENVIRONMENT):
+                time.sleep(0.001)
+            durations.append(Sensorian_Client.monotonic_time() - start)
+            press, temp = Sensorian_Client.bus_transaction("MPL3115A2", altibar.ReadPressureTemperature,
+                                                           Sensorian_Client.BUS_PRIORITY_ENVIRONMENT)
+            pressures.append(press)
+            temperatures.append(temp)
+        print("%-14s OS=%-3d expected %6.1fms  measured %6.1fms  noise %6.2fPa  %6.3fC" %
+              (profile, 2 ** oversample, expected * 1000, numpy.mean(durations) * 1000, numpy.std(pressures),
+               numpy.std(temperatures)))
+    Sensorian_Client.backend.set_ambient_mode(Sensorian_Client.get_config("ambientmode"))
+
+
+def read_frame_per_byte():
+    """Reads the same registers as a Sensorian frame with a call into the libraries per byte, as the drivers do.
+
+    Each device is read in one transaction through the bus manager, as the Client's updates read them.
+    """
+    imu_address = Sensorian_Client.ACCEL_SENSOR.FXOS8700CQR1_ADDRESS
+    read_imu = Sensorian_Client.ACCEL_SENSOR.FXO.FXOS8700CQ_ReadByte
+    imu = Sensorian_Client.bus_transaction("FXOS8700CQ",
+                                           lambda: [read_imu(imu_address, register) for register in IMU_REGISTERS],
+                                           Sensorian_Client.BUS_PRIORITY_IMU)
+    barometer_address = Sensorian_Client.ALTIBAR.MPL3115A2_ADDRESS
+    read_barometer = Sensorian_Client.ALTIBAR.MPL.MPL3115A2_ReadByte
+    barometer = Sensorian_Client.bus_transaction("MPL3115A2",
+                                                 lambda: [read_barometer(barometer_address, register)
+                                                          for register in range(6)],
+                                                 Sensorian_Client.BUS_PRIORITY_ENVIRONMENT)
+    light_sensor = Sensorian_Client.LightSensor
+    light = Sensorian_Client.bus_transaction("APDS9300",
+                                             lambda: (light_sensor.readWord(0xAC), light_sensor.readWord(0xAE)),
+                                             Sensorian_Client.BUS_PRIORITY_ENVIRONMENT)
+    buttons_address = Sensorian_Client.CAP_TOUCH.CAP1203ADDR
+    read_buttons = Sensorian_Client.CAP_TOUCH.CAP.CAP1203_Read
+    buttons = Sensorian_Client.bus_transaction("CAP1203",
+                                               lambda: [read_buttons(buttons_address, register)
+                                                        for register in (0x02, 0x03)],
+                                               Sensorian_Client.BUS_PRIORITY_INPUT)
+    return imu, barometer, light, buttons
+
+
+def bench_frame():
+    """Compares reading every Sensorian sensor a byte per call against one call into libFrame.so per frame.
+
+    Both go through the bus manager, so the comparison includes what each transaction costs there.
+    """
+    print("-------------------------")
+    print("Frame (per byte calls versus one call per frame)")
+    if Sensorian_Client.LightSensor is None:
+        print("The " + Sensorian_Client.backend.name + " backend has no Sensorian frame")
+        return
+    try:
+        import SensorianFrame
+    except OSError as e:
+        print("Can't load libFrame.so, build it with install.sh: " + str(e))
+        return
+    frame = SensorianFrame.SensorianFrame()
+
+    def read_frame():
+        return Sensorian_Client.bus_transaction("SensorianFrame", frame.read, Sensorian_Client.BUS_PRIORITY_IMU)
+
+    for name, read in (("Per byte", read_frame_per_byte), ("Frame", read_frame)):
+        frames = 0
+        start = Sensorian_Client.monotonic_time()
+        end = start + DURATION
+        now = start
+        while now < end:
+            read()
+            frames += 1
+            now = Sensorian_Client.monotonic_time()
+        elapsed = now - start
+        print("%-10s %8.1f frames/s  %8.1fus/frame" % (name, frames / elapsed, elapsed / frames * 1000000))
+
+
+def old_display(image):
+    """Writes an image to the LCD as TFT.display() did before, converting it to a list a pixel at a time.
+
+    :param image: PIL Image the size of the LCD.
+    """
+    Sensorian_Client.disp.setAddrWindow()
+    Sensorian_Client.disp.data(list(TFT.image_to_data(image)))
+
+
+def run_frames(name, draw):
+    """Calls a frame drawing function back to back for the benchmark duration and prints the frames per second.
+
+    :param name: String name of the method to print.
+    :param draw: Function taking no arguments which draws one frame.
+    """
+    frames = 0
+    start = Sensorian_Client.monotonic_time()
+    end = start + DURATION
+    now = start
+    while now < end:
+        draw()
+        frames += 1
+        now = Sensorian_Client.monotonic_time()
+    elapsed = now - start
+    print("%-22s %8.1f frames/s  %8.3fms/frame" % (name, frames / elapsed, elapsed / frames * 1000))
+
+
+def bench_display():
+    """Compares converting and displaying a frame a pixel at a time against the vectorized 565 RGB conversion.
+
+    The conversions run on any Pi, writing the frames to the LCD needs a backend with one.
+    """
+    print("-------------------------")
+    print("Display (per pixel generator versus vectorized conversion)")
+    image = Image.frombytes("RGB", (TFT.TFT_WIDTH, TFT.TFT_HEIGHT),
+                            numpy.random.randint(0, 256, TFT.TFT_WIDTH * TFT.TFT_HEIGHT * 3).astype(numpy.uint8)
+                            .tobytes())
+    frame = bytearray(TFT.TFT_WIDTH * TFT.TFT_HEIGHT * 2)
+    run_frames("Convert per pixel", lambda: list(TFT.image_to_data(image)))
+    run_frames("Convert vectorized", lambda: TFT.image_to_565(image, frame))
+    if not Sensorian_Client.backend.hasDisplay:
+        print("The " + Sensorian_Client.backend.name + " backend has no LCD to display frames on")
+        return
+    run_frames("Display per pixel", lambda: old_display(image))
+    run_frames("Display vectorized", lambda: Sensorian_Client.disp.display(image, True))
+    # Change one line's worth of the frame each time, as a clock ticking over does
+    draw = ImageDraw.Draw(image)
+    colors = [(255, 0, 0), (0, 0, 255)]
+
+    def draw_partial():
+        colors.reverse()
+        draw.rectangle((0, 0, PARTIAL_AREA[0] - 1, PARTIAL_AREA[1] - 1), fill=colors[0])
+        Sensorian_Client.disp.display(image)
+
+    before = Sensorian_Client.disp.getStats()
+    run_frames("Display partial", draw_partial)
+    after = Sensorian_Client.disp.getStats()
+    sent = after['bytessent'] - before['bytessent']
+    saved = after['bytessaved'] - before['bytessaved']
+    print("%-22s %8d bytes sent  %8d bytes saved  %5.1f%% saved" %
+          ("Partial bytes", sent, saved, 100.0 * saved / max(sent + saved, 1)))
+
+
+benchmarks = {"ceiling": bench_ceiling,
+              "scheduler": bench_scheduler,
+              "ambient": bench_ambient,
+              "frame": bench_frame,
+              "display": bench_display
+              }
+benchmarkOrder = ["ceiling", "scheduler", "ambient", "frame", "display"]
+
+
+def main(names):
+    """Sets up the sensors and runs the named benchmarks, or all of them if none are named.
+
+    :param names: List of String names of benchmarks to run.
+    """
+    Sensorian_Client.config()
+    Sensorian_Client.select_backend().setup()
+    if not names:
+        names = benchmarkOrder
+    for name in names:
+        if name in benchmarks:
+            benchmarks[name]()
+        else:
+            print("Unknown benchmark " + name + ", choose from " + ", ".join(benchmarkOrder))
+    Sensorian_Client.cleanup()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -54,6 +54,11 @@ cd CAP1203
 make
 cd ..
 
+#Compile the driver which reads every sensor in one frame
+cd SensorianFrame
+make
+cd ..
+
 #Leave PythonSharedObjectSrc
 cd ..
 
@@ -64,6 +69,8 @@ cp -p PythonSharedObjectSrc/FXOS8700CQR1/libFXO.so ./libFXO.so
 
 cp -p PythonSharedObjectSrc/CAP1203/libCAP.so ./libCAP.so
 
+cp -p PythonSharedObjectSrc/SensorianFrame/libFrame.so ./libFrame.so
+
 #Enable SPI and I2C interfaces
 sudo sed -i 's/#dtparam=i2c_arm=on/dtparam=i2c_arm=on/g' /boot/config.txt
 sudo sed -i 's/#dtparam=spi=on/dtparam=spi=on/g' /boot/config.txt
@@ -0,0 +1,83 @@
+#!/usr/bin/python
+from __future__ import print_function
+import time
+import unittest
+from BusManager import BusManager, BUS_PRIORITY_INPUT, BUS_PRIORITY_IMU, BUS_PRIORITY_ENVIRONMENT
+
+
+class BusManagerTest(unittest.TestCase):
+    """Checks the bus manager runs transactions by priority, merges keyed reads, drops late ones and stops cleanly.
+
+    Transactions are submitted before the manager is started so they are all waiting when it takes the first one.
+    """
+
+    def setUp(self):
+        self.manager = BusManager()
+        self.order = []
+
+    def tearDown(self):
+        if self.manager.is_alive():
+            self.manager.stop()
+            self.manager.join(1)
+
+    def transfer(self, name):
+        return lambda: self.order.append(name) or name
+
+    def test_priority_order(self):
+        environment = self.manager.submit("MPL3115A2", self.transfer("environment"), BUS_PRIORITY_ENVIRONMENT)
+        first_imu = self.manager.submit("FXOS8700CQ", self.transfer("imu1"), BUS_PRIORITY_IMU)
+        second_imu = self.manager.submit("FXOS8700CQ", self.transfer("imu2"), BUS_PRIORITY_IMU)
+        button = self.manager.submit("CAP1203", self.transfer("button"), BUS_PRIORITY_INPUT)
+        self.manager.start()
+        self.assertEqual(environment.wait(), "environment")
+        for transaction in (first_imu, second_imu, button):
+            transaction.wait()
+        self.assertEqual(self.order, ["button", "imu1", "imu2", "environment"])
+
+    def test_key_merging(self):
+        first = self.manager.submit("APDS9300", self.transfer("lux"), BUS_PRIORITY_ENVIRONMENT, key="lux")
+        second = self.manager.submit("APDS9300", self.transfer("lux"), BUS_PRIORITY_ENVIRONMENT, key="lux")
+        self.assertIs(first, second)
+        # A more urgent copy moves the waiting read up ahead of other work
+        other = self.manager.submit("MPL3115A2", self.transfer("other"), BUS_PRIORITY_IMU)
+        urgent = self.manager.submit("APDS9300", self.transfer("lux"), BUS_PRIORITY_INPUT, key="lux")
+        self.assertIs(urgent, first)
+        self.manager.start()
+        self.assertEqual(first.wait(), "lux")
+        other.wait()
+        self.assertEqual(self.order, ["lux", "other"])
+        stats = dict((device['device'], device) for device in self.manager.get_stats())
+        self.assertEqual(stats['APDS9300']['transactions'], 1)
+        self.assertEqual(stats['APDS9300']['merged'], 2)
+
+    def test_deadline_expiry(self):
+        late = self.manager.submit("FXOS8700CQ", self.transfer("late"), BUS_PRIORITY_IMU, deadline=0.001)
+        patient = self.manager.submit("FXOS8700CQ", self.transfer("patient"), BUS_PRIORITY_IMU, deadline=10)
+        time.sleep(0.01)
+        self.manager.start()
+        self.assertIsNone(late.wait())
+        self.assertTrue(late.expired)
+        self.assertEqual(patient.wait(), "patient")
+        self.assertEqual(self.order, ["patient"])
+        self.assertEqual(self.manager.get_stats()[0]['expired'], 1)
+
+    def test_errors_reach_the_caller(self):
+        def fail():
+            raise IOError("bus error")
+        transaction = self.manager.submit("CAP1203", fail, BUS_PRIORITY_INPUT)
+        self.manager.start()
+        self.assertRaises(IOError, transaction.wait)
+
+    def test_shutdown(self):
+        self.manager.start()
+        waiting = self.manager.submit("MPL3115A2", lambda: time.sleep(0.05) or "done", BUS_PRIORITY_ENVIRONMENT)
+        self.manager.stop()
+        self.manager.join(1)
+        self.assertFalse(self.manager.is_alive())
+        # Transactions queued ahead of the stop still run
+        self.assertTrue(waiting.done.is_set())
+        self.assertEqual(waiting.wait(), "done")
+
+
+if __name__ == "__main__":
+    unittest.main()
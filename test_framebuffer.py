@@ -0,0 +1,147 @@
+#!/usr/bin/python
+from __future__ import print_function
+import unittest
+import numpy
+from PIL import Image
+from Framebuffer import image_to_data, image_to_565, dirty_rectangles, merge_rectangles, window_bytes, fits_partial, \
+    DIRTY_ROW_GAP, DIRTY_MAX_RECTS, DIRTY_FULL_FRACTION, WINDOW_OVERHEAD
+
+WIDTH = 128
+HEIGHT = 160
+
+
+class ImageTo565Test(unittest.TestCase):
+    """Checks the vectorized conversion gives the same bytes as the per-pixel one the display used to be sent."""
+
+    def assert_same_bytes(self, image):
+        self.assertEqual(bytes(image_to_565(image)), bytes(bytearray(image_to_data(image))))
+
+    def test_every_channel_value(self):
+        # Each row holds all 256 levels of one channel, so every bit each channel keeps or drops is covered
+        levels = numpy.arange(256, dtype=numpy.uint8)
+        rgb = numpy.zeros((3, 256, 3), dtype=numpy.uint8)
+        for channel in range(3):
+            rgb[channel, :, channel] = levels
+        self.assert_same_bytes(Image.fromarray(rgb, 'RGB'))
+
+    def test_random_display_sized_image(self):
+        rgb = numpy.random.RandomState(565).randint(0, 256, (128, 160, 3)).astype(numpy.uint8)
+        self.assert_same_bytes(Image.fromarray(rgb, 'RGB'))
+
+    def test_other_modes_are_converted(self):
+        rgb = numpy.random.RandomState(16).randint(0, 256, (7, 5, 3)).astype(numpy.uint8)
+        image = Image.fromarray(rgb, 'RGB')
+        for mode in ('L', 'RGBA', 'P', '1'):
+            self.assert_same_bytes(image.convert(mode))
+
+    def test_frame_is_reused_when_the_size_matches(self):
+        first = Image.new('RGB', (4, 3), (255, 0, 0))
+        second = Image.new('RGB', (4, 3), (0, 0, 255))
+        frame = image_to_565(first)
+        self.assertIs(image_to_565(second, frame), frame)
+        self.assertEqual(bytes(frame), bytes(bytearray(image_to_data(second))))
+        resized = image_to_565(Image.new('RGB', (2, 2)), frame)
+        self.assertIsNot(resized, frame)
+        self.assertEqual(len(resized), 8)
+
+
+class DirtyRectanglesTest(unittest.TestCase):
+    """Checks the changed parts of a frame are found as few rectangles covering every changed pixel."""
+
+    def setUp(self):
+        self.previous = numpy.zeros((HEIGHT, WIDTH), dtype=numpy.uint16)
+        self.pixels = self.previous.copy()
+
+    def rectangles(self):
+        return dirty_rectangles(bytearray(self.pixels.tobytes()), bytearray(self.previous.tobytes()), WIDTH, HEIGHT)
+
+    def test_unchanged_frame(self):
+        self.assertEqual(self.rectangles(), [])
+
+    def test_single_pixel(self):
+        self.pixels[20, 30] = 0xFFFF
+        self.assertEqual(self.rectangles(), [(30, 20, 30, 20)])
+
+    def test_close_rows_share_a_rectangle(self):
+        self.pixels[10, 5] = 0xFFFF
+        self.pixels[10 + DIRTY_ROW_GAP, 50] = 0xFFFF
+        self.assertEqual(self.rectangles(), [(5, 10, 50, 10 + DIRTY_ROW_GAP)])
+
+    def test_distant_rows_get_their_own_rectangles(self):
+        self.pixels[10, 5] = 0xFFFF
+        self.pixels[11 + DIRTY_ROW_GAP, 50] = 0xFFFF
+        self.assertEqual(self.rectangles(), [(5, 10, 5, 10), (50, 11 + DIRTY_ROW_GAP, 50, 11 + DIRTY_ROW_GAP)])
+
+    def test_limited_to_max_rectangles_merging_the_nearest(self):
+        # Bands one more than the limit, the second and third closest together so they are the ones merged
+        rows = [0, 20, 27, 50, 80, 120][:DIRTY_MAX_RECTS + 1]
+        for row in rows:
+            self.pixels[row, row % WIDTH] = 0xFFFF
+        rectangles = self.rectangles()
+        self.assertEqual(len(rectangles), DIRTY_MAX_RECTS)
+        self.assertIn((20, 20, 27, 27), rectangles)
+        changed = numpy.argwhere(self.pixels != self.previous)
+        for y, x in changed:
+            self.assertTrue(any(x0 <= x <= x1 and y0 <= y <= y1 for x0, y0, x1, y1 in rectangles))
+
+
+class MergeRectanglesTest(unittest.TestCase):
+    """Checks the regions a caller drew are merged into few rectangles covering them all."""
+
+    def test_overlapping_are_merged(self):
+        self.assertEqual(merge_rectangles([(10, 10, 20, 20), (15, 15, 30, 25)]), [(10, 10, 30, 25)])
+
+    def test_within_row_gap_are_merged(self):
+        self.assertEqual(merge_rectangles([(0, 0, 10, 9), (50, 9 + DIRTY_ROW_GAP, 60, 20)]),
+                         [(0, 0, 60, 20)])
+
+    def test_apart_are_kept_top_to_bottom(self):
+        self.assertEqual(merge_rectangles([(0, 100, 10, 110), (0, 0, 10, 10)]),
+                         [(0, 0, 10, 10), (0, 100, 10, 110)])
+
+    def test_limited_to_max_rectangles_merging_the_nearest(self):
+        regions = [(0, top, 10, top + 2) for top in (0, 20, 40, 60, 80, 100, 120)][:DIRTY_MAX_RECTS + 1]
+        regions[2] = (5, 30, 15, 32)
+        merged = merge_rectangles(regions)
+        self.assertEqual(len(merged), DIRTY_MAX_RECTS)
+        self.assertIn((0, 20, 15, 32), merged)
+        for x0, y0, x1, y1 in regions:
+            self.assertTrue(any(mx0 <= x0 and my0 <= y0 and x1 <= mx1 and y1 <= my1
+                                for mx0, my0, mx1, my1 in merged))
+
+    def test_many_regions(self):
+        regions = [(row % WIDTH, row, row % WIDTH, row) for row in range(0, HEIGHT, DIRTY_ROW_GAP + 3)]
+        self.assertEqual(len(merge_rectangles(regions)), DIRTY_MAX_RECTS)
+
+
+class FitsPartialTest(unittest.TestCase):
+    """Checks the whole frame is sent once the rectangles would take more than DIRTY_FULL_FRACTION of its bytes."""
+
+    def test_window_bytes_counts_each_window(self):
+        self.assertEqual(window_bytes([]), 0)
+        self.assertEqual(window_bytes([(0, 0, 0, 0), (0, 0, 9, 1)]), 2 + 40 + 2 * WINDOW_OVERHEAD)
+
+    def test_small_change_is_sent_partially(self):
+        self.assertTrue(fits_partial([(0, 0, 15, 15)], WIDTH, HEIGHT))
+        self.assertTrue(fits_partial([], WIDTH, HEIGHT))
+
+    def test_whole_frame_is_not(self):
+        self.assertFalse(fits_partial([(0, 0, WIDTH - 1, HEIGHT - 1)], WIDTH, HEIGHT))
+
+    def test_fraction_boundary(self):
+        # The most full-width rows which fit under the fraction, and one more which doesn't
+        limit = WIDTH * HEIGHT * 2 * DIRTY_FULL_FRACTION
+        rows = int((limit - WINDOW_OVERHEAD) // (WIDTH * 2))
+        self.assertTrue(fits_partial([(0, 0, WIDTH - 1, rows - 1)], WIDTH, HEIGHT))
+        self.assertFalse(fits_partial([(0, 0, WIDTH - 1, rows)], WIDTH, HEIGHT))
+
+    def test_overhead_of_many_windows_counts(self):
+        # Rows which fit as one window are pushed over the fraction by the commands of one window per row
+        limit = WIDTH * HEIGHT * 2 * DIRTY_FULL_FRACTION
+        rows = int((limit - WINDOW_OVERHEAD) // (WIDTH * 2))
+        self.assertTrue(fits_partial([(0, 0, WIDTH - 1, rows - 1)], WIDTH, HEIGHT))
+        self.assertFalse(fits_partial([(0, row, WIDTH - 1, row) for row in range(rows)], WIDTH, HEIGHT))
+
+
+if __name__ == '__main__':
+    unittest.main()
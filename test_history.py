@@ -0,0 +1,43 @@
+#!/usr/bin/python
+from __future__ import print_function
+import unittest
+import numpy
+from SensorHistory import ChannelHistory
+
+
+class ChannelHistoryTest(unittest.TestCase):
+    """Checks the samples read from a ChannelHistory stay as they were read while more are appended."""
+
+    def test_read_survives_appends_past_capacity(self):
+        channel_history = ChannelHistory(4)
+        for sample in range(6):
+            channel_history.append(sample, sample)
+        times, values = channel_history.get()
+        self.assertEqual(list(values), [2, 3, 4, 5])
+        for sample in range(6, 12):
+            channel_history.append(sample, sample)
+        self.assertEqual(list(times), [2, 3, 4, 5])
+        self.assertEqual(list(values), [2, 3, 4, 5])
+        self.assertEqual(list(channel_history.get()[1]), [8, 9, 10, 11])
+
+    def test_extend_past_capacity(self):
+        channel_history = ChannelHistory(4)
+        times, values = channel_history.get()
+        channel_history.extend(numpy.arange(10.0), numpy.arange(10.0))
+        self.assertEqual(len(values), 0)
+        self.assertEqual(list(channel_history.get(since=7)[1]), [8, 9])
+        self.assertEqual(list(channel_history.get(max_points=3)[1]), [7, 8, 9])
+
+    def test_timestamps_stay_in_order(self):
+        channel_history = ChannelHistory(8)
+        channel_history.extend(numpy.array([1.0, 2.0, 3.0]), numpy.array([1.0, 2.0, 3.0]))
+        # A batch starting before the last one ended, as an early FIFO read can stamp it
+        channel_history.extend(numpy.array([2.5, 3.5, 4.5]), numpy.array([4.0, 5.0, 6.0]))
+        channel_history.append(4.0, 7.0)
+        times, values = channel_history.get()
+        self.assertEqual(list(times), [1.0, 2.0, 3.0, 3.0, 3.5, 4.5, 4.5])
+        self.assertEqual(list(channel_history.get(since=3.0)[1]), [5.0, 6.0, 7.0])
+
+
+if __name__ == "__main__":
+    unittest.main()